@@ -0,0 +1,28 @@
+"""Add bet import fingerprint
+
+Revision ID: 3f6b2a9c1d4e
+Revises: 0c1d74f16b27
+Create Date: 2026-10-19 10:12:31.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6b2a9c1d4e'
+down_revision: Union[str, None] = '0c1d74f16b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('bets', sa.Column('fingerprint', sa.String(length=32), nullable=True))
+    op.create_index('ix_bets_user_id_fingerprint', 'bets', ['user_id', 'fingerprint'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bets_user_id_fingerprint', table_name='bets')
+    op.drop_column('bets', 'fingerprint')
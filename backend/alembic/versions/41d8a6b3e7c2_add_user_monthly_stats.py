@@ -0,0 +1,45 @@
+"""Add user monthly stats
+
+Revision ID: 41d8a6b3e7c2
+Revises: e2b7f04c6d91
+Create Date: 2026-10-19 14:52:40.661388
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '41d8a6b3e7c2'
+down_revision: Union[str, None] = 'e2b7f04c6d91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_monthly_stats',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('month_year', sa.String(), nullable=False),
+    sa.Column('total_bets', sa.Integer(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.Column('losses', sa.Integer(), nullable=False),
+    sa.Column('pushes', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Float(), nullable=False),
+    sa.Column('pnl', sa.Float(), nullable=False),
+    sa.Column('staked', sa.Float(), nullable=False),
+    sa.Column('roi', sa.Float(), nullable=False),
+    sa.Column('win_rate', sa.Float(), nullable=False),
+    sa.Column('top_sport', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'month_year')
+    )
+    op.create_index('ix_user_monthly_stats_month_year', 'user_monthly_stats', ['month_year'], unique=False)
+    # Run `python rebuild_monthly_stats.py` after upgrading to backfill existing bets
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_monthly_stats_month_year', table_name='user_monthly_stats')
+    op.drop_table('user_monthly_stats')
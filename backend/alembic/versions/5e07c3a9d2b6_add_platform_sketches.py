@@ -0,0 +1,44 @@
+"""Add platform sketches
+
+Revision ID: 5e07c3a9d2b6
+Revises: 9b3e51d7a0c8
+Create Date: 2026-10-19 18:21:37.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e07c3a9d2b6'
+down_revision: Union[str, None] = '9b3e51d7a0c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('platform_sketches',
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('month_year', sa.String(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('user_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('metric', 'month_year')
+    )
+    op.create_table('platform_sketch_deltas',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('month_year', sa.String(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('weight', sa.SmallInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Run `python rebuild_monthly_stats.py` after upgrading to build the sketches
+
+
+def downgrade() -> None:
+    op.drop_table('platform_sketch_deltas')
+    op.drop_table('platform_sketches')
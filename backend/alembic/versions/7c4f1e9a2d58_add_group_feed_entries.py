@@ -0,0 +1,45 @@
+"""Add group feed entries
+
+Revision ID: 7c4f1e9a2d58
+Revises: 5e07c3a9d2b6
+Create Date: 2026-10-19 21:04:12.318460
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4f1e9a2d58'
+down_revision: Union[str, None] = '5e07c3a9d2b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('group_feed_entries',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('group_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('bet_id', sa.UUID(), nullable=True),
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('summary', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['bet_id'], ['bets.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_group_feed_entries_group_id_id', 'group_feed_entries', ['group_id', 'id'], unique=False)
+    op.create_index(op.f('ix_group_feed_entries_user_id'), 'group_feed_entries', ['user_id'], unique=False)
+    op.create_index(op.f('ix_group_feed_entries_bet_id'), 'group_feed_entries', ['bet_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_group_feed_entries_bet_id'), table_name='group_feed_entries')
+    op.drop_index(op.f('ix_group_feed_entries_user_id'), table_name='group_feed_entries')
+    op.drop_index('ix_group_feed_entries_group_id_id', table_name='group_feed_entries')
+    op.drop_table('group_feed_entries')
@@ -0,0 +1,55 @@
+"""Add entity catalog
+
+Revision ID: 8a41c7e2b9f0
+Revises: 3f6b2a9c1d4e
+Create Date: 2026-10-19 11:03:54.120477
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a41c7e2b9f0'
+down_revision: Union[str, None] = '3f6b2a9c1d4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('entities',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('kind', sa.Enum('TEAM', 'PLAYER', 'LEAGUE', name='entitykind'), nullable=False),
+    sa.Column('sport', postgresql.ENUM('NFL', 'NBA', 'MLB', 'NHL', 'NCAAF', 'NCAAB', 'SOCCER', 'MMA', 'OTHER', name='sport', create_type=False), nullable=True),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('entity_aliases',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('entity_id', sa.UUID(), nullable=False),
+    sa.Column('alias', sa.String(), nullable=False),
+    sa.Column('confidence', sa.Float(), nullable=False),
+    sa.Column('status', sa.Enum('CONFIRMED', 'AUTO', 'PENDING', 'REJECTED', name='aliasstatus'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['entity_id'], ['entities.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_entity_aliases_alias'), 'entity_aliases', ['alias'], unique=False)
+    op.add_column('bets', sa.Column('entity_id', sa.UUID(), nullable=True))
+    op.create_index(op.f('ix_bets_entity_id'), 'bets', ['entity_id'], unique=False)
+    op.create_foreign_key('bets_entity_id_fkey', 'bets', 'entities', ['entity_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    op.drop_constraint('bets_entity_id_fkey', 'bets', type_='foreignkey')
+    op.drop_index(op.f('ix_bets_entity_id'), table_name='bets')
+    op.drop_column('bets', 'entity_id')
+    op.drop_index(op.f('ix_entity_aliases_alias'), table_name='entity_aliases')
+    op.drop_table('entity_aliases')
+    op.drop_table('entities')
+    sa.Enum(name='aliasstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='entitykind').drop(op.get_bind(), checkfirst=True)
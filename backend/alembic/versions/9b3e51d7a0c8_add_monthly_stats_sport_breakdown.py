@@ -0,0 +1,28 @@
+"""Add monthly stats sport breakdown
+
+Revision ID: 9b3e51d7a0c8
+Revises: 41d8a6b3e7c2
+Create Date: 2026-10-19 16:08:12.204519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e51d7a0c8'
+down_revision: Union[str, None] = '41d8a6b3e7c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user_monthly_stats', sa.Column('sport_breakdown', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    # Run `python rebuild_monthly_stats.py` after upgrading to backfill the breakdown
+
+
+def downgrade() -> None:
+    op.drop_column('user_monthly_stats', 'sport_breakdown')
@@ -0,0 +1,44 @@
+"""Add staged imports
+
+Revision ID: c5e9d2f47a13
+Revises: 8a41c7e2b9f0
+Create Date: 2026-10-19 12:26:08.317644
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e9d2f47a13'
+down_revision: Union[str, None] = '8a41c7e2b9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('staged_imports',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('filename', sa.String(), nullable=False),
+    sa.Column('provider', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('valid_count', sa.Integer(), nullable=False),
+    sa.Column('invalid_count', sa.Integer(), nullable=False),
+    sa.Column('duplicate_count', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_staged_imports_user_id'), 'staged_imports', ['user_id'], unique=False)
+    op.create_index(op.f('ix_staged_imports_expires_at'), 'staged_imports', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_staged_imports_expires_at'), table_name='staged_imports')
+    op.drop_index(op.f('ix_staged_imports_user_id'), table_name='staged_imports')
+    op.drop_table('staged_imports')
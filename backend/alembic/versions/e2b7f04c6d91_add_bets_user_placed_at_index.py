@@ -0,0 +1,29 @@
+"""Add bets (user_id, placed_at) index
+
+Revision ID: e2b7f04c6d91
+Revises: c5e9d2f47a13
+Create Date: 2026-10-19 13:41:17.902215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7f04c6d91'
+down_revision: Union[str, None] = 'c5e9d2f47a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_bets_user_id_placed_at', 'bets', ['user_id', 'placed_at'], unique=False,
+        postgresql_include=['status', 'result_profit', 'units', 'stake']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bets_user_id_placed_at', table_name='bets')
@@ -1,38 +1,41 @@
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func, case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from app.core.security import current_user
-from app.db.session import get_db
+from app.db.replicas import get_read_db
 from app.db import models
 from app import schemas
 from app.utils import calculate_roi, calculate_hit_rate, american_to_decimal
+from app.utils.periods import current_month, month_bounds
+from app.utils.platform_stats import PERCENTILE_METRICS, get_sketch
 
 router = APIRouter()
 
 
 @router.get("/kpis", response_model=schemas.KPIData)
-def get_kpis(
+async def get_kpis(
     user: models.User = Depends(current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     from_date: Optional[datetime] = Query(None, description="Start date filter"),
     to_date: Optional[datetime] = Query(None, description="End date filter")
 ):
     """Get KPI metrics for the user."""
     # Build base query for settled bets
-    query = db.query(models.Bet).filter(models.Bet.user_id == user.id)
+    query = select(models.Bet).where(models.Bet.user_id == user.id)
 
     # Apply date filters
     if from_date:
-        query = query.filter(models.Bet.placed_at >= from_date)
+        query = query.where(models.Bet.placed_at >= from_date)
     if to_date:
-        query = query.filter(models.Bet.placed_at <= to_date)
+        query = query.where(models.Bet.placed_at <= to_date)
 
     # Get all bets
-    all_bets = query.all()
+    all_bets = (await db.scalars(query)).all()
 
     # Filter settled bets (Won or Lost) for ROI calculation
     settled_bets = [b for b in all_bets if b.status in [models.BetStatus.WON, models.BetStatus.LOST]]
@@ -79,25 +82,27 @@ def get_kpis(
 
 
 @router.get("/breakdown", response_model=list[schemas.BreakdownItem])
-def get_breakdown(
+async def get_breakdown(
     user: models.User = Depends(current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     dim: str = Query(..., description="Dimension: book, sport, or market"),
     from_date: Optional[datetime] = Query(None),
     to_date: Optional[datetime] = Query(None)
 ):
     """Get performance breakdown by dimension (book, sport, or market)."""
     # Build base query
-    query = db.query(models.Bet).filter(models.Bet.user_id == user.id)
+    query = select(models.Bet).where(models.Bet.user_id == user.id)
+    if dim == "book":
+        query = query.options(joinedload(models.Bet.book))
 
     # Apply date filters
     if from_date:
-        query = query.filter(models.Bet.placed_at >= from_date)
+        query = query.where(models.Bet.placed_at >= from_date)
     if to_date:
-        query = query.filter(models.Bet.placed_at <= to_date)
+        query = query.where(models.Bet.placed_at <= to_date)
 
     # Get all bets
-    bets = query.all()
+    bets = (await db.scalars(query)).all()
 
     # Group by dimension
     breakdown = {}
@@ -137,7 +142,7 @@ def get_breakdown(
         result.append(schemas.BreakdownItem(
             key=key,
             pnl=round(data["pnl"], 2),
-            roi=roi_pct,
+            roi_pct=roi_pct,
             count=data["count"]
         ))
 
@@ -148,27 +153,27 @@ def get_breakdown(
 
 
 @router.get("/bankroll", response_model=list[schemas.BankrollPoint])
-def get_bankroll(
+async def get_bankroll(
     user: models.User = Depends(current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     from_date: Optional[datetime] = Query(None),
     to_date: Optional[datetime] = Query(None)
 ):
     """Get bankroll over time (cumulative P&L)."""
     # Build base query
-    query = db.query(models.Bet).filter(
+    query = select(models.Bet).where(
         models.Bet.user_id == user.id,
         models.Bet.result_profit.isnot(None)
     ).order_by(models.Bet.placed_at)
 
     # Apply date filters
     if from_date:
-        query = query.filter(models.Bet.placed_at >= from_date)
+        query = query.where(models.Bet.placed_at >= from_date)
     if to_date:
-        query = query.filter(models.Bet.placed_at <= to_date)
+        query = query.where(models.Bet.placed_at <= to_date)
 
     # Get all settled bets
-    bets = query.all()
+    bets = (await db.scalars(query)).all()
 
     # Calculate cumulative P&L
     bankroll_points = []
@@ -184,3 +189,65 @@ def get_bankroll(
         ))
 
     return bankroll_points
+
+
+# Quantiles of the platform distribution returned with each metric
+PERCENTILE_MARKERS = (10, 25, 50, 75, 90)
+
+
+@router.get("/percentiles", response_model=schemas.PercentilesResponse)
+async def get_percentiles(
+    user: models.User = Depends(current_user),
+    db: AsyncSession = Depends(get_read_db),
+    month: Optional[str] = Query(None, description="Month in YYYY-MM format (defaults to current)")
+):
+    """Get the user's monthly ROI, units and win rate percentiles among all users.
+
+    Served from persisted quantile sketches, so the cost does not grow with
+    the number of users. Percentiles may lag recent bets by the sketch
+    compaction interval; rank_error bounds the error.
+    """
+    month = month or current_month()
+    try:
+        month_bounds(month)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="month must be in YYYY-MM format"
+        )
+
+    own = await db.scalar(select(models.UserMonthlyStats).where(
+        models.UserMonthlyStats.user_id == user.id,
+        models.UserMonthlyStats.month_year == month
+    ))
+
+    user_count = 0
+    rank_error = 0.0
+    metrics = []
+    for metric in PERCENTILE_METRICS:
+        sketch = await db.run_sync(get_sketch, metric, month)
+        value = getattr(own, metric) if own else None
+
+        percentile = None
+        quantiles = {f"p{p}": None for p in PERCENTILE_MARKERS}
+        if sketch is not None and sketch.n > 0:
+            user_count = max(user_count, sketch.n)
+            rank_error = max(rank_error, sketch.rank_error() * 100)
+            if value is not None:
+                percentile = round(sketch.cdf(value) * 100, 1)
+            markers = sketch.quantiles([p / 100 for p in PERCENTILE_MARKERS])
+            quantiles = {f"p{p}": round(q, 2) for p, q in zip(PERCENTILE_MARKERS, markers)}
+
+        metrics.append(schemas.MetricPercentile(
+            metric=metric,
+            value=value,
+            percentile=percentile,
+            quantiles=quantiles
+        ))
+
+    return schemas.PercentilesResponse(
+        month=month,
+        user_count=user_count,
+        rank_error=round(rank_error, 2),
+        metrics=metrics
+    )
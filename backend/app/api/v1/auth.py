@@ -1,40 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.passwords import PasswordHasherBusy, password_hasher
 from app.core.security import (
-    hash_password,
-    verify_password,
     create_access_token,
     create_refresh_token,
     decode_token,
-    current_user
+    current_user,
+    revoke_token,
+    security
 )
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.db import models
 from app import schemas
 
 router = APIRouter()
 
 
-@router.post("/register", response_model=schemas.TokenResponse, status_code=status.HTTP_201_CREATED)
-def register(body: schemas.UserRegister, db: Session = Depends(get_db)):
-    """Register a new user."""
-    # Check if user already exists
-    existing_user = db.query(models.User).filter(models.User.email == body.email).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
 
-    # Create new user
-    hashed_pwd = hash_password(body.password)
+
+async def _find_user(db: AsyncSession, email: str) -> models.User | None:
+    return await db.scalar(select(models.User).where(models.User.email == email))
+
+
+async def _create_user(db: AsyncSession, email: str, hashed_pwd: str) -> models.User:
     new_user = models.User(
-        email=body.email,
+        email=email,
         hashed_password=hashed_pwd
     )
     db.add(new_user)
-    db.flush()  # Get user ID without committing
+    await db.flush()  # Get user ID without committing
 
     # Create user settings with default values
     user_settings = models.UserSettings(
@@ -42,8 +45,32 @@ def register(body: schemas.UserRegister, db: Session = Depends(get_db)):
         base_unit=50.0  # Default base unit
     )
     db.add(user_settings)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    return new_user
+
+
+@router.post("/register", response_model=schemas.TokenResponse, status_code=status.HTTP_201_CREATED)
+async def register(body: schemas.UserRegister, db: AsyncSession = Depends(get_async_db)):
+    """Register a new user.
+
+    Hashing runs on the password hasher's pool, so the event loop is
+    never held for the bcrypt cost.
+    """
+    # Check if user already exists
+    existing_user = await _find_user(db, body.email)
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+
+    # Create new user
+    try:
+        hashed_pwd = await password_hasher.hash(body.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    new_user = await _create_user(db, body.email, hashed_pwd)
 
     # Generate tokens
     access_token = create_access_token(data={"sub": str(new_user.id)})
@@ -56,10 +83,10 @@ def register(body: schemas.UserRegister, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=schemas.TokenResponse)
-def login(body: schemas.UserLogin, db: Session = Depends(get_db)):
+async def login(body: schemas.UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login and get access tokens."""
     # Find user by email
-    user = db.query(models.User).filter(models.User.email == body.email).first()
+    user = await _find_user(db, body.email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,12 +94,21 @@ def login(body: schemas.UserLogin, db: Session = Depends(get_db)):
         )
 
     # Verify password
-    if not verify_password(body.password, user.hashed_password):
+    try:
+        valid, new_hash = await password_hasher.verify(body.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
 
+    # Upgrade hashes made with a different BCRYPT_ROUNDS
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await db.commit()
+
     # Generate tokens
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
@@ -84,7 +120,7 @@ def login(body: schemas.UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/refresh", response_model=schemas.TokenResponse)
-def refresh(refresh_token: str, db: Session = Depends(get_db)):
+async def refresh(refresh_token: str, db: AsyncSession = Depends(get_async_db)):
     """Refresh access token using refresh token."""
     payload = decode_token(refresh_token)
 
@@ -103,7 +139,7 @@ def refresh(refresh_token: str, db: Session = Depends(get_db)):
         )
 
     # Verify user still exists
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.scalar(select(models.User).where(models.User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -121,7 +157,7 @@ def refresh(refresh_token: str, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=dict)
-def get_current_user_info(user: models.User = Depends(current_user)):
+async def get_current_user_info(user: models.User = Depends(current_user)):
     """Get current user profile and settings."""
     return {
         "user": schemas.UserOut.model_validate(user),
@@ -130,15 +166,19 @@ def get_current_user_info(user: models.User = Depends(current_user)):
 
 
 @router.post("/logout", status_code=status.HTTP_200_OK)
-def logout(user: models.User = Depends(current_user)):
-    """Logout user (client-side should clear tokens)."""
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user: models.User = Depends(current_user)
+):
+    """Logout user, revoking the access token (client-side should clear tokens)."""
+    revoke_token(credentials.credentials)
     return {"message": "Logged out successfully"}
 
 
 @router.post("/reset-password", status_code=status.HTTP_200_OK)
-def reset_password(body: schemas.PasswordResetRequest, db: Session = Depends(get_db)):
+async def reset_password(body: schemas.PasswordResetRequest, db: AsyncSession = Depends(get_async_db)):
     """Request password reset (placeholder for future email functionality)."""
-    user = db.query(models.User).filter(models.User.email == body.email).first()
+    user = await _find_user(db, body.email)
     if not user:
         # Don't reveal if email exists or not for security
         return {"message": "If the email exists, a reset link has been sent"}
@@ -148,18 +188,21 @@ def reset_password(body: schemas.PasswordResetRequest, db: Session = Depends(get
 
 
 @router.patch("/settings", response_model=schemas.UserSettingsOut)
-def update_user_settings(
+async def update_user_settings(
     body: schemas.UserSettingsUpdate,
     user: models.User = Depends(current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user settings."""
-    if not user.settings:
+    # The authenticated user is a cached snapshot; load the row to modify it
+    settings = await db.scalar(select(models.UserSettings).where(
+        models.UserSettings.user_id == user.id
+    ))
+
+    if not settings:
         # Create settings if they don't exist
         settings = models.UserSettings(user_id=user.id)
         db.add(settings)
-    else:
-        settings = user.settings
 
     # Update fields
     if body.base_unit is not None:
@@ -167,7 +210,7 @@ def update_user_settings(
     if body.default_book_id is not None:
         settings.default_book_id = body.default_book_id
 
-    db.commit()
-    db.refresh(settings)
+    await db.commit()
+    await db.refresh(settings)
 
     return schemas.UserSettingsOut.model_validate(settings)
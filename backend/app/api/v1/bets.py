@@ -3,23 +3,55 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, select
 
+from app.core.metrics import registry
 from app.core.security import current_user
-from app.db.session import get_db
+from app.db.replicas import get_read_db
+from app.db.session import get_async_db
 from app.db import models
 from app import schemas
 from app.utils import calculate_units, calculate_profit
+from app.utils.entity_resolver import resolve_entity_id
+from app.utils.group_feed import record_bet_events
+from app.utils.leaderboard_stream import publish_bet_change
+from app.utils.monthly_stats import month_key, refresh_user_months
+
+bets_settled_total = registry.counter(
+    "bets_settled_total", "Bets settled, by result", ["status"]
+)
 
 router = APIRouter()
 
 
+def _record_bet_write(db: Session, user_id: UUID, months: list[str], event_bet_id: Optional[UUID] = None) -> None:
+    """Refresh derived monthly stats and, if given a bet, its feed events."""
+    refresh_user_months(db, user_id, months)
+    if event_bet_id is not None:
+        record_bet_events(db, user_id, models.Bet.id == event_bet_id)
+
+
+async def _get_user_bet(db: AsyncSession, bet_id: UUID, user_id: UUID) -> models.Bet:
+    bet = await db.scalar(select(models.Bet).where(
+        models.Bet.id == bet_id,
+        models.Bet.user_id == user_id
+    ))
+
+    if not bet:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bet not found"
+        )
+    return bet
+
+
 @router.post("/", response_model=schemas.BetOut, status_code=status.HTTP_201_CREATED)
-def create_bet(
+async def create_bet(
     body: schemas.BetCreate,
     user: models.User = Depends(current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new bet."""
     # Calculate units from user's base unit
@@ -39,6 +71,7 @@ def create_bet(
         league=body.league,
         market_type=body.market_type,
         team_or_player=body.team_or_player,
+        entity_id=await db.run_sync(resolve_entity_id, body.team_or_player, body.sport),
         odds_american=body.odds_american,
         stake=body.stake,
         units=units,
@@ -51,16 +84,19 @@ def create_bet(
     )
 
     db.add(new_bet)
-    db.commit()
-    db.refresh(new_bet)
+    await db.flush()
+    await db.run_sync(_record_bet_write, user.id, [month_key(new_bet.placed_at)], new_bet.id)
+    await db.commit()
+    await db.refresh(new_bet)
+    await db.run_sync(publish_bet_change, user.id)
 
     return schemas.BetOut.model_validate(new_bet)
 
 
 @router.get("/", response_model=list[schemas.BetOut])
-def list_bets(
+async def list_bets(
     user: models.User = Depends(current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     sport_filter: Optional[str] = Query(None, description="Filter by sport"),
     book_id_filter: Optional[UUID] = Query(None, description="Filter by sportsbook ID"),
@@ -71,22 +107,22 @@ def list_bets(
     limit: int = Query(100, ge=1, le=1000)
 ):
     """List bets with optional filters."""
-    query = db.query(models.Bet).filter(models.Bet.user_id == user.id)
+    query = select(models.Bet).where(models.Bet.user_id == user.id)
 
     # Apply filters
     if status_filter:
-        query = query.filter(models.Bet.status == status_filter)
+        query = query.where(models.Bet.status == status_filter)
     if sport_filter:
-        query = query.filter(models.Bet.sport == sport_filter)
+        query = query.where(models.Bet.sport == sport_filter)
     if book_id_filter:
-        query = query.filter(models.Bet.book_id == book_id_filter)
+        query = query.where(models.Bet.book_id == book_id_filter)
     if from_date:
-        query = query.filter(models.Bet.placed_at >= from_date)
+        query = query.where(models.Bet.placed_at >= from_date)
     if to_date:
-        query = query.filter(models.Bet.placed_at <= to_date)
+        query = query.where(models.Bet.placed_at <= to_date)
     if search:
         search_pattern = f"%{search}%"
-        query = query.filter(
+        query = query.where(
             or_(
                 models.Bet.bet_name.ilike(search_pattern),
                 models.Bet.team_or_player.ilike(search_pattern)
@@ -97,50 +133,32 @@ def list_bets(
     query = query.order_by(models.Bet.placed_at.desc())
 
     # Pagination
-    bets = query.offset(skip).limit(limit).all()
+    bets = (await db.scalars(query.offset(skip).limit(limit))).all()
 
     return [schemas.BetOut.model_validate(bet) for bet in bets]
 
 
 @router.get("/{bet_id}", response_model=schemas.BetOut)
-def get_bet(
+async def get_bet(
     bet_id: UUID,
     user: models.User = Depends(current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific bet by ID."""
-    bet = db.query(models.Bet).filter(
-        models.Bet.id == bet_id,
-        models.Bet.user_id == user.id
-    ).first()
-
-    if not bet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Bet not found"
-        )
+    bet = await _get_user_bet(db, bet_id, user.id)
 
     return schemas.BetOut.model_validate(bet)
 
 
 @router.patch("/{bet_id}", response_model=schemas.BetOut)
-def update_bet(
+async def update_bet(
     bet_id: UUID,
     body: schemas.BetUpdate,
     user: models.User = Depends(current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a bet."""
-    bet = db.query(models.Bet).filter(
-        models.Bet.id == bet_id,
-        models.Bet.user_id == user.id
-    ).first()
-
-    if not bet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Bet not found"
-        )
+    bet = await _get_user_bet(db, bet_id, user.id)
 
     # Update fields
     update_data = body.model_dump(exclude_unset=True)
@@ -148,58 +166,49 @@ def update_bet(
     for field, value in update_data.items():
         setattr(bet, field, value)
 
+    # Re-resolve the canonical entity if the selection changed
+    if "team_or_player" in update_data or "sport" in update_data:
+        bet.entity_id = await db.run_sync(resolve_entity_id, bet.team_or_player, bet.sport)
+
     # Recalculate units if stake changed
     if body.stake is not None and user.settings:
         bet.units = calculate_units(body.stake, user.settings.base_unit)
 
-    db.commit()
-    db.refresh(bet)
+    await db.run_sync(_record_bet_write, user.id, [month_key(bet.placed_at)])
+    await db.commit()
+    await db.refresh(bet)
+    await db.run_sync(publish_bet_change, user.id)
 
     return schemas.BetOut.model_validate(bet)
 
 
 @router.delete("/{bet_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_bet(
+async def delete_bet(
     bet_id: UUID,
     user: models.User = Depends(current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a bet."""
-    bet = db.query(models.Bet).filter(
-        models.Bet.id == bet_id,
-        models.Bet.user_id == user.id
-    ).first()
-
-    if not bet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Bet not found"
-        )
+    bet = await _get_user_bet(db, bet_id, user.id)
 
-    db.delete(bet)
-    db.commit()
+    month = month_key(bet.placed_at)
+    await db.delete(bet)
+    await db.run_sync(_record_bet_write, user.id, [month])
+    await db.commit()
+    await db.run_sync(publish_bet_change, user.id)
 
     return None
 
 
 @router.post("/{bet_id}/settle", response_model=schemas.BetOut)
-def settle_bet(
+async def settle_bet(
     bet_id: UUID,
     body: schemas.BetSettle,
     user: models.User = Depends(current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Settle a bet and calculate profit."""
-    bet = db.query(models.Bet).filter(
-        models.Bet.id == bet_id,
-        models.Bet.user_id == user.id
-    ).first()
-
-    if not bet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Bet not found"
-        )
+    bet = await _get_user_bet(db, bet_id, user.id)
 
     # Validate cashout amount if status is Cashout
     if body.status == "Cashout" and body.cashout_amount is None:
@@ -217,12 +226,18 @@ def settle_bet(
     )
 
     # Update bet
+    previous_status = bet.status
     bet.status = body.status
     bet.result_profit = profit
     if body.cashout_amount is not None:
         bet.cashout_amount = body.cashout_amount
 
-    db.commit()
-    db.refresh(bet)
+    await db.run_sync(_record_bet_write, user.id, [month_key(bet.placed_at)], bet.id)
+    await db.commit()
+    await db.refresh(bet)
+    # Re-settling an already settled bet is a correction, not a new settlement
+    if previous_status == models.BetStatus.PENDING and bet.status != models.BetStatus.PENDING:
+        bets_settled_total.inc(status=models.BetStatus(bet.status).value)
+    await db.run_sync(publish_bet_change, user.id)
 
     return schemas.BetOut.model_validate(bet)
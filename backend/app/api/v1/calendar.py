@@ -5,11 +5,13 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from app.core.security import get_current_user
-from app.db.session import get_db
-from app.db.models import User, Bet, Sportsbook
+from app.db.session import get_async_db
+from app.db.models import User, Bet
 from app import schemas
 from app.utils.ics_generator import build_ics
 
@@ -18,9 +20,9 @@ router = APIRouter()
 
 
 @router.post("/prepare", response_model=schemas.CalendarPrepareResponse)
-def prepare_calendar_event(
+async def prepare_calendar_event(
     request: schemas.CalendarPrepareRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> schemas.CalendarPrepareResponse:
     """
@@ -33,10 +35,10 @@ def prepare_calendar_event(
     - For Outlook: returns web calendar link
     """
     # Fetch bet
-    bet = db.query(Bet).filter(
+    bet = await db.scalar(select(Bet).where(
         Bet.id == request.betId,
         Bet.user_id == current_user.id
-    ).first()
+    ))
 
     if not bet:
         raise HTTPException(status_code=404, detail="Bet not found")
@@ -87,9 +89,9 @@ def prepare_calendar_event(
 
 
 @router.get("/ics/{bet_id}")
-def download_ics(
+async def download_ics(
     bet_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Response:
     """
@@ -99,10 +101,10 @@ def download_ics(
         ICS file as downloadable attachment with Content-Type: text/calendar
     """
     # Fetch bet with sportsbook relationship
-    bet = db.query(Bet).filter(
+    bet = await db.scalar(select(Bet).options(joinedload(Bet.book)).where(
         Bet.id == bet_id,
         Bet.user_id == current_user.id
-    ).first()
+    ))
 
     if not bet:
         raise HTTPException(status_code=404, detail="Bet not found")
@@ -115,11 +117,7 @@ def download_ics(
         )
 
     # Get sportsbook name if available
-    book_name: Optional[str] = None
-    if bet.book_id:
-        book = db.query(Sportsbook).filter(Sportsbook.id == bet.book_id).first()
-        if book:
-            book_name = book.name
+    book_name: Optional[str] = bet.book.name if bet.book else None
 
     # Generate ICS file content
     try:
@@ -132,7 +130,8 @@ def download_ics(
     bet.calendar_created_at = datetime.utcnow()
     bet.calendar_timezone = current_user.settings.timezone
     bet.calendar_reminder_min = current_user.settings.calendar_reminder_min
-    db.commit()
+
+    await db.commit()
 
     # Generate filename
     # Sanitize bet name for filename (remove special chars)
@@ -152,9 +151,9 @@ def download_ics(
 
 
 @router.delete("/{bet_id}")
-def remove_calendar_event(
+async def remove_calendar_event(
     bet_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -163,10 +162,10 @@ def remove_calendar_event(
     This doesn't delete the event from the user's calendar app,
     but allows them to re-add it if needed.
     """
-    bet = db.query(Bet).filter(
+    bet = await db.scalar(select(Bet).where(
         Bet.id == bet_id,
         Bet.user_id == current_user.id
-    ).first()
+    ))
 
     if not bet:
         raise HTTPException(status_code=404, detail="Bet not found")
@@ -177,6 +176,6 @@ def remove_calendar_event(
     bet.calendar_created_at = None
     bet.calendar_timezone = None
     bet.calendar_reminder_min = None
-    db.commit()
+    await db.commit()
 
     return {"message": "Calendar event metadata removed. You can now re-add this bet to your calendar."}
@@ -0,0 +1,197 @@
+"""Entity catalog API endpoints for canonical teams, players and leagues."""
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.security import current_user, require_admin
+from app.db.session import get_async_db
+from app.db import models
+from app import schemas
+from app.utils.entity_resolver import (
+    get_entity_index,
+    invalidate_entity_index,
+    normalize_name,
+)
+
+router = APIRouter()
+
+
+def _alias_out(alias: models.EntityAlias, entity_name: str) -> schemas.EntityAliasOut:
+    """Build an alias response with its entity's canonical name."""
+    return schemas.EntityAliasOut(
+        id=alias.id,
+        entity_id=alias.entity_id,
+        entity_name=entity_name,
+        alias=alias.alias,
+        confidence=alias.confidence,
+        status=alias.status.value,
+        created_at=alias.created_at
+    )
+
+
+@router.get("/", response_model=list[schemas.EntityOut])
+async def list_entities(
+    kind: Optional[str] = Query(None, description="Filter by kind: team, player, or league"),
+    sport: Optional[str] = Query(None, description="Filter by sport"),
+    search: Optional[str] = Query(None, description="Search by name"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+    user: models.User = Depends(current_user)
+):
+    """List canonical entities."""
+    query = select(models.Entity)
+
+    if kind:
+        query = query.where(models.Entity.kind == models.EntityKind(kind))
+    if sport:
+        query = query.where(models.Entity.sport == sport)
+    if search:
+        query = query.where(models.Entity.name.ilike(f"%{search}%"))
+
+    entities = (await db.scalars(query.order_by(models.Entity.name).offset(skip).limit(limit))).all()
+    return [schemas.EntityOut.model_validate(entity) for entity in entities]
+
+
+@router.post("/", response_model=schemas.EntityOut, status_code=status.HTTP_201_CREATED)
+async def create_entity(
+    body: schemas.EntityCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user: models.User = Depends(require_admin)
+):
+    """Create a canonical entity with optional aliases. Admins only."""
+    entity = models.Entity(
+        kind=models.EntityKind(body.kind),
+        sport=body.sport,
+        name=body.name
+    )
+    db.add(entity)
+    await db.flush()
+
+    for alias in {normalize_name(a) for a in body.aliases} - {"", normalize_name(body.name)}:
+        db.add(models.EntityAlias(
+            entity_id=entity.id,
+            alias=alias,
+            status=models.AliasStatus.CONFIRMED
+        ))
+
+    await db.commit()
+    await db.refresh(entity)
+    invalidate_entity_index()
+
+    return schemas.EntityOut.model_validate(entity)
+
+
+@router.post("/resolve", response_model=list[schemas.EntityMatchOut])
+async def resolve_names(
+    body: schemas.EntityResolveRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user: models.User = Depends(current_user)
+):
+    """Resolve a batch of names against the catalog without recording aliases."""
+    index = await db.run_sync(get_entity_index)
+    kind = models.EntityKind(body.kind)
+    # Fuzzy matching is CPU-bound; keep it off the event loop
+    matches = await run_in_threadpool(index.resolve_many, body.names, kind, body.sport)
+
+    results = []
+    for name in body.names:
+        match = matches.get(name)
+        results.append(schemas.EntityMatchOut(
+            name=name,
+            entity_id=match.entity_id if match else None,
+            canonical_name=match.name if match else None,
+            score=match.score if match else None
+        ))
+    return results
+
+
+@router.get("/review", response_model=list[schemas.EntityAliasOut])
+async def list_pending_aliases(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    user: models.User = Depends(require_admin)
+):
+    """List low-confidence aliases awaiting review, least confident first. Admins only."""
+    rows = (await db.execute(select(models.EntityAlias, models.Entity.name).join(
+        models.Entity,
+        models.EntityAlias.entity_id == models.Entity.id
+    ).where(
+        models.EntityAlias.status == models.AliasStatus.PENDING
+    ).order_by(
+        models.EntityAlias.confidence,
+        models.EntityAlias.created_at
+    ).offset(skip).limit(limit))).all()
+
+    return [_alias_out(alias, entity_name) for alias, entity_name in rows]
+
+
+@router.post("/review/{alias_id}", response_model=schemas.EntityAliasOut)
+async def review_alias(
+    alias_id: UUID,
+    body: schemas.EntityAliasReview,
+    db: AsyncSession = Depends(get_async_db),
+    user: models.User = Depends(require_admin)
+):
+    """Confirm, reject, or reassign a learned alias. Admins only.
+
+    Rejecting or reassigning also re-points every user's bets that were
+    resolved through this alias.
+    """
+    alias = await db.scalar(select(models.EntityAlias).where(models.EntityAlias.id == alias_id))
+    if not alias:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alias not found"
+        )
+
+    if body.action == "reassign":
+        if body.entity_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="entity_id required when action is reassign"
+            )
+        target = await db.scalar(select(models.Entity).where(models.Entity.id == body.entity_id))
+        if not target:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Entity not found"
+            )
+
+    if body.action in ("reject", "reassign"):
+        new_entity_id = body.entity_id if body.action == "reassign" else None
+
+        # Bets store the raw name, so find the spellings that normalize to this alias
+        raw_names = [
+            name for name in await db.scalars(select(models.Bet.team_or_player).where(
+                models.Bet.entity_id == alias.entity_id
+            ).distinct())
+            if normalize_name(name) == alias.alias
+        ]
+        if raw_names:
+            await db.execute(update(models.Bet).where(
+                models.Bet.entity_id == alias.entity_id,
+                models.Bet.team_or_player.in_(raw_names)
+            ).values(entity_id=new_entity_id).execution_options(synchronize_session=False))
+
+    if body.action == "confirm":
+        alias.status = models.AliasStatus.CONFIRMED
+    elif body.action == "reject":
+        alias.status = models.AliasStatus.REJECTED
+    else:
+        alias.entity_id = body.entity_id
+        alias.status = models.AliasStatus.CONFIRMED
+
+    await db.commit()
+    alias = (await db.scalars(select(models.EntityAlias).options(
+        joinedload(models.EntityAlias.entity)
+    ).where(models.EntityAlias.id == alias_id).execution_options(populate_existing=True))).one()
+    invalidate_entity_index()
+
+    return _alias_out(alias, alias.entity.name)
@@ -1,135 +1,180 @@
 """Groups API endpoints for social competition."""
+import asyncio
 import secrets
-from datetime import datetime
+import uuid
+from datetime import datetime, timedelta
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, case, desc
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy import func, extract, desc, select, exists, and_, delete
+from app.db.replicas import get_read_db
+from app.db.session import get_async_db
+from app.core.config import settings
+from app.core.pubsub import get_bus
 from app.core.security import current_user
 from app.db import models
 from app import schemas
+from app.utils import calculate_roi, calculate_hit_rate
+from app.utils.leaderboard import (
+    LEADERBOARD_SORTS,
+    query_leaderboard,
+    query_leaderboard_history,
+)
+from app.utils.group_access import GroupAccess, get_group_access, invalidate_group_access
+from app.utils.group_feed import query_feed
+from app.utils.head_to_head import (
+    COMPARE_BUCKETS,
+    query_member_totals,
+    query_pnl_series,
+    query_shared_selections,
+)
+from app.utils.leaderboard_stream import compute_snapshot, format_sse, group_channel, snapshot_message
+from app.utils.monthly_stats import TOP_SPORT_ORDERINGS
+from app.utils.periods import current_month, month_bounds, month_range, resolve_period
 
 router = APIRouter()
 
+# Fresh invite codes to try before giving up on a create
+INVITE_CODE_ATTEMPTS = 5
+
 
 def generate_invite_code() -> str:
     """Generate a unique invite code."""
     return secrets.token_urlsafe(6)
 
 
+async def require_member(db: AsyncSession, group_id: UUID, user: models.User) -> GroupAccess:
+    """Return the group if the user belongs to it, else raise 404/403."""
+    group = await db.run_sync(get_group_access, group_id, user.id)
+    if group is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Group not found"
+        )
+    if not group.is_member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not a member of this group"
+        )
+    return group
+
+
 @router.post("/", response_model=schemas.GroupOut, status_code=status.HTTP_201_CREATED)
-def create_group(
+async def create_group(
     body: schemas.GroupCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: models.User = Depends(current_user)
 ):
     """Create a new group."""
-    # Generate unique invite code
-    invite_code = generate_invite_code()
-    while db.query(models.Group).filter(models.Group.invite_code == invite_code).first():
-        invite_code = generate_invite_code()
-
-    # Create group
-    group = models.Group(
-        name=body.name,
-        description=body.description,
-        owner_id=user.id,
-        invite_code=invite_code
-    )
-    db.add(group)
-    db.flush()
-
-    # Add owner as first member
-    member = models.GroupMember(
-        group_id=group.id,
-        user_id=user.id
-    )
-    db.add(member)
-    db.commit()
-    db.refresh(group)
+    for attempt in range(INVITE_CODE_ATTEMPTS):
+        # Create group with the owner as first member; ids are assigned
+        # here so both rows go out in one flush
+        group = models.Group(
+            id=uuid.uuid4(),
+            name=body.name,
+            description=body.description,
+            owner_id=user.id,
+            invite_code=generate_invite_code(),
+            created_at=datetime.utcnow()
+        )
+        db.add(group)
+        db.add(models.GroupMember(group_id=group.id, user_id=user.id))
+        try:
+            await db.flush()
+            break
+        except IntegrityError:
+            # Invite code collision; the unique index catches it
+            await db.rollback()
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not allocate an invite code, please retry"
+        )
 
-    # Return group with member count
     result = schemas.GroupOut.model_validate(group)
     result.member_count = 1
+    await db.commit()
     return result
 
 
 @router.post("/join", response_model=schemas.GroupOut)
-def join_group(
+async def join_group(
     body: schemas.GroupJoin,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: models.User = Depends(current_user)
 ):
     """Join a group using invite code."""
-    # Find group by invite code
-    group = db.query(models.Group).filter(
+    # Find group by invite code, with membership and member count
+    member_count = select(func.count()).where(
+        models.GroupMember.group_id == models.Group.id
+    ).correlate(models.Group).scalar_subquery()
+    is_member = exists().where(
+        models.GroupMember.group_id == models.Group.id,
+        models.GroupMember.user_id == user.id
+    )
+    row = (await db.execute(select(
+        models.Group,
+        member_count.label('member_count'),
+        is_member.label('is_member')
+    ).where(
         models.Group.invite_code == body.invite_code
-    ).first()
+    ))).first()
 
-    if not group:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Group not found with that invite code"
         )
 
-    # Check if already a member
-    existing = db.query(models.GroupMember).filter(
-        models.GroupMember.group_id == group.id,
-        models.GroupMember.user_id == user.id
-    ).first()
-
-    if existing:
+    group, member_count, already_member = row
+    if already_member:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You are already a member of this group"
         )
 
-    # Add as member
-    member = models.GroupMember(
-        group_id=group.id,
-        user_id=user.id
-    )
-    db.add(member)
-    db.commit()
-
-    # Get member count
-    member_count = db.query(func.count(models.GroupMember.user_id)).filter(
-        models.GroupMember.group_id == group.id
-    ).scalar()
-
     result = schemas.GroupOut.model_validate(group)
-    result.member_count = member_count
+    result.member_count = member_count + 1
+    user_id = user.id
+
+    # Add as member; the primary key rejects a concurrent duplicate join
+    db.add(models.GroupMember(group_id=result.id, user_id=user_id))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You are already a member of this group"
+        )
+    invalidate_group_access(result.id, user_id)
+
     return result
 
 
 @router.get("/", response_model=list[schemas.GroupOut])
-def list_groups(
-    db: Session = Depends(get_db),
+async def list_groups(
+    db: AsyncSession = Depends(get_async_db),
     user: models.User = Depends(current_user)
 ):
     """List all groups user belongs to."""
-    # Get groups where user is a member
-    memberships = db.query(models.GroupMember).filter(
-        models.GroupMember.user_id == user.id
-    ).all()
-
-    group_ids = [m.group_id for m in memberships]
-
-    if not group_ids:
-        return []
-
-    # Get groups with member counts
-    groups = db.query(
+    mine = aliased(models.GroupMember)
+    groups = (await db.execute(select(
         models.Group,
         func.count(models.GroupMember.user_id).label('member_count')
     ).join(
-        models.GroupMember
-    ).filter(
-        models.Group.id.in_(group_ids)
+        mine,
+        and_(mine.group_id == models.Group.id, mine.user_id == user.id)
+    ).join(
+        models.GroupMember,
+        models.GroupMember.group_id == models.Group.id
     ).group_by(
         models.Group.id
-    ).all()
+    ))).all()
 
     results = []
     for group, member_count in groups:
@@ -141,203 +186,452 @@ def list_groups(
 
 
 @router.get("/{group_id}", response_model=schemas.GroupDetailOut)
-def get_group(
+async def get_group(
     group_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: models.User = Depends(current_user)
 ):
     """Get group details with members."""
-    # Check if user is a member
-    membership = db.query(models.GroupMember).filter(
-        models.GroupMember.group_id == group_id,
-        models.GroupMember.user_id == user.id
-    ).first()
-
-    if not membership:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You are not a member of this group"
-        )
-
-    # Get group
-    group = db.query(models.Group).filter(models.Group.id == group_id).first()
-    if not group:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found"
-        )
+    group = await require_member(db, group_id, user)
 
     # Get all members with user details
-    members = db.query(
-        models.GroupMember,
-        models.User
+    members = (await db.execute(select(
+        models.GroupMember.joined_at,
+        models.User.id,
+        models.User.email
     ).join(
         models.User,
         models.GroupMember.user_id == models.User.id
-    ).filter(
+    ).where(
         models.GroupMember.group_id == group_id
-    ).all()
-
-    member_list = []
-    for membership, user_obj in members:
-        member_list.append(schemas.GroupMemberOut(
-            user_id=user_obj.id,
-            email=user_obj.email,
-            joined_at=membership.joined_at
-        ))
+    ))).all()
 
-    result = schemas.GroupDetailOut.model_validate(group)
-    result.member_count = len(member_list)
-    result.members = member_list
+    member_list = [
+        schemas.GroupMemberOut(user_id=member.id, email=member.email, joined_at=member.joined_at)
+        for member in members
+    ]
 
-    return result
+    return schemas.GroupDetailOut(
+        **schemas.GroupOut.model_validate(group).model_dump(exclude={'member_count'}),
+        member_count=len(member_list),
+        members=member_list
+    )
 
 
 @router.delete("/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
-def leave_group(
+async def leave_group(
     group_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: models.User = Depends(current_user)
 ):
     """Leave a group (or delete if owner)."""
-    group = db.query(models.Group).filter(models.Group.id == group_id).first()
+    group = await db.run_sync(get_group_access, group_id, user.id)
     if not group:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Group not found"
         )
 
-    # If owner, delete entire group
+    # If owner, delete entire group; members and stats cascade in the database
     if group.owner_id == user.id:
-        db.delete(group)
-        db.commit()
+        await db.execute(delete(models.Group).where(
+            models.Group.id == group_id
+        ).execution_options(synchronize_session=False))
+        await db.commit()
+        invalidate_group_access(group_id)
         return
 
-    # Otherwise, remove membership
-    membership = db.query(models.GroupMember).filter(
-        models.GroupMember.group_id == group_id,
-        models.GroupMember.user_id == user.id
-    ).first()
-
-    if not membership:
+    if not group.is_member:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not a member of this group"
         )
 
-    db.delete(membership)
-    db.commit()
+    # Otherwise, remove membership
+    user_id = user.id
+    await db.execute(delete(models.GroupMember).where(
+        models.GroupMember.group_id == group_id,
+        models.GroupMember.user_id == user_id
+    ).execution_options(synchronize_session=False))
+    await db.commit()
+    invalidate_group_access(group_id, user_id)
 
 
 @router.get("/{group_id}/leaderboard", response_model=schemas.LeaderboardResponse)
-def get_leaderboard(
+async def get_leaderboard(
     group_id: UUID,
+    period: str = Query("month", description="week, month, season, or custom"),
     month: str | None = None,  # Format: YYYY-MM
-    db: Session = Depends(get_db),
+    week: str | None = None,  # Format: YYYY-Www (ISO week)
+    season: str | None = None,  # Format: YYYY (season starting that September)
+    start: datetime | None = None,  # Custom period start (inclusive)
+    end: datetime | None = None,  # Custom period end (exclusive)
+    sort: str = Query("roi", description="Rank by roi, units, win_rate, or total_bets"),
+    top_sport_by: str = Query("bets", description="Rank top sport by bets or units"),
+    splits: bool = Query(False, description="Include per-sport unit splits"),
+    cursor: int = Query(0, ge=0, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    around_me: int | None = Query(None, ge=0, le=100, description="Return your rank with this many neighbours above and below"),
+    db: AsyncSession = Depends(get_read_db),
     user: models.User = Depends(current_user)
 ):
-    """Get group leaderboard for a given month."""
-    # Check if user is a member
-    membership = db.query(models.GroupMember).filter(
-        models.GroupMember.group_id == group_id,
-        models.GroupMember.user_id == user.id
-    ).first()
+    """Get a page of the group leaderboard for a period (defaults to the current month)."""
+    group = await require_member(db, group_id, user)
 
-    if not membership:
+    if sort not in LEADERBOARD_SORTS:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You are not a member of this group"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort must be one of: {', '.join(LEADERBOARD_SORTS)}"
         )
 
-    # Get group
-    group = db.query(models.Group).filter(models.Group.id == group_id).first()
-    if not group:
+    if top_sport_by not in TOP_SPORT_ORDERINGS:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"top_sport_by must be one of: {', '.join(TOP_SPORT_ORDERINGS)}"
         )
 
-    # Default to current month
-    if not month:
-        month = datetime.utcnow().strftime("%Y-%m")
-
-    # Calculate stats for each member for this month
-    # Join bets, group by user, calculate metrics
-    from sqlalchemy import func, and_
-
-    stats = db.query(
-        models.User.id.label('user_id'),
-        models.User.email,
-        func.count(models.Bet.id).label('total_bets'),
-        func.sum(
-            case((models.Bet.status == 'Won', 1), else_=0)
-        ).label('wins'),
-        func.sum(
-            case((models.Bet.status == 'Lost', 1), else_=0)
-        ).label('losses'),
-        func.sum(models.Bet.result_profit).label('pnl'),
-        func.sum(
-            case(
-                ((models.Bet.status.in_(['Won', 'Lost']), models.Bet.units)),
-                else_=0
-            )
-        ).label('units'),
-        func.sum(
-            case(
-                ((models.Bet.status.in_(['Won', 'Lost']), models.Bet.stake)),
-                else_=0
-            )
-        ).label('total_stake')
-    ).join(
-        models.GroupMember,
-        models.User.id == models.GroupMember.user_id
-    ).outerjoin(
-        models.Bet,
-        and_(
-            models.Bet.user_id == models.User.id,
-            func.to_char(models.Bet.placed_at, 'YYYY-MM') == month
+    try:
+        window = resolve_period(period, month, week, season, start, end)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
-    ).filter(
-        models.GroupMember.group_id == group_id
-    ).group_by(
-        models.User.id,
-        models.User.email
-    ).all()
-
-    # Calculate ROI and win rate, then sort
-    leaderboard = []
-    for row in stats:
-        total_stake = float(row.total_stake or 0)
-        pnl = float(row.pnl or 0)
-        wins = int(row.wins or 0)
-        losses = int(row.losses or 0)
-        total_decided = wins + losses
-
-        roi = (pnl / total_stake * 100) if total_stake > 0 else 0.0
-        win_rate = (wins / total_decided * 100) if total_decided > 0 else 0.0
-
-        leaderboard.append({
-            'user_id': row.user_id,
-            'email': row.email,
-            'roi': round(roi, 2),
-            'units': round(float(row.units or 0), 2),
-            'win_rate': round(win_rate, 2),
-            'total_bets': int(row.total_bets or 0),
-            'wins': wins,
-            'losses': losses,
-            'top_sport': None  # TODO: Calculate top sport
-        })
-
-    # Sort by ROI descending
-    leaderboard.sort(key=lambda x: x['roi'], reverse=True)
-
-    # Add ranks
-    for i, entry in enumerate(leaderboard, start=1):
-        entry['rank'] = i
+
+    leaderboard, total_members = await db.run_sync(
+        query_leaderboard, group_id, window, user.id,
+        sort=sort,
+        top_sport_by=top_sport_by,
+        splits=splits,
+        cursor=cursor,
+        limit=limit,
+        around_me=around_me
+    )
+
+    # Continue after the last entry returned, if any members remain
+    next_cursor = None
+    if leaderboard and leaderboard[-1]['position'] < total_members:
+        next_cursor = leaderboard[-1]['position']
 
     return schemas.LeaderboardResponse(
         group_id=group_id,
         group_name=group.name,
-        month=month,
+        month=window.label,
+        period=window.kind,
+        period_start=window.start,
+        period_end=window.end,
+        sort=sort,
+        total_members=total_members,
+        next_cursor=next_cursor,
         leaderboard=[schemas.LeaderboardEntry(**entry) for entry in leaderboard]
     )
+
+
+# Upper bounds on a single history request
+MAX_HISTORY_MONTHS = 36
+MAX_ROLLING_WINDOWS = 4
+MAX_ROLLING_DAYS = 365
+
+
+def _parse_windows(windows: str) -> list[int]:
+    """Parse a comma-separated list of trailing window lengths in days."""
+    try:
+        days = sorted({int(part) for part in windows.split(",") if part.strip()})
+    except ValueError:
+        raise ValueError("windows must be a comma-separated list of day counts")
+    if len(days) > MAX_ROLLING_WINDOWS or any(d < 1 or d > MAX_ROLLING_DAYS for d in days):
+        raise ValueError(f"windows allows up to {MAX_ROLLING_WINDOWS} values between 1 and {MAX_ROLLING_DAYS}")
+    return days
+
+
+@router.get("/{group_id}/leaderboard/history", response_model=schemas.LeaderboardHistoryResponse)
+async def get_leaderboard_history(
+    group_id: UUID,
+    from_month: str | None = Query(None, alias="from", description="First month, YYYY-MM (defaults to 11 months before to)"),
+    to_month: str | None = Query(None, alias="to", description="Last month, YYYY-MM (defaults to the current month)"),
+    windows: str = Query("30,90", description="Trailing windows in days, comma-separated"),
+    sort: str = Query("roi", description="Rank by roi, units, win_rate, or total_bets"),
+    db: AsyncSession = Depends(get_read_db),
+    user: models.User = Depends(current_user)
+):
+    """Get every member's rank, ROI and units per month, plus trailing windows.
+
+    Months come from precomputed monthly stats and trailing windows
+    from raw bets, ranked together in one statement.
+    """
+    group = await require_member(db, group_id, user)
+
+    if sort not in LEADERBOARD_SORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort must be one of: {', '.join(LEADERBOARD_SORTS)}"
+        )
+
+    try:
+        to_month = to_month or current_month()
+        if from_month is None:
+            from_month = (month_bounds(to_month)[0] - timedelta(days=330)).strftime("%Y-%m")
+        months = month_range(from_month, to_month)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="from and to must be in YYYY-MM format"
+        )
+
+    try:
+        days = _parse_windows(windows)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if not months:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="from must not be after to"
+        )
+    if len(months) > MAX_HISTORY_MONTHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"History is limited to {MAX_HISTORY_MONTHS} months per request"
+        )
+
+    members = {}
+    rows = await db.run_sync(query_leaderboard_history, group_id, months, sort, windows=days)
+    for row in rows:
+        member = members.get(row.user_id)
+        if member is None:
+            member = members[row.user_id] = {
+                'user_id': row.user_id,
+                'email': row.email,
+                'history': [],
+                'rolling': [
+                    schemas.LeaderboardStanding(
+                        period=f"{d}d",
+                        rank=getattr(row, f"rank_{d}"),
+                        roi=round(float(getattr(row, f"roi_{d}")), 2),
+                        units=round(float(getattr(row, f"units_{d}")), 2),
+                        win_rate=round(float(getattr(row, f"win_rate_{d}")), 2),
+                        total_bets=int(getattr(row, f"total_bets_{d}"))
+                    )
+                    for d in days
+                ]
+            }
+        member['history'].append(schemas.LeaderboardStanding(
+            period=row.period,
+            rank=row.rank,
+            roi=round(float(row.roi), 2),
+            units=round(float(row.units), 2),
+            win_rate=round(float(row.win_rate), 2),
+            total_bets=int(row.total_bets)
+        ))
+
+    return schemas.LeaderboardHistoryResponse(
+        group_id=group_id,
+        group_name=group.name,
+        sort=sort,
+        months=months,
+        windows=[f"{d}d" for d in days],
+        members=[schemas.LeaderboardHistoryEntry(**member) for member in members.values()]
+    )
+
+
+@router.get("/{group_id}/leaderboard/stream")
+async def stream_leaderboard(
+    group_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    user: models.User = Depends(current_user)
+):
+    """Stream the current month's leaderboard as Server-Sent Events.
+
+    Sends a snapshot event on connect, then delta events with changed
+    entries and removed user ids whenever members' bets change (at most
+    one per LEADERBOARD_STREAM_INTERVAL_SECONDS), and comment keepalives
+    while idle.
+    """
+    try:
+        await require_member(db, group_id, user)
+    finally:
+        # Release the connection; the stream can stay open for hours
+        await db.close()
+
+    # Subscribe before the snapshot so no update falls between them
+    subscription = get_bus().subscribe(group_channel(group_id))
+    try:
+        month, entries = await run_in_threadpool(compute_snapshot, group_id)
+    except Exception:
+        subscription.close()
+        raise
+
+    async def events():
+        try:
+            yield format_sse("snapshot", snapshot_message(group_id, month, entries))
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.get(),
+                        timeout=settings.LEADERBOARD_STREAM_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(message["type"], message)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/{group_id}/feed", response_model=schemas.FeedResponse)
+async def get_group_feed(
+    group_id: UUID,
+    cursor: int | None = Query(None, ge=1, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    user: models.User = Depends(current_user)
+):
+    """Get a page of the group's activity feed, newest first.
+
+    Entries are written when members place or settle bets, so a page is
+    read straight from the feed whatever the group's size.
+    """
+    await require_member(db, group_id, user)
+
+    rows, next_cursor = await db.run_sync(query_feed, group_id, cursor, limit)
+
+    return schemas.FeedResponse(
+        group_id=group_id,
+        entries=[schemas.FeedEntryOut(**row._asdict()) for row in rows],
+        next_cursor=next_cursor
+    )
+
+
+def _compare_side(user_id: UUID, rows: list) -> schemas.CompareSide:
+    """Build one member's KPIs and breakdowns from their GROUPING SETS rows."""
+    breakdowns = {'sport': [], 'market': []}
+    for row in rows:
+        if row.dimension == 'total':
+            totals = row
+            continue
+
+        key = row.sport if row.dimension == 'sport' else row.market_type
+        if key is None:
+            # A member with no bets still yields one empty row per set
+            continue
+        breakdowns[row.dimension].append(schemas.BreakdownItem(
+            key=key.value,
+            pnl=round(float(row.pnl), 2),
+            roi_pct=calculate_roi(float(row.pnl), float(row.staked)),
+            count=row.total_bets
+        ))
+
+    # Sort by PnL descending, as the analytics breakdown does
+    for items in breakdowns.values():
+        items.sort(key=lambda x: x.pnl, reverse=True)
+
+    return schemas.CompareSide(
+        user_id=user_id,
+        email=totals.email,
+        kpis=schemas.KPIData(
+            totalPnL=round(float(totals.pnl), 2),
+            totalUnits=round(float(totals.units), 2),
+            roi=calculate_roi(float(totals.pnl), float(totals.staked)),
+            hitRate=calculate_hit_rate(totals.wins, totals.losses),
+            avgOdds=round(float(totals.avg_odds), 0),
+            totalBets=totals.total_bets,
+            wonBets=totals.wins,
+            lostBets=totals.losses,
+            pendingBets=totals.pending
+        ),
+        by_sport=breakdowns['sport'],
+        by_market=breakdowns['market']
+    )
+
+
+@router.get("/{group_id}/compare", response_model=schemas.CompareResponse)
+async def compare_members(
+    group_id: UUID,
+    b: UUID = Query(..., description="Member to compare against"),
+    a: UUID | None = Query(None, description="First member (defaults to you)"),
+    bucket: str = Query("week", description="P&L series bucket: day, week, or month"),
+    from_date: datetime | None = Query(None, description="Start date filter"),
+    to_date: datetime | None = Query(None, description="End date filter"),
+    db: AsyncSession = Depends(get_async_db),
+    user: models.User = Depends(current_user)
+):
+    """Compare two group members side by side.
+
+    Returns each member's KPIs and sport/market breakdowns, the selections
+    both backed, and their cumulative P&L on shared time buckets, in a
+    fixed number of queries however many bets they have.
+    """
+    await require_member(db, group_id, user)
+
+    a = a or user.id
+    if a == b:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="a and b must be different members"
+        )
+
+    if bucket not in COMPARE_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"bucket must be one of: {', '.join(COMPARE_BUCKETS)}"
+        )
+
+    # Members outside the group have no rows, which doubles as the check
+    totals = {a: [], b: []}
+    for row in await db.run_sync(query_member_totals, group_id, [a, b], from_date, to_date):
+        totals[row.user_id].append(row)
+
+    if not totals[a] or not totals[b]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Both users must be members of this group"
+        )
+
+    shared = await db.run_sync(query_shared_selections, a, b, from_date, to_date)
+
+    series = {}
+    for row in await db.run_sync(query_pnl_series, [a, b], bucket, from_date, to_date):
+        point = series.setdefault(row.bucket, {'bucket': row.bucket})
+        point['a' if row.user_id == a else 'b'] = round(float(row.cumulative_pnl), 2)
+
+    return schemas.CompareResponse(
+        group_id=group_id,
+        bucket=bucket,
+        a=_compare_side(a, totals[a]),
+        b=_compare_side(b, totals[b]),
+        shared_count=shared[0].shared_count if shared else 0,
+        shared=[
+            schemas.SharedSelection(
+                event_day=row.event_day,
+                sport=row.sport.value,
+                market_type=row.market_type.value,
+                selection=row.selection,
+                a=schemas.SharedBet(
+                    bet_id=row.a_bet_id,
+                    bet_name=row.a_bet_name,
+                    odds_american=row.a_odds_american,
+                    status=row.a_status.value,
+                    result_profit=row.a_result_profit
+                ),
+                b=schemas.SharedBet(
+                    bet_id=row.b_bet_id,
+                    bet_name=row.b_bet_name,
+                    odds_american=row.b_odds_american,
+                    status=row.b_status.value,
+                    result_profit=row.b_result_profit
+                )
+            )
+            for row in shared
+        ],
+        pnl_series=[schemas.ComparePnLPoint(**point) for point in series.values()]
+    )
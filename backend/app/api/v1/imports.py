@@ -1,19 +1,65 @@
 import csv
+import hashlib
+import heapq
 import io
-from datetime import datetime
-from typing import Optional
-
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+import json
+import multiprocessing
+import os
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+from typing import AsyncIterator, BinaryIO, Callable, Iterable, Iterator, Optional, TextIO
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.metrics import registry
 from app.core.security import current_user
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.db import models
 from app import schemas
-from app.utils import calculate_units
+from app.utils import calculate_units, calculate_profit
+from app.utils.entity_resolver import learn_aliases, load_resolution_context, match_bet_rows
+from app.utils.group_feed import record_bet_events
+from app.utils.leaderboard_stream import publish_bet_change
+from app.utils.monthly_stats import month_key, refresh_user_months
+
+import_rows_total = registry.counter(
+    "import_rows_total", "Rows in committed imports, by outcome", ["outcome"]
+)
 
 router = APIRouter()
 
+# Rows returned inline with a preview; the rest are paged from the staged import
+PREVIEW_SAMPLE_SIZE = 50
+
+# Maximum number of fingerprints sent in a single IN (...) lookup
+FINGERPRINT_CHUNK_SIZE = 1000
+
+# Rows per multi-row INSERT statement
+INSERT_BATCH_SIZE = 1000
+
+# Chunks handed to each worker; more than one evens out uneven row sizes
+CHUNKS_PER_WORKER = 4
+
+# Characters of CSV per worker chunk when an upload is parsed as it is read
+PARSE_CHUNK_CHARS = 1_000_000
+
+# Parsed rows deduplicated and inserted together when committing an upload
+STREAM_BATCH_SIZE = 5000
+
+# Process pools keyed by worker count, created lazily and reused across requests
+_parse_executors: dict[int, ProcessPoolExecutor] = {}
+
 
 def parse_csv_row(row: dict, provider: str = "auto") -> Optional[dict]:
     """Parse a CSV row based on provider format."""
@@ -76,24 +122,25 @@ def parse_csv_row(row: dict, provider: str = "auto") -> Optional[dict]:
         }
         bet_data["status"] = status_map.get(status_str, status_str)
 
-        # Date
-        date_str = row.get("Placed") or row.get("Date") or row.get("Time") or datetime.utcnow().isoformat()
-        try:
-            bet_data["placed_at"] = datetime.fromisoformat(date_str)
-        except:
-            # Try common date formats
-            for fmt in ["%Y-%m-%d %H:%M", "%Y-%m-%d", "%m/%d/%Y", "%m/%d/%Y %H:%M"]:
-                try:
-                    bet_data["placed_at"] = datetime.strptime(date_str, fmt)
-                    break
-                except:
-                    continue
-            else:
-                bet_data["placed_at"] = datetime.utcnow()
+        # Date (None if missing or unrecognised; validate_bet_data rejects it)
+        date_str = row.get("Placed") or row.get("Date") or row.get("Time")
+        bet_data["placed_at"] = None
+        if date_str:
+            try:
+                bet_data["placed_at"] = datetime.fromisoformat(date_str)
+            except:
+                # Try common date formats
+                for fmt in ["%Y-%m-%d %H:%M", "%Y-%m-%d", "%m/%d/%Y", "%m/%d/%Y %H:%M"]:
+                    try:
+                        bet_data["placed_at"] = datetime.strptime(date_str, fmt)
+                        break
+                    except:
+                        continue
 
         # Optional fields
         bet_data["league"] = row.get("League")
         bet_data["notes"] = row.get("Notes")
+        bet_data["book_name"] = row.get("Sportsbook") or row.get("Book")
 
         return bet_data
 
@@ -101,113 +148,821 @@ def parse_csv_row(row: dict, provider: str = "auto") -> Optional[dict]:
         return None
 
 
+def _normalize_text(value: Optional[str]) -> str:
+    """Casefold and collapse whitespace so cosmetic differences don't change a fingerprint."""
+    if not value:
+        return ""
+    return " ".join(value.split()).casefold()
+
+
+def compute_fingerprint(bet_data: dict) -> str:
+    """Compute a normalized content fingerprint for a parsed bet.
+
+    The fingerprint covers placement time (to the minute), selection, odds,
+    stake and sportsbook, so the same bet exported twice hashes identically.
+    """
+    selection = bet_data.get("team_or_player") or bet_data.get("bet_name")
+    parts = (
+        bet_data["placed_at"].strftime("%Y-%m-%dT%H:%M"),
+        _normalize_text(selection),
+        str(bet_data["odds_american"]),
+        f"{bet_data['stake']:.2f}",
+        _normalize_text(bet_data.get("book_name")),
+    )
+    return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def validate_bet_data(bet_data: dict) -> Optional[str]:
+    """Return an error message if a parsed row can't be imported, else None."""
+    if bet_data["placed_at"] is None:
+        # Without it the fingerprint would change on every upload
+        return "Missing or unrecognised date"
+    if bet_data["odds_american"] == 0:
+        return "Odds cannot be zero"
+    if bet_data["stake"] <= 0:
+        return "Stake must be positive"
+    return None
+
+
+# (line, parsed, error, raw_row) for one input row; see parse_records
+ParseResult = tuple[int, Optional[dict], Optional[str], Optional[dict]]
+
+
+def parse_records(rows: Iterable[tuple[int, dict]], provider: str = "auto") -> Iterator[ParseResult]:
+    """Parse and validate (line, raw row dict) pairs from any reader.
+
+    Yields one (line, parsed, error, raw_row) tuple per row in input order;
+    the raw row is only kept for errors.
+    """
+    for line, row in rows:
+        parsed = parse_csv_row(row, provider)
+        if parsed is None:
+            yield line, None, "Could not parse row", row
+            continue
+
+        error = validate_bet_data(parsed)
+        if error:
+            yield line, None, error, row
+            continue
+
+        parsed["fingerprint"] = compute_fingerprint(parsed)
+        yield line, parsed, None, None
+
+
+def _numbered_csv_rows(reader: csv.DictReader, line_offset: int = 0) -> Iterator[tuple[int, dict]]:
+    """Pair each CSV record with the file line it ends on."""
+    for row in reader:
+        yield line_offset + reader.line_num, row
+
+
+def _parse_csv_chunk(args: tuple[str, str, str, int]) -> list[ParseResult]:
+    """Parse and validate one chunk of CSV records.
+
+    Runs inside worker processes, so it takes a single picklable tuple of
+    (header, chunk_text, provider, line_offset). line_offset is added to
+    line numbers within header + chunk_text to give lines in the file.
+    """
+    header, chunk_text, provider, line_offset = args
+    reader = csv.DictReader(io.StringIO(header + chunk_text))
+    return list(parse_records(_numbered_csv_rows(reader, line_offset), provider))
+
+
+def _record_end(text: str, start: int, pos: int, final: bool = True) -> int:
+    """Return the offset just past the first record boundary at or after pos.
+
+    start must itself be a record boundary. Quote parity is tracked from
+    there so newlines inside quoted fields are never treated as boundaries.
+    Escaped quotes ("") flip parity twice and are handled for free. When no
+    boundary follows, the end of text is one if final, else -1 is returned.
+    """
+    in_quotes = text.count('"', start, pos) % 2 == 1
+    while True:
+        newline = text.find("\n", pos)
+        if newline == -1:
+            return len(text) if final else -1
+        if text.count('"', pos, newline) % 2 == 1:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            return newline + 1
+        pos = newline + 1
+
+
+def split_csv_records(csv_text: str, parts: int) -> tuple[str, list[str]]:
+    """Split CSV text into a header line and up to `parts` chunks of whole records."""
+    header_end = _record_end(csv_text, 0, 0)
+    header = csv_text[:header_end]
+
+    target_size = max(1, (len(csv_text) - header_end) // max(parts, 1))
+    chunks = []
+    start = header_end
+    while start < len(csv_text):
+        end = _record_end(csv_text, start, min(start + target_size, len(csv_text)))
+        chunks.append(csv_text[start:end])
+        start = end
+
+    return header, chunks
+
+
+def iter_csv_records(text: TextIO, chunk_size: int) -> Iterator[str]:
+    """Read CSV text as the header record, then chunks of whole records.
+
+    Each chunk is at least chunk_size characters (bar the last), so only
+    about one chunk of the file is buffered at a time.
+    """
+    buffer = ""
+    want = 0  # The header is yielded on its own
+    eof = False
+    while buffer or not eof:
+        end = -1
+        if eof or len(buffer) >= want:
+            end = _record_end(buffer, 0, min(want, len(buffer)), final=eof)
+        if end == -1:
+            block = text.read(max(chunk_size, 65536))
+            eof = not block
+            buffer += block
+            continue
+        yield buffer[:end]
+        buffer = buffer[end:]
+        want = chunk_size
+
+
+def _get_parse_executor(workers: int) -> ProcessPoolExecutor:
+    """Return the shared process pool for the given worker count.
+
+    Workers are spawned rather than forked: forking a server with live
+    threads can copy locks held by other threads into the child.
+    """
+    executor = _parse_executors.get(workers)
+    if executor is None:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        _parse_executors[workers] = executor
+    return executor
+
+
+def shutdown_parse_executors() -> None:
+    """Stop every parse worker pool."""
+    while _parse_executors:
+        _, executor = _parse_executors.popitem()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _parse_chunks_in_pool(
+    header: str,
+    chunks: Iterable[str],
+    provider: str,
+    workers: int
+) -> Iterator[ParseResult]:
+    """Parse CSV chunks in the process pool, yielding results in file order.
+
+    At most two chunks per worker are in flight, so chunks can be produced
+    as a file is read. Each chunk is parsed after the header, so it is
+    offset only by the lines of the chunks before it.
+    """
+    if not header.endswith("\n"):
+        header += "\n"
+
+    executor = _get_parse_executor(workers)
+    pending = deque()
+    line_offset = 0
+    try:
+        for chunk in chunks:
+            pending.append(executor.submit(_parse_csv_chunk, (header, chunk, provider, line_offset)))
+            line_offset += chunk.count("\n")
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def parse_csv_text(
+    csv_text: str,
+    provider: str = "auto",
+    workers: Optional[int] = None
+) -> list[ParseResult]:
+    """Parse a whole CSV document into (line, parsed, error, raw_row) tuples.
+
+    Files smaller than IMPORT_PARALLEL_MIN_BYTES are parsed serially. Larger
+    files are split on record boundaries and parsed in a process pool; chunk
+    results are concatenated in submission order, and each chunk's line
+    numbers are offset by the lines before it, so the results match a
+    serial parse exactly.
+    """
+    if workers is None:
+        workers = settings.IMPORT_PARSE_WORKERS or os.cpu_count() or 1
+
+    if workers <= 1 or len(csv_text) < settings.IMPORT_PARALLEL_MIN_BYTES:
+        return _parse_csv_chunk(("", csv_text, provider, 0))
+
+    header, chunks = split_csv_records(csv_text, workers * CHUNKS_PER_WORKER)
+    return list(_parse_chunks_in_pool(header, chunks, provider, workers))
+
+
+def parse_csv_stream(stream: BinaryIO, provider: str, workers: int) -> Iterator[ParseResult]:
+    """Parse a CSV upload in the process pool as it is read.
+
+    Like parse_csv_text, but the file is decoded PARSE_CHUNK_CHARS at a
+    time instead of whole.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        records = iter_csv_records(text, PARSE_CHUNK_CHARS)
+        header = next(records, "")
+        yield from _parse_chunks_in_pool(header, records, provider, workers)
+    finally:
+        text.detach()
+
+
+def _cell_to_str(value) -> Optional[str]:
+    """Render a JSON or spreadsheet value the way it would appear in a CSV."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, (float, Decimal)) and value == int(value):
+        return str(int(value))
+    return str(value)
+
+
+def _stringify_row(row, where: str) -> dict:
+    """Coerce typed values so every reader hands parse_csv_row strings.
+
+    Raises ValueError if the decoded JSON value is not an object.
+    """
+    if not isinstance(row, dict):
+        raise ValueError(f"{where} is not a JSON object")
+    return {str(key): _cell_to_str(value) for key, value in row.items()}
+
+
+# Readers turn an uploaded binary stream into an iterator of (line, raw row
+# dict) pairs. The line is what errors report: the file line for CSV and
+# NDJSON, the item's position for JSON and the sheet row for XLSX.
+# Every reader streams; committed uploads are then parsed, deduplicated and
+# inserted STREAM_BATCH_SIZE rows at a time (see _commit_import).
+ImportReader = Callable[[BinaryIO], Iterator[tuple[int, dict]]]
+IMPORT_READERS: dict[str, ImportReader] = {}
+
+
+def register_reader(*extensions: str) -> Callable[[ImportReader], ImportReader]:
+    """Register a reader for one or more file extensions."""
+    def decorator(reader: ImportReader) -> ImportReader:
+        for extension in extensions:
+            IMPORT_READERS[extension] = reader
+        return reader
+    return decorator
+
+
+@register_reader(".csv")
+def read_csv(stream: BinaryIO) -> Iterator[tuple[int, dict]]:
+    """Stream rows from a CSV file."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        yield from _numbered_csv_rows(csv.DictReader(text))
+    finally:
+        text.detach()
+
+
+@register_reader(".ndjson", ".jsonl")
+def read_ndjson(stream: BinaryIO) -> Iterator[tuple[int, dict]]:
+    """Stream rows from newline-delimited JSON, one object per line."""
+    for line_num, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"line {line_num}: {e}") from e
+        yield line_num, _stringify_row(row, f"line {line_num}")
+
+
+@register_reader(".json")
+def read_json(stream: BinaryIO) -> Iterator[tuple[int, dict]]:
+    """Stream rows from a JSON array, or an object with a "bets" array.
+
+    Uses an incremental parser so the document is never loaded whole.
+    """
+    import ijson
+
+    head = stream.read(64).lstrip()
+    stream.seek(0)
+    prefix = "item" if head.startswith(b"[") else "bets.item"
+
+    try:
+        for item_num, row in enumerate(ijson.items(stream, prefix, use_float=True), start=1):
+            yield item_num, _stringify_row(row, f"item {item_num}")
+    except ijson.JSONError as e:
+        raise ValueError(str(e).strip()) from e
+
+
+@register_reader(".xlsx")
+def read_xlsx(stream: BinaryIO) -> Iterator[tuple[int, dict]]:
+    """Stream rows from the first worksheet of an XLSX workbook.
+
+    The header is the first non-empty row.
+    """
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile) as e:
+        raise ValueError("not a valid XLSX workbook") from e
+    try:
+        # Read-only sheets yield empty rows for gaps, so positions are sheet rows
+        header = None
+        for row_num, values in enumerate(workbook.worksheets[0].iter_rows(values_only=True), start=1):
+            if all(value is None for value in values):
+                continue
+            if header is None:
+                header = [str(cell).strip() if cell is not None else "" for cell in values]
+                continue
+            yield row_num, {key: _cell_to_str(value) for key, value in zip(header, values) if key}
+    finally:
+        workbook.close()
+
+
+def _file_extension(filename: Optional[str]) -> str:
+    """Return the lowercased extension of an uploaded filename."""
+    return os.path.splitext(filename or "")[1].lower()
+
+
+def read_and_parse(
+    stream: BinaryIO,
+    extension: str,
+    provider: str = "auto"
+) -> Iterator[ParseResult]:
+    """Run an uploaded file through its reader and the shared parse stage.
+
+    Returns a lazy iterator; read errors (ValueError, csv.Error) surface as
+    it is consumed. Large CSV files are parsed a few chunks at a time in
+    the process pool; everything else streams through the reader in the
+    consuming thread.
+    """
+    if extension == ".csv":
+        workers = settings.IMPORT_PARSE_WORKERS or os.cpu_count() or 1
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+        stream.seek(0)
+        if workers > 1 and size >= settings.IMPORT_PARALLEL_MIN_BYTES:
+            return parse_csv_stream(stream, provider, workers)
+
+    return parse_records(IMPORT_READERS[extension](stream), provider)
+
+
+async def _read_batches(results: Iterator[ParseResult], size: int) -> AsyncIterator[list[ParseResult]]:
+    """Pull parse results in batches off the event loop.
+
+    Read errors become a 400 response.
+    """
+    while True:
+        try:
+            batch = await run_in_threadpool(lambda: list(islice(results, size)))
+        except (ValueError, csv.Error) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not read file: {e}"
+            )
+        if not batch:
+            return
+        yield batch
+
+
+async def find_existing_fingerprints(db: AsyncSession, user_id: UUID, fingerprints: Iterable[str]) -> set[str]:
+    """Return the subset of fingerprints the user has already imported.
+
+    Lookups are batched into chunks so each chunk costs one indexed
+    set-membership query instead of one query per row.
+    """
+    candidates = list(set(fingerprints))
+    existing = set()
+
+    for start in range(0, len(candidates), FINGERPRINT_CHUNK_SIZE):
+        chunk = candidates[start:start + FINGERPRINT_CHUNK_SIZE]
+        existing.update(await db.scalars(select(models.Bet.fingerprint).where(
+            models.Bet.user_id == user_id,
+            models.Bet.fingerprint.in_(chunk)
+        )))
+
+    return existing
+
+
+def _check_user_settings(user: models.User) -> None:
+    if not user.settings:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User settings not found. Please set your base unit first."
+        )
+
+
+def _insert_bet_rows(db: Session, user: models.User, rows: list[dict]) -> None:
+    """Bulk-insert Bet rows for parsed, deduplicated import rows.
+
+    Written against a sync Session; endpoints call it through run_sync.
+    Monthly stats and group feeds are left to _finish_import.
+    """
+    _check_user_settings(user)
+
+    base_unit = user.settings.base_unit
+    mappings = []
+    for bet_data in rows:
+        # Calculate profit if settled
+        result_profit = None
+        if bet_data["status"] in ["Won", "Lost", "Push", "Void"]:
+            result_profit = calculate_profit(
+                bet_data["odds_american"],
+                bet_data["stake"],
+                bet_data["status"]
+            )
+
+        mappings.append({
+            "user_id": user.id,
+            "bet_name": bet_data["bet_name"],
+            "sport": bet_data["sport"],
+            "league": bet_data.get("league"),
+            "market_type": bet_data["market_type"],
+            "team_or_player": bet_data.get("team_or_player"),
+            "entity_id": bet_data.get("entity_id"),
+            "book_id": bet_data.get("book_id"),
+            "odds_american": bet_data["odds_american"],
+            "stake": bet_data["stake"],
+            "units": calculate_units(bet_data["stake"], base_unit),
+            "status": bet_data["status"],
+            "result_profit": result_profit,
+            "placed_at": bet_data["placed_at"],
+            "notes": bet_data.get("notes"),
+            "fingerprint": bet_data["fingerprint"],
+        })
+
+    # One multi-row INSERT per batch instead of a flush per object
+    for start in range(0, len(mappings), INSERT_BATCH_SIZE):
+        db.execute(insert(models.Bet), mappings[start:start + INSERT_BATCH_SIZE])
+
+
+def _newest_rows(rows: Iterable[dict]) -> list[dict]:
+    """Keep the import rows that reach group feeds (the most recently placed)."""
+    return heapq.nlargest(
+        settings.GROUP_FEED_IMPORT_MAX_EVENTS, rows, key=lambda bet_data: bet_data["placed_at"]
+    )
+
+
+def _finish_import(db: Session, user_id: UUID, months: set, newest: list[dict]) -> None:
+    """Refresh monthly stats and post feed events once an import's rows are inserted."""
+    refresh_user_months(db, user_id, months)
+    if newest:
+        record_bet_events(
+            db, user_id,
+            models.Bet.fingerprint.in_([bet_data["fingerprint"] for bet_data in newest]),
+            limit=settings.GROUP_FEED_IMPORT_MAX_EVENTS
+        )
+
+
+def _insert_bets(db: Session, user: models.User, rows: list[dict]) -> None:
+    """Insert import rows held in memory and finish the import."""
+    _insert_bet_rows(db, user, rows)
+    _finish_import(db, user.id, {month_key(bet_data["placed_at"]) for bet_data in rows}, _newest_rows(rows))
+
+
+def _count_import_rows(imported: int, duplicate: int, invalid: int) -> None:
+    import_rows_total.inc(imported, outcome="imported")
+    import_rows_total.inc(duplicate, outcome="duplicate")
+    import_rows_total.inc(invalid, outcome="invalid")
+
+
+async def _resolve_bet_rows(db: AsyncSession, user_id: UUID, rows: list[dict], learn: bool) -> None:
+    """Map free-text selection, league and book names to catalog entries.
+
+    Only the catalog reads and alias inserts run on the session; fuzzy
+    matching a large import is CPU-bound and runs in a worker thread.
+    """
+    index, books = await db.run_sync(load_resolution_context, user_id)
+    matches = await run_in_threadpool(match_bet_rows, index, books, rows)
+    if learn and matches:
+        await db.run_sync(learn_aliases, index, matches)
+
+
+def _encode_staged_rows(valid_rows: list[dict], invalid_rows: list[dict]) -> bytes:
+    """Serialize staged rows into a compressed JSON payload."""
+    payload = {"valid": valid_rows, "invalid": invalid_rows}
+    return zlib.compress(json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode_staged_rows(payload: bytes) -> tuple[list[dict], list[dict]]:
+    """Inverse of _encode_staged_rows, restoring datetime and UUID fields."""
+    data = json.loads(zlib.decompress(payload))
+    for row in data["valid"]:
+        row["placed_at"] = datetime.fromisoformat(row["placed_at"])
+        for field in ("entity_id", "book_id"):
+            if row.get(field):
+                row[field] = UUID(row[field])
+    return data["valid"], data["invalid"]
+
+
+async def _get_staged_import(db: AsyncSession, import_id: UUID, user: models.User) -> models.StagedImport:
+    """Fetch a live staged import owned by the user."""
+    staged = await db.scalar(select(models.StagedImport).where(
+        models.StagedImport.id == import_id,
+        models.StagedImport.user_id == user.id
+    ))
+
+    if not staged:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Staged import not found"
+        )
+
+    if staged.status != "staged" or staged.expires_at < datetime.utcnow():
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Staged import has already been committed or has expired"
+        )
+
+    return staged
+
+
+async def _commit_import(
+    results: Iterator[ParseResult],
+    user: models.User,
+    db: AsyncSession
+) -> schemas.CSVImportResponse:
+    """Deduplicate, resolve and insert parsed rows a batch at a time.
+
+    Only counts, the first PREVIEW_SAMPLE_SIZE errors and the fingerprints
+    inserted so far are kept across batches, so memory does not grow with
+    the file. Nothing is committed until every batch is in.
+    """
+    imported = set()
+    months = set()
+    newest = []
+    imported_count = duplicate_count = invalid_count = 0
+    invalid_sample = []
+
+    async for batch in _read_batches(results, STREAM_BATCH_SIZE):
+        valid_rows = []
+        for line_num, parsed, error, row in batch:
+            if error:
+                invalid_count += 1
+                if len(invalid_sample) < PREVIEW_SAMPLE_SIZE:
+                    invalid_sample.append({"line": line_num, "error": error, "row": row})
+                continue
+            valid_rows.append(parsed)
+
+        # Skip rows imported by an earlier upload; repeats within this file
+        # are inserted, as they were before uploads were batched
+        existing = await find_existing_fingerprints(db, user.id, (row["fingerprint"] for row in valid_rows))
+        existing -= imported
+        new_rows = [row for row in valid_rows if row["fingerprint"] not in existing]
+        duplicate_count += len(valid_rows) - len(new_rows)
+        if not new_rows:
+            continue
+
+        # Map free-text selection, league and book names to catalog entries
+        await _resolve_bet_rows(db, user.id, new_rows, learn=True)
+        await db.run_sync(_insert_bet_rows, user, new_rows)
+
+        imported_count += len(new_rows)
+        imported.update(row["fingerprint"] for row in new_rows)
+        months.update(month_key(row["placed_at"]) for row in new_rows)
+        newest = _newest_rows(newest + new_rows)
+
+    if imported_count:
+        await db.run_sync(_finish_import, user.id, months, newest)
+        await db.commit()
+        await db.run_sync(publish_bet_change, user.id)
+    _count_import_rows(imported_count, duplicate_count, invalid_count)
+
+    return schemas.CSVImportResponse(
+        valid_rows=[],
+        invalid_rows=invalid_sample,
+        valid_count=imported_count,
+        invalid_count=invalid_count,
+        duplicate_rows=duplicate_count,
+        message=f"Imported {imported_count} bets successfully, skipped {duplicate_count} duplicates"
+    )
+
+
+async def _stage_import(
+    results: Iterator[ParseResult],
+    filename: Optional[str],
+    provider: str,
+    user: models.User,
+    db: AsyncSession
+) -> schemas.CSVImportResponse:
+    """Stage every parsed row server-side and return a sample.
+
+    Unlike a commit this holds the whole file's rows, since they are all
+    stored in the staged payload.
+    """
+    valid_rows = []
+    invalid_rows = []
+
+    async for batch in _read_batches(results, STREAM_BATCH_SIZE):
+        for line_num, parsed, error, row in batch:
+            if error:
+                invalid_rows.append({
+                    "line": line_num,
+                    "error": error,
+                    "row": row
+                })
+                continue
+
+            valid_rows.append(parsed)
+
+    # Skip rows that were already imported by an earlier upload
+    existing = await find_existing_fingerprints(db, user.id, (row["fingerprint"] for row in valid_rows))
+    duplicate_count = sum(1 for row in valid_rows if row["fingerprint"] in existing)
+    new_rows = [row for row in valid_rows if row["fingerprint"] not in existing]
+
+    # Map free-text selection, league and book names to catalog entries
+    await _resolve_bet_rows(db, user.id, new_rows, learn=False)
+
+    await db.execute(delete(models.StagedImport).where(
+        models.StagedImport.expires_at < datetime.utcnow()
+    ).execution_options(synchronize_session=False))
+
+    # Compressing a large import takes a while; keep it off the event loop
+    payload = await run_in_threadpool(_encode_staged_rows, new_rows, invalid_rows)
+    staged = models.StagedImport(
+        user_id=user.id,
+        filename=filename,
+        provider=provider,
+        valid_count=len(new_rows),
+        invalid_count=len(invalid_rows),
+        duplicate_count=duplicate_count,
+        payload=payload,
+        expires_at=datetime.utcnow() + timedelta(hours=settings.STAGED_IMPORT_TTL_HOURS)
+    )
+    db.add(staged)
+    await db.commit()
+
+    return schemas.CSVImportResponse(
+        import_id=staged.id,
+        valid_rows=[schemas.CSVImportRow(**row) for row in new_rows[:PREVIEW_SAMPLE_SIZE]],
+        invalid_rows=invalid_rows[:PREVIEW_SAMPLE_SIZE],
+        valid_count=len(new_rows),
+        invalid_count=len(invalid_rows),
+        duplicate_rows=duplicate_count,
+        message=f"Preview: {len(new_rows)} valid, {len(invalid_rows)} invalid, {duplicate_count} duplicate rows"
+    )
+
+
+async def _import_file(
+    file: UploadFile,
+    provider: str,
+    commit: bool,
+    user: models.User,
+    db: AsyncSession
+) -> schemas.CSVImportResponse:
+    """Read, parse, deduplicate and then commit or stage an uploaded file."""
+    extension = _file_extension(file.filename)
+    if extension not in IMPORT_READERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type. Supported: {', '.join(sorted(IMPORT_READERS))}"
+        )
+
+    # Parsing is lazy and runs off the event loop as batches are pulled
+    results = read_and_parse(file.file, extension, provider)
+    try:
+        if commit:
+            return await _commit_import(results, user, db)
+        return await _stage_import(results, file.filename, provider, user, db)
+    finally:
+        results.close()
+
+
+@router.post("/file", response_model=schemas.CSVImportResponse)
+async def import_file(
+    file: UploadFile = File(...),
+    provider: str = "auto",
+    commit: bool = False,
+    user: models.User = Depends(current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Import bets from a CSV, NDJSON, JSON or XLSX file.
+
+    Args:
+        file: The file to import; the format is chosen by extension
+        provider: Provider format (auto, dk, fd, mgm)
+        commit: If True, import the bets. If False, stage them for preview
+            and later commit via POST /imports/{import_id}/commit.
+    """
+    return await _import_file(file, provider, commit, user, db)
+
+
 @router.post("/csv", response_model=schemas.CSVImportResponse)
 async def import_csv(
     file: UploadFile = File(...),
     provider: str = "auto",
     commit: bool = False,
     user: models.User = Depends(current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Import bets from a CSV file.
 
     Args:
         file: The CSV file to import
         provider: Provider format (auto, dk, fd, mgm)
-        commit: If True, import the bets. If False, just preview.
+        commit: If True, import the bets. If False, stage them for preview
+            and later commit via POST /imports/{import_id}/commit.
     """
-    if not file.filename.endswith('.csv'):
+    if _file_extension(file.filename) != ".csv":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File must be a CSV"
         )
 
-    # Read CSV content
-    content = await file.read()
-    csv_text = content.decode('utf-8')
-    csv_file = io.StringIO(csv_text)
-
-    # Parse CSV
-    reader = csv.DictReader(csv_file)
+    return await _import_file(file, provider, commit, user, db)
 
-    valid_rows = []
-    invalid_rows = []
-
-    for line_num, row in enumerate(reader, start=2):  # Start at 2 (1 is header)
-        parsed = parse_csv_row(row, provider)
 
-        if parsed is None:
-            invalid_rows.append({
-                "line": line_num,
-                "error": "Could not parse row",
-                "row": row
-            })
-            continue
+@router.get("/{import_id}", response_model=schemas.StagedImportOut)
+async def get_staged_import(
+    import_id: UUID,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(PREVIEW_SAMPLE_SIZE, ge=1, le=500),
+    user: models.User = Depends(current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Page through the valid and invalid rows of a staged import."""
+    staged = await _get_staged_import(db, import_id, user)
+    valid_rows, invalid_rows = await run_in_threadpool(_decode_staged_rows, staged.payload)
+
+    return schemas.StagedImportOut(
+        id=staged.id,
+        filename=staged.filename,
+        provider=staged.provider,
+        valid_count=staged.valid_count,
+        invalid_count=staged.invalid_count,
+        duplicate_rows=staged.duplicate_count,
+        created_at=staged.created_at,
+        expires_at=staged.expires_at,
+        offset=offset,
+        limit=limit,
+        valid_rows=[schemas.CSVImportRow(**row) for row in valid_rows[offset:offset + limit]],
+        invalid_rows=invalid_rows[offset:offset + limit]
+    )
 
-        # Validate required fields
-        if parsed["odds_american"] == 0:
-            invalid_rows.append({
-                "line": line_num,
-                "error": "Odds cannot be zero",
-                "row": row
-            })
-            continue
 
-        if parsed["stake"] <= 0:
-            invalid_rows.append({
-                "line": line_num,
-                "error": "Stake must be positive",
-                "row": row
-            })
-            continue
+@router.post("/{import_id}/commit", response_model=schemas.CSVImportResponse)
+async def commit_staged_import(
+    import_id: UUID,
+    user: models.User = Depends(current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Commit a previously staged import without re-uploading the file."""
+    staged = await _get_staged_import(db, import_id, user)
+    valid_rows, invalid_rows = await run_in_threadpool(_decode_staged_rows, staged.payload)
 
-        valid_rows.append(parsed)
+    # Bets may have been imported from another upload since the preview
+    existing = await find_existing_fingerprints(db, user.id, (row["fingerprint"] for row in valid_rows))
+    new_rows = [row for row in valid_rows if row["fingerprint"] not in existing]
+    duplicate_count = staged.duplicate_count + len(valid_rows) - len(new_rows)
 
-    # If commit=True, insert the bets
-    if commit and valid_rows:
-        if not user.settings:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User settings not found. Please set your base unit first."
-            )
+    # Resolve again so fuzzy matches are learned as aliases on commit
+    await _resolve_bet_rows(db, user.id, new_rows, learn=True)
 
-        for bet_data in valid_rows:
-            # Calculate units
-            units = calculate_units(bet_data["stake"], user.settings.base_unit)
-
-            # Calculate profit if settled
-            result_profit = None
-            if bet_data["status"] in ["Won", "Lost", "Push", "Void"]:
-                from app.utils import calculate_profit
-                result_profit = calculate_profit(
-                    bet_data["odds_american"],
-                    bet_data["stake"],
-                    bet_data["status"]
-                )
-
-            # Create bet
-            new_bet = models.Bet(
-                user_id=user.id,
-                bet_name=bet_data["bet_name"],
-                sport=bet_data["sport"],
-                league=bet_data.get("league"),
-                market_type=bet_data["market_type"],
-                team_or_player=bet_data.get("team_or_player"),
-                odds_american=bet_data["odds_american"],
-                stake=bet_data["stake"],
-                units=units,
-                status=bet_data["status"],
-                result_profit=result_profit,
-                placed_at=bet_data["placed_at"],
-                notes=bet_data.get("notes")
-            )
-            db.add(new_bet)
+    if new_rows:
+        await db.run_sync(_insert_bets, user, new_rows)
 
-        db.commit()
+    staged.status = "committed"
+    staged.payload = None
+    await db.commit()
+    if new_rows:
+        await db.run_sync(publish_bet_change, user.id)
+    _count_import_rows(len(new_rows), duplicate_count, len(invalid_rows))
 
     return schemas.CSVImportResponse(
-        valid_rows=[schemas.CSVImportRow(**row) for row in valid_rows],
-        invalid_rows=invalid_rows,
-        message=f"Preview: {len(valid_rows)} valid, {len(invalid_rows)} invalid rows" if not commit
-                else f"Imported {len(valid_rows)} bets successfully"
+        import_id=staged.id,
+        valid_rows=[],
+        invalid_rows=invalid_rows[:PREVIEW_SAMPLE_SIZE],
+        valid_count=len(new_rows),
+        invalid_count=len(invalid_rows),
+        duplicate_rows=duplicate_count,
+        message=f"Imported {len(new_rows)} bets successfully, skipped {duplicate_count} duplicates"
     )
+
+
+@router.delete("/{import_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def discard_staged_import(
+    import_id: UUID,
+    user: models.User = Depends(current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Discard a staged import."""
+    staged = await db.scalar(select(models.StagedImport).where(
+        models.StagedImport.id == import_id,
+        models.StagedImport.user_id == user.id
+    ))
+
+    if not staged:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Staged import not found"
+        )
+
+    await db.delete(staged)
+    await db.commit()
+
+    return None
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.core.security import current_user
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.db import models
 from app import schemas
 
@@ -11,10 +12,10 @@ router = APIRouter()
 
 
 @router.get("/{user_id}/settings", response_model=schemas.UserSettingsOut)
-def get_user_settings(
+async def get_user_settings(
     user_id: UUID,
     current_user_obj: models.User = Depends(current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user settings."""
     # Ensure user can only access their own settings
@@ -24,9 +25,9 @@ def get_user_settings(
             detail="Not authorized to access these settings"
         )
 
-    settings = db.query(models.UserSettings).filter(
+    settings = await db.scalar(select(models.UserSettings).where(
         models.UserSettings.user_id == user_id
-    ).first()
+    ))
 
     if not settings:
         raise HTTPException(
@@ -38,11 +39,11 @@ def get_user_settings(
 
 
 @router.put("/{user_id}/settings", response_model=schemas.UserSettingsOut)
-def update_user_settings(
+async def update_user_settings(
     user_id: UUID,
     body: schemas.UserSettingsUpdate,
     current_user_obj: models.User = Depends(current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update or create user settings."""
     # Ensure user can only update their own settings
@@ -53,9 +54,9 @@ def update_user_settings(
         )
 
     # Get or create settings
-    settings = db.query(models.UserSettings).filter(
+    settings = await db.scalar(select(models.UserSettings).where(
         models.UserSettings.user_id == user_id
-    ).first()
+    ))
 
     if not settings:
         # Create new settings
@@ -72,7 +73,7 @@ def update_user_settings(
         if body.default_book_id is not None:
             settings.default_book_id = body.default_book_id
 
-    db.commit()
-    db.refresh(settings)
+    await db.commit()
+    await db.refresh(settings)
 
     return schemas.UserSettingsOut.model_validate(settings)
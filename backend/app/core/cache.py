@@ -0,0 +1,99 @@
+"""Small in-process caches."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.metrics import registry
+
+_MISSING = object()
+
+cache_hits_total = registry.counter("cache_hits_total", "Lookups answered from a cache", ["cache"])
+cache_misses_total = registry.counter("cache_misses_total", "Lookups a cache could not answer", ["cache"])
+cache_hit_ratio = registry.gauge("cache_hit_ratio", "Hits over all lookups since start", ["cache"])
+cache_entries = registry.gauge("cache_entries", "Entries currently held", ["cache"])
+
+# Caches created with a name, reported in /metrics
+_named_caches: dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds.
+
+    Per process only: invalidations made here are not seen by other
+    workers, so keep ttl short enough that cross-process staleness is
+    acceptable.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        if name is not None:
+            _named_caches[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry, or default if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store an entry, evicting the least recently used if full."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Drop one entry if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def evict(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop every entry whose key matches the predicate."""
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+def _collect_cache_metrics() -> None:
+    for name, cache in _named_caches.items():
+        stats = cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        cache_hits_total.set_total(stats["hits"], cache=name)
+        cache_misses_total.set_total(stats["misses"], cache=name)
+        cache_hit_ratio.set(stats["hits"] / lookups if lookups else 0.0, cache=name)
+        cache_entries.set(stats["size"], cache=name)
+
+
+registry.on_collect(_collect_cache_metrics)
@@ -11,6 +11,80 @@ class Settings(BaseSettings):
     JWT_REFRESH_EXPIRE_MIN: int = 43200  # 30 days
     CORS_ALLOWED_ORIGINS: str = "http://localhost:5173"
 
+    # Database
+    DB_POOL_SIZE: int = 10  # Per worker process, for request handlers
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under load and closed when returned
+    DB_POOL_TIMEOUT: float = 10.0  # Seconds a checkout waits before failing
+    DB_POOL_RECYCLE: int = 1800  # Reopen connections older than this (-1 = never)
+    DB_POOL_PRE_PING: bool = False  # Test each connection on checkout (a round trip per checkout)
+    DB_BACKGROUND_POOL_SIZE: int = 5  # Sync engine for background tasks and scripts
+    DB_PGBOUNCER: bool = False  # Behind PgBouncer (transaction mode): no local pool, no prepared statements
+    ORM_RAISE_ON_LAZY_LOAD: bool = False  # Development: lazy relationship loads raise instead of querying
+    SQL_STATS_ENABLED: bool = True  # Per-request statement count and DB time
+    SQL_STATS_SERVER_TIMING: bool = True  # Report them in a Server-Timing response header
+    SQL_STATS_SLOW_REQUEST_MS: float = 500.0  # Requests with more DB time than this are always logged
+    SQL_STATS_LOG_SAMPLE_RATE: float = 0.01  # Fraction of other requests logged
+    N_PLUS_ONE_THRESHOLD: int = 10  # Warn when one statement shape runs more often than this in a request
+    N_PLUS_ONE_SAMPLE_RATE: float = 0.05  # Fraction of requests checked; 1.0 in development
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0  # /health/deep reports a database unhealthy after this
+
+    # Read replicas
+    DATABASE_REPLICA_URLS: str = ""  # Comma-separated; read-only endpoints are spread across these
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # After a write, that user's reads go to the primary for this long
+    READ_YOUR_WRITES_MAX_USERS: int = 100_000
+    REPLICA_RETRY_SECONDS: float = 30.0  # A replica that failed to connect is skipped for this long
+
+    # Authentication
+    PRINCIPAL_CACHE_SECONDS: float = 60.0  # Other workers see user/settings changes within this
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_SIZE: int = 50000  # Verified tokens kept; each entry lives until its exp
+    TOKEN_CACHE_MAX_SECONDS: float = 3600.0  # Caps how long long-lived refresh tokens stay cached
+    BCRYPT_ROUNDS: int = 12  # Existing hashes are upgraded on login when this changes
+    PASSWORD_HASH_EXECUTOR: str = "process"  # 'process' or 'thread'
+    PASSWORD_HASH_WORKERS: int = 0  # 0 = half the CPU cores
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Waiting jobs allowed before answering 503
+    ADMIN_EMAILS: str = ""  # Comma-separated; these users may edit the shared entity catalog
+
+    # Rate limiting ("METHOD /path": "<count>/<second|minute|hour|day>")
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMITS_BY_IP: dict[str, str] = {
+        "POST /api/v1/auth/login": "20/minute",
+        "POST /api/v1/auth/register": "5/minute",
+        "POST /api/v1/auth/refresh": "30/minute",
+        "POST /api/v1/auth/reset-password": "5/minute",
+    }
+    RATE_LIMITS_BY_EMAIL: dict[str, str] = {
+        "POST /api/v1/auth/login": "5/minute",
+        "POST /api/v1/auth/reset-password": "3/hour",
+    }
+    RATE_LIMIT_MAX_KEYS: int = 100_000  # Buckets kept per process before forced eviction
+    RATE_LIMIT_EVICT_SECONDS: float = 60.0
+
+    # Imports
+    IMPORT_PARSE_WORKERS: int = 0  # 0 = one worker per CPU core
+    IMPORT_PARALLEL_MIN_BYTES: int = 2_000_000  # Smaller files are parsed serially
+    STAGED_IMPORT_TTL_HOURS: int = 24
+
+    # Groups
+    GROUP_ACCESS_CACHE_SECONDS: float = 30.0
+    GROUP_ACCESS_CACHE_SIZE: int = 10000
+
+    # Group activity feeds
+    GROUP_FEED_MAX_ENTRIES: int = 1000  # Kept per group; older entries are trimmed
+    GROUP_FEED_TRIM_EVERY: int = 50  # Trim on roughly one in this many writes
+    GROUP_FEED_MAX_FANOUT_GROUPS: int = 100  # Most recently joined groups a write reaches
+    GROUP_FEED_IMPORT_MAX_EVENTS: int = 20  # Newest bets of an import that reach feeds
+    GROUP_FEED_BIG_WIN_UNITS: float = 5.0
+
+    # Live leaderboards
+    PUBSUB_BACKEND: str = "memory"
+    LEADERBOARD_STREAM_INTERVAL_SECONDS: float = 2.0  # At most one update per group per interval
+    LEADERBOARD_STREAM_KEEPALIVE_SECONDS: float = 15.0
+
+    # Platform percentiles
+    SKETCH_COMPACT_INTERVAL_SECONDS: float = 30.0
+
     # LLM / AI
     ANTHROPIC_API_KEY: str | None = None
     THE_ODDS_API_KEY: str | None = None
@@ -26,5 +100,15 @@ class Settings(BaseSettings):
         """Parse CORS_ALLOWED_ORIGINS into a list."""
         return [origin.strip() for origin in self.CORS_ALLOWED_ORIGINS.split(",")]
 
+    @property
+    def admin_emails_set(self) -> set[str]:
+        """Parse ADMIN_EMAILS into a set of lowercased addresses."""
+        return {email.strip().lower() for email in self.ADMIN_EMAILS.split(",") if email.strip()}
+
+    @property
+    def replica_urls_list(self) -> list[str]:
+        """Parse DATABASE_REPLICA_URLS into a list."""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
 
 settings = Settings()
@@ -0,0 +1,208 @@
+"""In-process metrics registry.
+
+Counters, gauges and histograms keyed by name and label values, safe to
+update from request threads and background tasks. Each process keeps its
+own values; collect() returns every metric for reporting and exposition()
+renders them in the Prometheus text format for GET /metrics.
+
+Values that live elsewhere (pool sizes, cache counters) are copied in by
+callbacks registered with on_collect(), which run before each collection,
+so they cost nothing between scrapes.
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Iterable, Optional
+
+# Latency buckets in seconds, from 1 ms to 10 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    """Base class: a named family of values, one per label combination."""
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def samples(self) -> list[tuple[dict, object]]:
+        """Return (labels, value) pairs; histogram values are (counts, sum, count)."""
+        with self._lock:
+            return [(dict(zip(self.labels, key)), value) for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    """A monotonically increasing count."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels) -> None:
+        """Mirror a count kept elsewhere; it must never decrease."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(Metric):
+    """A value that can go up and down."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative upper-bound buckets."""
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0, 0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def samples(self) -> list[tuple[dict, object]]:
+        with self._lock:
+            return [
+                (dict(zip(self.labels, key)), (list(counts), total, count))
+                for key, (counts, total, count) in self._values.items()
+            ]
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Estimate a quantile as the upper bound of the bucket holding it."""
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+        if not entry:
+            return None
+        counts, _, count = entry
+        target = q * count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            seen += bucket_count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class Registry:
+    """Get-or-create store of metrics by name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], object]] = []
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, description: str, labels: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, description, labels)
+
+    def gauge(self, name: str, description: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, description, labels)
+
+    def histogram(self, name: str, description: str, labels: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, description, labels, buckets)
+
+    def on_collect(self, callback: Callable[[], object]) -> None:
+        """Run callback before each collection, to refresh mirrored values."""
+        with self._lock:
+            self._collectors.append(callback)
+
+    def collect(self) -> list[Metric]:
+        """Return every registered metric, sorted by name."""
+        with self._lock:
+            collectors = list(self._collectors)
+        for callback in collectors:
+            callback()
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+    def exposition(self) -> str:
+        """Render every metric in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        for metric in self.collect():
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.description)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, value in metric.samples():
+                if isinstance(metric, Histogram):
+                    counts, total, count = value
+                    cumulative = 0
+                    for bound, bucket_count in zip(metric.buckets + (math.inf,), counts):
+                        cumulative += bucket_count
+                        bucket_labels = {**labels, "le": _format_value(bound)}
+                        lines.append(f"{metric.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {count}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+registry = Registry()
@@ -0,0 +1,160 @@
+"""Password hashing on a bounded worker pool.
+
+bcrypt is deliberately slow (about 250 ms at 12 rounds), so hashing in
+the request threadpool lets a login burst starve every other endpoint.
+Hashes instead run on a dedicated executor, processes by default so they
+run outside the GIL. It accepts at most its worker count running plus
+PASSWORD_HASH_MAX_QUEUE waiting jobs; past that, callers get
+PasswordHasherBusy straight away (the auth endpoints answer 503) instead
+of queueing without bound.
+
+Verification reports a new hash when the stored one was made with a
+different cost than BCRYPT_ROUNDS, so changing the setting upgrades
+hashes as users log in.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+PASSWORD_HASH_EXECUTORS = ("process", "thread")
+
+hash_seconds = registry.histogram(
+    "password_hash_seconds", "Time spent hashing or verifying a password", ["op"]
+)
+queue_wait_seconds = registry.histogram(
+    "password_hash_queue_wait_seconds", "Time a password job waited for a worker", ["op"]
+)
+in_flight = registry.gauge(
+    "password_hash_in_flight", "Password jobs running or waiting for a worker"
+)
+rejected_total = registry.counter(
+    "password_hash_rejected_total", "Password jobs refused because the queue was full", ["op"]
+)
+rehash_total = registry.counter(
+    "password_rehash_total", "Stored hashes upgraded to the configured cost on login"
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full."""
+
+
+@lru_cache(maxsize=None)
+def _context(rounds: int) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+def _truncate(password: str) -> str:
+    # Bcrypt has a 72 byte limit, truncate if necessary
+    if len(password.encode('utf-8')) > 72:
+        password = password[:72]
+    return password
+
+
+def hash_password_sync(password: str, rounds: Optional[int] = None) -> str:
+    """Hash a password in the calling thread."""
+    return _context(rounds or settings.BCRYPT_ROUNDS).hash(_truncate(password))
+
+
+def verify_password_sync(password: str, hashed: str, rounds: Optional[int] = None) -> tuple[bool, Optional[str]]:
+    """Verify a password in the calling thread.
+
+    Returns whether it matched and, if the stored hash used another cost,
+    a replacement hash at the configured cost.
+    """
+    return _context(rounds or settings.BCRYPT_ROUNDS).verify_and_update(_truncate(password), hashed)
+
+
+def _hash_job(password: str, rounds: int, submitted_at: float) -> tuple[str, float, float]:
+    started_at = time.time()
+    hashed = hash_password_sync(password, rounds)
+    return hashed, started_at - submitted_at, time.time() - started_at
+
+
+def _verify_job(password: str, hashed: str, rounds: int, submitted_at: float) -> tuple[tuple[bool, Optional[str]], float, float]:
+    started_at = time.time()
+    result = verify_password_sync(password, hashed, rounds)
+    return result, started_at - submitted_at, time.time() - started_at
+
+
+class PasswordHasher:
+    """Runs hash and verify jobs on a size-limited executor."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        executor: Optional[str] = None,
+        max_queue: Optional[int] = None
+    ):
+        workers = settings.PASSWORD_HASH_WORKERS if workers is None else workers
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.executor_kind = executor or settings.PASSWORD_HASH_EXECUTOR
+        if self.executor_kind not in PASSWORD_HASH_EXECUTORS:
+            raise ValueError(f"PASSWORD_HASH_EXECUTOR must be one of: {', '.join(PASSWORD_HASH_EXECUTORS)}")
+        self.max_queue = settings.PASSWORD_HASH_MAX_QUEUE if max_queue is None else max_queue
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+        in_flight.dec()
+
+    async def _run(self, op: str, job, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                rejected_total.inc(op=op)
+                raise PasswordHasherBusy()
+            self._pending += 1
+        in_flight.inc()
+
+        try:
+            future = self._get_executor().submit(job, *args, settings.BCRYPT_ROUNDS, time.time())
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        result, waited, took = await asyncio.wrap_future(future)
+        queue_wait_seconds.observe(waited, op=op)
+        hash_seconds.observe(took, op=op)
+        return result
+
+    async def hash(self, password: str) -> str:
+        """Hash a password at the configured cost."""
+        return await self._run("hash", _hash_job, password)
+
+    async def verify(self, password: str, hashed: str) -> tuple[bool, Optional[str]]:
+        """Verify a password; see verify_password_sync for the result."""
+        valid, new_hash = await self._run("verify", _verify_job, password, hashed)
+        if new_hash is not None:
+            rehash_total.inc()
+        return valid, new_hash
+
+    def shutdown(self) -> None:
+        """Stop the workers."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,128 @@
+"""Cached authenticated principals.
+
+get_current_user resolves a token's subject to a Principal: the user's
+id, email and a snapshot of their settings, loaded with one query and
+kept in a bounded LRU+TTL cache so most requests never query users or
+user_settings for identity.
+
+Entries are dropped after commit whenever a User or UserSettings row is
+written or deleted through the ORM in this process. Other workers see the
+change within PRINCIPAL_CACHE_SECONDS. Handlers that need to modify the
+user or settings load the rows themselves.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db import models
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    """Read-only copy of a user's settings (without OAuth secrets)."""
+    user_id: UUID
+    base_unit: float
+    default_book_id: Optional[UUID]
+    preferred_calendar_provider: Optional[str]
+    timezone: str
+    calendar_reminder_min: int
+    google_oauth_connected: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by request handlers."""
+    id: UUID
+    email: str
+    created_at: datetime
+    settings: Optional[SettingsSnapshot]
+
+
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_SECONDS,
+    name="principal"
+)
+
+_PENDING_KEY = "principal_invalidations"
+
+
+def _snapshot(user_settings: Optional[models.UserSettings]) -> Optional[SettingsSnapshot]:
+    if user_settings is None:
+        return None
+    return SettingsSnapshot(
+        user_id=user_settings.user_id,
+        base_unit=user_settings.base_unit,
+        default_book_id=user_settings.default_book_id,
+        preferred_calendar_provider=user_settings.preferred_calendar_provider,
+        timezone=user_settings.timezone,
+        calendar_reminder_min=user_settings.calendar_reminder_min,
+        google_oauth_connected=user_settings.google_oauth_connected,
+        created_at=user_settings.created_at,
+        updated_at=user_settings.updated_at
+    )
+
+
+def load_principal(db: Session, user_id: UUID) -> Optional[Principal]:
+    """Return the cached principal for a user id, or load it with one query.
+
+    Returns None if the user does not exist.
+    """
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = db.query(models.User).options(
+        joinedload(models.User.settings)
+    ).filter(models.User.id == user_id).first()
+    if user is None:
+        return None
+
+    principal = Principal(
+        id=user.id,
+        email=user.email,
+        created_at=user.created_at,
+        settings=_snapshot(user.settings)
+    )
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+def invalidate_principal(user_id: UUID) -> None:
+    """Drop a cached principal now."""
+    principal_cache.pop(user_id)
+
+
+def _queue_invalidation(mapper, connection, target) -> None:
+    """Remember a written user for invalidation once the session commits."""
+    session = inspect(target).session
+    user_id = target.id if isinstance(target, models.User) else target.user_id
+    if session is None:
+        invalidate_principal(user_id)
+    else:
+        session.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+
+for _model in (models.User, models.UserSettings):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _queue_invalidation)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
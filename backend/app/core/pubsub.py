@@ -0,0 +1,148 @@
+"""Publish/subscribe bus with pluggable backends."""
+
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+
+# Messages buffered per subscriber before the oldest are dropped
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+class Subscription(ABC):
+    """A subscriber's view of one channel."""
+
+    @abstractmethod
+    async def get(self) -> dict[str, Any]:
+        """Wait for the next message."""
+
+    @abstractmethod
+    def drain(self) -> list[dict[str, Any]]:
+        """Return every message already received without waiting."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Stop receiving messages."""
+
+
+class PubSubBackend(ABC):
+    """Transport for bus messages.
+
+    publish() may be called from any thread (sync endpoints run in a
+    threadpool); subscribe() is called from the event loop that will
+    consume the subscription.
+    """
+
+    @abstractmethod
+    def publish(self, channel: str, message: dict[str, Any]) -> None:
+        """Deliver a message to every subscriber of a channel."""
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> Subscription:
+        """Subscribe the current event loop to a channel."""
+
+    def has_subscribers(self, channel: str) -> bool:
+        """Return False only if publishing to the channel is certainly a no-op.
+
+        Lets publishers skip work nobody will see. Backends that can't tell
+        (e.g. cross-process brokers) keep this default.
+        """
+        return True
+
+
+class _InMemorySubscription(Subscription):
+    """Subscription backed by an asyncio.Queue on the subscriber's loop."""
+
+    def __init__(self, backend: "InMemoryPubSub", channel: str):
+        self._backend = backend
+        self._channel = channel
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+
+    def _put(self, message: dict[str, Any]) -> None:
+        # A slow consumer loses its oldest messages rather than blocking publishers
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(message)
+
+    def deliver(self, message: dict[str, Any]) -> None:
+        """Hand a message to the subscriber's loop from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # Loop already closed; the subscriber is gone
+            self.close()
+
+    async def get(self) -> dict[str, Any]:
+        return await self._queue.get()
+
+    def drain(self) -> list[dict[str, Any]]:
+        messages = []
+        while not self._queue.empty():
+            messages.append(self._queue.get_nowait())
+        return messages
+
+    def close(self) -> None:
+        self._backend._unsubscribe(self._channel, self)
+
+
+class InMemoryPubSub(PubSubBackend):
+    """Single-process backend; subscribers only see messages published in this process."""
+
+    def __init__(self):
+        self._channels: dict[str, set[_InMemorySubscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = _InMemorySubscription(self, channel)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def has_subscribers(self, channel: str) -> bool:
+        with self._lock:
+            return bool(self._channels.get(channel))
+
+    def _unsubscribe(self, channel: str, subscription: _InMemorySubscription) -> None:
+        with self._lock:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[channel]
+
+
+PUBSUB_BACKENDS: dict[str, Callable[[], PubSubBackend]] = {
+    "memory": InMemoryPubSub,
+}
+
+_bus: Optional[PubSubBackend] = None
+_bus_lock = threading.Lock()
+
+
+def register_backend(name: str, factory: Callable[[], PubSubBackend]) -> None:
+    """Make a backend selectable through settings.PUBSUB_BACKEND."""
+    PUBSUB_BACKENDS[name] = factory
+
+
+def get_bus() -> PubSubBackend:
+    """Return the process-wide bus, creating it from settings on first use."""
+    global _bus
+
+    with _bus_lock:
+        if _bus is None:
+            try:
+                factory = PUBSUB_BACKENDS[settings.PUBSUB_BACKEND]
+            except KeyError:
+                raise ValueError(f"Unknown PUBSUB_BACKEND: {settings.PUBSUB_BACKEND}")
+            _bus = factory()
+        return _bus
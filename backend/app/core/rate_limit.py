@@ -0,0 +1,253 @@
+"""Token-bucket rate limiting as ASGI middleware.
+
+Limits are set per route ("METHOD /path") in settings, keyed by client
+IP (RATE_LIMITS_BY_IP) and, for routes with a JSON "email" field, by the
+normalised email (RATE_LIMITS_BY_EMAIL), so a credential-stuffing burst
+is cut off whether it comes from one address or is spread across many.
+Rejections are answered by the middleware with 429 and Retry-After, before
+routing, so they never reach the database or the password hasher. Bodies
+on routes with an email limit must fit in MAX_INSPECTED_BODY_BYTES; larger
+ones are answered with 413 rather than let through unchecked.
+
+Buckets live in a backend chosen by RATE_LIMIT_BACKEND. The in-memory one
+is per process: with several workers each enforces the limit separately,
+so register a shared backend when that matters.
+"""
+
+import json
+import re
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+RATE_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+# Largest body accepted on routes with an email limit
+MAX_INSPECTED_BODY_BYTES = 4096
+
+rejected_total = registry.counter(
+    "rate_limit_rejected_total", "Requests refused by the rate limiter", ["route", "key"]
+)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A bucket of `burst` tokens refilled at `rate` tokens per second."""
+    burst: float
+    rate: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimit":
+        """Parse "<count>/<second|minute|hour|day>", e.g. "10/minute"."""
+        match = re.fullmatch(r"\s*(\d+)\s*/\s*(second|minute|hour|day)\s*", spec)
+        if not match or int(match.group(1)) == 0:
+            raise ValueError(f"Invalid rate limit {spec!r}; expected e.g. '10/minute'")
+        count = int(match.group(1))
+        return cls(burst=float(count), rate=count / RATE_PERIODS[match.group(2)])
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets."""
+
+    @abstractmethod
+    async def take(self, key: str, limit: RateLimit) -> float:
+        """Take a token from a bucket.
+
+        Returns 0 if the request is allowed, otherwise the seconds until a
+        token will be available.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Buckets in a plain dict, touched only from the event loop.
+
+    The middleware calls take() on the loop thread and it never awaits, so
+    each update runs to completion without a lock. Buckets that have
+    refilled completely carry no state and are dropped every
+    RATE_LIMIT_EVICT_SECONDS, or sooner once RATE_LIMIT_MAX_KEYS is
+    reached; if a flood of distinct keys still leaves too many, the oldest
+    are dropped and those clients start over with a full bucket.
+    """
+
+    def __init__(self, max_keys: Optional[int] = None, evict_seconds: Optional[float] = None):
+        self.max_keys = max_keys or settings.RATE_LIMIT_MAX_KEYS
+        self.evict_seconds = evict_seconds or settings.RATE_LIMIT_EVICT_SECONDS
+        # key -> (tokens, updated_at, full_at)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._next_eviction = time.monotonic() + self.evict_seconds
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        return self.take_now(key, limit, time.monotonic())
+
+    def take_now(self, key: str, limit: RateLimit, now: float) -> float:
+        """Synchronous take() at a given monotonic time."""
+        if now >= self._next_eviction or len(self._buckets) >= self.max_keys:
+            self._evict(now)
+
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            tokens = limit.burst
+        else:
+            tokens = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Re-inserting keeps the dict in least recently used order
+        self._buckets[key] = (tokens, now, now + (limit.burst - tokens) / limit.rate)
+        return 0.0 if allowed else (1 - tokens) / limit.rate
+
+    def _evict(self, now: float) -> None:
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+        overflow = len(self._buckets) - self.max_keys * 9 // 10
+        if overflow > 0:
+            for key in list(self._buckets)[:overflow]:
+                del self._buckets[key]
+        self._next_eviction = now + self.evict_seconds
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+RATE_LIMIT_BACKENDS: dict[str, Callable[[], RateLimitBackend]] = {
+    "memory": InMemoryRateLimitBackend,
+}
+
+
+def register_backend(name: str, factory: Callable[[], RateLimitBackend]) -> None:
+    """Make a backend selectable through settings.RATE_LIMIT_BACKEND."""
+    RATE_LIMIT_BACKENDS[name] = factory
+
+
+def _parse_limits(limits: dict[str, str]) -> dict[tuple[str, str], RateLimit]:
+    parsed = {}
+    for route, spec in limits.items():
+        method, _, path = route.strip().partition(" ")
+        if not path:
+            raise ValueError(f"Invalid rate limit route {route!r}; expected 'METHOD /path'")
+        parsed[(method.upper(), path.strip().rstrip("/") or "/")] = RateLimit.parse(spec)
+    return parsed
+
+
+def _email_from_body(body: bytes) -> Optional[str]:
+    try:
+        email = json.loads(body).get("email")
+    except (ValueError, AttributeError):
+        return None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+async def _respond(send, status: int, detail: str, headers: tuple[tuple[bytes, bytes], ...] = ()) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _reject(send, retry_after: float) -> None:
+    await _respond(send, 429, "Too many requests", (
+        (b"retry-after", str(max(1, int(retry_after + 0.999))).encode()),
+    ))
+
+
+class RateLimitMiddleware:
+    """Applies the configured per-route limits before the app sees a request."""
+
+    def __init__(self, app, backend: Optional[RateLimitBackend] = None):
+        self.app = app
+        self.by_ip = _parse_limits(settings.RATE_LIMITS_BY_IP)
+        self.by_email = _parse_limits(settings.RATE_LIMITS_BY_EMAIL)
+        if backend is None:
+            try:
+                backend = RATE_LIMIT_BACKENDS[settings.RATE_LIMIT_BACKEND]()
+            except KeyError:
+                raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {settings.RATE_LIMIT_BACKEND}")
+        self.backend = backend
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        route = (scope["method"], scope["path"].rstrip("/") or "/")
+        ip_limit = self.by_ip.get(route)
+        email_limit = self.by_email.get(route)
+        if ip_limit is None and email_limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        route_label = " ".join(route)
+        if ip_limit is not None:
+            client_ip = scope["client"][0] if scope.get("client") else "unknown"
+            retry_after = await self.backend.take(f"ip:{route_label}:{client_ip}", ip_limit)
+            if retry_after:
+                rejected_total.inc(route=route_label, key="ip")
+                await _reject(send, retry_after)
+                return
+
+        if email_limit is not None:
+            body, receive = await self._buffer_body(scope, receive)
+            if body is None:
+                # Too large to check, and far larger than any credentials payload
+                rejected_total.inc(route=route_label, key="body_too_large")
+                await _respond(send, 413, "Request body too large")
+                return
+            email = _email_from_body(body)
+            if email is not None:
+                retry_after = await self.backend.take(f"email:{route_label}:{email}", email_limit)
+                if retry_after:
+                    rejected_total.inc(route=route_label, key="email")
+                    await _reject(send, retry_after)
+                    return
+
+        await self.app(scope, receive, send)
+
+    async def _buffer_body(self, scope, receive):
+        """Read a small request body and return it with a receive that replays it.
+
+        Returns None for the body when it is larger than
+        MAX_INSPECTED_BODY_BYTES, and an empty body if the client
+        disconnected.
+        """
+        for name, value in scope["headers"]:
+            if name == b"content-length" and (not value.isdigit() or int(value) > MAX_INSPECTED_BODY_BYTES):
+                return None, receive
+
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                # Client went away; let the app see the disconnect
+                async def replay_disconnect(message=message):
+                    return message
+                return b"", replay_disconnect
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            more_body = message.get("more_body", False)
+            if size > MAX_INSPECTED_BODY_BYTES:
+                return None, receive
+
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return body, replay
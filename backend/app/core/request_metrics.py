@@ -0,0 +1,63 @@
+"""HTTP request metrics as ASGI middleware.
+
+Records each request's latency in a histogram labelled by method, route
+template (e.g. "/api/v1/bets/{bet_id}", so ids don't multiply series)
+and status, and keeps a gauge of requests in flight. Requests that match
+no route are labelled "unmatched". Latency runs until the app returns,
+so streamed responses count their whole stream.
+"""
+
+import time
+
+from app.core.metrics import registry
+
+request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "Time to handle a request", ["method", "route", "status"]
+)
+requests_in_flight = registry.gauge("http_requests_in_flight", "Requests being handled")
+
+
+class RequestMetricsMiddleware:
+    """Times every HTTP request by route template and status."""
+
+    def __init__(self, app):
+        self.app = app
+        # endpoint -> path template, rebuilt when an unknown endpoint shows up
+        self._templates: dict = {}
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        template = self._templates.get(endpoint)
+        if template is None:
+            self._templates = {
+                route.endpoint: route.path
+                for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+            template = self._templates.get(endpoint, "unmatched")
+        return template
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_in_flight.dec()
+            request_duration_seconds.observe(
+                time.perf_counter() - start,
+                method=scope["method"], route=self._route(scope), status=status
+            )
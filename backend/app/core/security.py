@@ -1,37 +1,42 @@
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 from typing import Any
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.db.session import get_db
-from app.db import models
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.passwords import hash_password_sync, verify_password_sync
+from app.core.principal import Principal, load_principal
+from app.db.session import get_async_db
 
 # OAuth2 Bearer token
 security = HTTPBearer()
 
 
 def hash_password(password: str) -> str:
-    """Hash a password for storing."""
-    # Bcrypt has a 72 byte limit, truncate if necessary
-    if len(password.encode('utf-8')) > 72:
-        password = password[:72]
-    return pwd_context.hash(password)
+    """Hash a password for storing.
+
+    Blocks for the full bcrypt cost; request handlers should await
+    password_hasher.hash() instead.
+    """
+    return hash_password_sync(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a stored password against one provided by user."""
-    # Bcrypt has a 72 byte limit, truncate if necessary
-    if len(plain_password.encode('utf-8')) > 72:
-        plain_password = plain_password[:72]
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a stored password against one provided by user.
+
+    Blocks for the full bcrypt cost; request handlers should await
+    password_hasher.verify() instead.
+    """
+    return verify_password_sync(plain_password, hashed_password)[0]
 
 
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
@@ -55,24 +60,118 @@ def create_refresh_token(data: dict[str, Any]) -> str:
     return encoded_jwt
 
 
+class TokenDenyList(ABC):
+    """Revoked tokens, consulted on every decode (cached or not).
+
+    The default keeps revocations in process memory; install a shared
+    implementation with set_token_deny_list() when running several
+    workers so a logout is honoured everywhere.
+    """
+
+    @abstractmethod
+    def deny(self, token_hash: bytes, expires_at: float) -> None:
+        """Revoke a token until its expiry time (epoch seconds)."""
+
+    @abstractmethod
+    def is_denied(self, token_hash: bytes, claims: dict[str, Any]) -> bool:
+        """Return True if the token must be rejected."""
+
+
+class InMemoryTokenDenyList(TokenDenyList):
+    """Per-process deny-list.
+
+    Entries are never evicted before the token expires (dropping one would
+    silently un-revoke it); expired entries are purged as new ones arrive.
+    """
+
+    def __init__(self):
+        self._denied: dict[bytes, float] = {}
+        self._lock = threading.Lock()
+
+    def deny(self, token_hash: bytes, expires_at: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._denied = {key: exp for key, exp in self._denied.items() if exp > now}
+            self._denied[token_hash] = expires_at
+
+    def is_denied(self, token_hash: bytes, claims: dict[str, Any]) -> bool:
+        with self._lock:
+            expires_at = self._denied.get(token_hash)
+        return expires_at is not None and expires_at > time.time()
+
+
+token_deny_list: TokenDenyList = InMemoryTokenDenyList()
+
+# Claims of tokens whose signature has been checked, keyed by the token's
+# SHA-256 and kept no longer than the token's exp. Evicting an entry only
+# costs a re-verification.
+verified_tokens = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_MAX_SECONDS,
+    name="verified_tokens"
+)
+
+
+def set_token_deny_list(deny_list: TokenDenyList) -> None:
+    """Install the deny-list consulted by decode_token."""
+    global token_deny_list
+    token_deny_list = deny_list
+
+
+def token_hash(token: str) -> bytes:
+    """Key a token by digest so raw tokens are never held in memory."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _credentials_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 def decode_token(token: str) -> dict[str, Any]:
-    """Decode and verify a JWT token."""
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGO])
-        return payload
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    """Decode and verify a JWT token.
+
+    The signature is checked once per token; repeat presentations are
+    served from verified_tokens until the token expires. Revoked tokens
+    are rejected either way.
+    """
+    key = token_hash(token)
+    payload = verified_tokens.get(key)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGO])
+        except JWTError:
+            raise _credentials_error()
+        ttl = min(payload.get("exp", 0) - time.time(), settings.TOKEN_CACHE_MAX_SECONDS)
+        if ttl > 0:
+            verified_tokens.set(key, payload, ttl=ttl)
+
+    if token_deny_list.is_denied(key, payload):
+        raise _credentials_error()
+
+    return dict(payload)
+
+
+def revoke_token(token: str) -> None:
+    """Reject a valid token from now until it expires."""
+    payload = decode_token(token)
+    key = token_hash(token)
+    token_deny_list.deny(key, payload.get("exp", time.time()))
+    verified_tokens.pop(key)
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> models.User:
-    """Get the current authenticated user from the JWT token."""
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """Get the current authenticated user from the JWT token.
+
+    Returns a cached Principal (id, email and a settings snapshot) rather
+    than a User row, so a warm request makes no identity queries.
+    """
     token = credentials.credentials
     payload = decode_token(token)
 
@@ -80,13 +179,14 @@ async def get_current_user(
     token_type: str = payload.get("type")
 
     if user_id is None or token_type != "access":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error()
+
+    try:
+        user_id = UUID(user_id)
+    except ValueError:
+        raise _credentials_error()
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.run_sync(load_principal, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -94,8 +194,21 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Commits on this request's session count as this user's writes for
+    # read-your-writes routing (app.db.replicas)
+    db.info["user_id"] = user.id
     return user
 
 
 # Alias for easier imports
 current_user = get_current_user
+
+
+async def require_admin(user: Principal = Depends(get_current_user)) -> Principal:
+    """Get the current user, who must be listed in ADMIN_EMAILS."""
+    if user.email.lower() not in settings.admin_emails_set:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return user
@@ -1,12 +1,19 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Text, Enum as SQLEnum, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Text, Enum as SQLEnum, Boolean, Index, LargeBinary, BigInteger, SmallInteger
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 import enum
 
+from app.core.config import settings
 from app.db.base import Base
 
+# Relationships load lazily on first access unless a query asks for them
+# with joinedload/selectinload. With ORM_RAISE_ON_LAZY_LOAD on, an access
+# that would emit its own SELECT raises instead, so missing eager loads
+# fail loudly in development.
+LAZY_LOAD = "raise" if settings.ORM_RAISE_ON_LAZY_LOAD else "select"
+
 
 class BetStatus(str, enum.Enum):
     """Bet status enumeration."""
@@ -42,6 +49,21 @@ class MarketType(str, enum.Enum):
     OTHER = "Other"
 
 
+class EntityKind(str, enum.Enum):
+    """Canonical entity kind enumeration."""
+    TEAM = "team"
+    PLAYER = "player"
+    LEAGUE = "league"
+
+
+class AliasStatus(str, enum.Enum):
+    """Entity alias review status enumeration."""
+    CONFIRMED = "confirmed"  # Curated or approved by a reviewer
+    AUTO = "auto"  # High-confidence fuzzy match
+    PENDING = "pending"  # Low-confidence fuzzy match awaiting review
+    REJECTED = "rejected"  # Reviewer said this alias is not the entity
+
+
 class User(Base):
     """User model."""
     __tablename__ = "users"
@@ -53,9 +75,9 @@ class User(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     # Relationships
-    settings = relationship("UserSettings", back_populates="user", uselist=False, cascade="all, delete-orphan")
-    bets = relationship("Bet", back_populates="user", cascade="all, delete-orphan")
-    sportsbooks = relationship("Sportsbook", back_populates="user", cascade="all, delete-orphan")
+    settings = relationship("UserSettings", back_populates="user", uselist=False, cascade="all, delete-orphan", lazy=LAZY_LOAD)
+    bets = relationship("Bet", back_populates="user", cascade="all, delete-orphan", lazy=LAZY_LOAD)
+    sportsbooks = relationship("Sportsbook", back_populates="user", cascade="all, delete-orphan", lazy=LAZY_LOAD)
 
 
 class UserSettings(Base):
@@ -77,8 +99,8 @@ class UserSettings(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     # Relationships
-    user = relationship("User", back_populates="settings")
-    default_book = relationship("Sportsbook", foreign_keys=[default_book_id])
+    user = relationship("User", back_populates="settings", lazy=LAZY_LOAD)
+    default_book = relationship("Sportsbook", foreign_keys=[default_book_id], lazy=LAZY_LOAD)
 
 
 class Sportsbook(Base):
@@ -91,8 +113,8 @@ class Sportsbook(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
-    user = relationship("User", back_populates="sportsbooks")
-    bets = relationship("Bet", back_populates="book", foreign_keys="Bet.book_id")
+    user = relationship("User", back_populates="sportsbooks", lazy=LAZY_LOAD)
+    bets = relationship("Bet", back_populates="book", foreign_keys="Bet.book_id", lazy=LAZY_LOAD)
 
 
 class Bet(Base):
@@ -126,12 +148,74 @@ class Bet(Base):
     calendar_timezone = Column(String, nullable=True)  # e.g., 'America/New_York'
     calendar_reminder_min = Column(Integer, nullable=True)  # Reminder minutes before event
 
+    # Canonical team/player resolved from team_or_player
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("entities.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    # Import deduplication
+    fingerprint = Column(String(32), nullable=True)  # Normalized content hash of imported bets
+
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_bets_user_id_fingerprint", "user_id", "fingerprint"),
+        # Covers the leaderboard aggregate so it can run as an index-only scan
+        Index(
+            "ix_bets_user_id_placed_at", "user_id", "placed_at",
+            postgresql_include=["status", "result_profit", "units", "stake"]
+        ),
+    )
+
+    # Relationships
+    user = relationship("User", back_populates="bets", lazy=LAZY_LOAD)
+    book = relationship("Sportsbook", back_populates="bets", foreign_keys=[book_id], lazy=LAZY_LOAD)
+    entity = relationship("Entity", lazy=LAZY_LOAD)
+
+
+class Entity(Base):
+    """Canonical team, player or league that free-text names resolve to."""
+    __tablename__ = "entities"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(SQLEnum(EntityKind), nullable=False)
+    sport = Column(SQLEnum(Sport), nullable=True)  # NULL = applies to any sport
+    name = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
     # Relationships
-    user = relationship("User", back_populates="bets")
-    book = relationship("Sportsbook", back_populates="bets", foreign_keys=[book_id])
+    aliases = relationship("EntityAlias", back_populates="entity", cascade="all, delete-orphan", lazy=LAZY_LOAD)
+
+
+class EntityAlias(Base):
+    """Alternative spelling of a canonical entity, curated or learned from fuzzy matches."""
+    __tablename__ = "entity_aliases"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("entities.id", ondelete="CASCADE"), nullable=False)
+    alias = Column(String, nullable=False, index=True)  # Normalized form
+    confidence = Column(Float, nullable=False, default=100.0)  # Match score 0-100
+    status = Column(SQLEnum(AliasStatus), nullable=False, default=AliasStatus.CONFIRMED)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    entity = relationship("Entity", back_populates="aliases", lazy=LAZY_LOAD)
+
+
+class StagedImport(Base):
+    """Parsed import awaiting commit, so previews don't re-upload or re-parse."""
+    __tablename__ = "staged_imports"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    provider = Column(String, nullable=False, default="auto")
+    status = Column(String, nullable=False, default="staged")  # 'staged', 'committed'
+    valid_count = Column(Integer, nullable=False, default=0)
+    invalid_count = Column(Integer, nullable=False, default=0)
+    duplicate_count = Column(Integer, nullable=False, default=0)
+    payload = Column(LargeBinary, nullable=True)  # zlib-compressed JSON of parsed rows
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
 
 
 class Group(Base):
@@ -146,9 +230,9 @@ class Group(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
-    owner = relationship("User", foreign_keys=[owner_id])
-    members = relationship("GroupMember", back_populates="group", cascade="all, delete-orphan")
-    monthly_stats = relationship("GroupMonthlyStats", back_populates="group", cascade="all, delete-orphan")
+    owner = relationship("User", foreign_keys=[owner_id], lazy=LAZY_LOAD)
+    members = relationship("GroupMember", back_populates="group", cascade="all, delete-orphan", lazy=LAZY_LOAD)
+    monthly_stats = relationship("GroupMonthlyStats", back_populates="group", cascade="all, delete-orphan", lazy=LAZY_LOAD)
 
 
 class GroupMember(Base):
@@ -160,12 +244,17 @@ class GroupMember(Base):
     joined_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
-    group = relationship("Group", back_populates="members")
-    user = relationship("User")
+    group = relationship("Group", back_populates="members", lazy=LAZY_LOAD)
+    user = relationship("User", lazy=LAZY_LOAD)
 
 
 class GroupMonthlyStats(Base):
-    """Monthly statistics for group members."""
+    """Monthly statistics for group members.
+
+    Superseded by UserMonthlyStats: a user's monthly stats are the same in
+    every group, so they are stored once per (user, month). Kept so
+    existing data survives migrations.
+    """
     __tablename__ = "group_monthly_stats"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -183,5 +272,89 @@ class GroupMonthlyStats(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     # Relationships
-    group = relationship("Group", back_populates="monthly_stats")
-    user = relationship("User")
+    group = relationship("Group", back_populates="monthly_stats", lazy=LAZY_LOAD)
+    user = relationship("User", lazy=LAZY_LOAD)
+
+
+class UserMonthlyStats(Base):
+    """Precomputed per-user monthly betting stats backing leaderboards.
+
+    Maintained by app.utils.monthly_stats whenever a bet is written.
+    """
+    __tablename__ = "user_monthly_stats"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month_year = Column(String, primary_key=True)  # e.g., '2025-10'
+    total_bets = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    pushes = Column(Integer, nullable=False, default=0)
+    units = Column(Float, nullable=False, default=0.0)  # Units on Won/Lost bets
+    pnl = Column(Float, nullable=False, default=0.0)
+    staked = Column(Float, nullable=False, default=0.0)  # Stake on Won/Lost bets
+    roi = Column(Float, nullable=False, default=0.0)
+    win_rate = Column(Float, nullable=False, default=0.0)
+    top_sport = Column(String, nullable=True)  # Most-bet sport
+    sport_breakdown = Column(JSONB, nullable=True)  # {sport: {"bets": n, "units": u}}
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_monthly_stats_month_year", "month_year"),
+    )
+
+    # Relationships
+    user = relationship("User", lazy=LAZY_LOAD)
+
+
+class PlatformSketch(Base):
+    """Quantile sketch of one monthly stat across every user on the platform.
+
+    Payload is a serialized app.utils.quantiles.SignedQuantileSketch.
+    Maintained by app.utils.platform_stats from PlatformSketchDelta rows.
+    """
+    __tablename__ = "platform_sketches"
+
+    metric = Column(String, primary_key=True)  # 'roi', 'units', or 'win_rate'
+    month_year = Column(String, primary_key=True)  # e.g., '2025-10'
+    payload = Column(LargeBinary, nullable=False)
+    user_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class PlatformSketchDelta(Base):
+    """A pending change to a platform sketch: a value added (+1) or removed (-1).
+
+    Written alongside user monthly stats so bet writes never contend on the
+    sketch row; folded into PlatformSketch by app.utils.platform_stats.
+    """
+    __tablename__ = "platform_sketch_deltas"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    metric = Column(String, nullable=False)
+    month_year = Column(String, nullable=False)
+    value = Column(Float, nullable=False)
+    weight = Column(SmallInteger, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class GroupFeedEntry(Base):
+    """One item in a group's activity feed.
+
+    Written once per group the user belongs to when the bet event happens
+    (fan-out on write) by app.utils.group_feed, so reading a page never
+    touches bets. Summary is a small snapshot of the bet at that moment.
+    """
+    __tablename__ = "group_feed_entries"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    group_id = Column(UUID(as_uuid=True), ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    bet_id = Column(UUID(as_uuid=True), ForeignKey("bets.id", ondelete="CASCADE"), nullable=True, index=True)
+    kind = Column(String(16), nullable=False)  # 'placed', 'settled', or 'big_win'
+    summary = Column(JSONB, nullable=False)  # {bet_name, sport, odds_american, units, status, profit_units}
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Newest-first pages are a backward scan of this index
+        Index("ix_group_feed_entries_group_id_id", "group_id", "id"),
+    )
@@ -0,0 +1,138 @@
+"""Connection pool instrumentation.
+
+Engines built in app.db.session use the timed pool classes below, which
+record how long each checkout waited for a connection and count checkouts
+that timed out. instrument_engine() adds listeners counting connections
+opened and checked out, and pool_stats() reports the live state of every
+instrumented pool, for GET /metrics/db. It also runs before each /metrics
+scrape to refresh the pool gauges.
+
+Pools are labelled with their engine's pool_logging_name.
+"""
+
+import time
+from typing import Optional, Union
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.metrics import registry
+
+# Checkout waits in seconds, from 0.1 ms up to well past any pool timeout
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+checkout_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ["pool"], WAIT_BUCKETS
+)
+checkout_timeouts_total = registry.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after the pool timeout", ["pool"]
+)
+checkouts_total = registry.counter("db_pool_checkouts_total", "Connections checked out of the pool", ["pool"])
+connects_total = registry.counter("db_pool_connects_total", "New database connections opened", ["pool"])
+in_use = registry.gauge("db_pool_in_use", "Connections currently checked out", ["pool"])
+idle = registry.gauge("db_pool_idle", "Open connections waiting in the pool", ["pool"])
+overflow = registry.gauge("db_pool_overflow", "Connections open beyond pool_size", ["pool"])
+
+_engines: dict[str, Engine] = {}
+
+
+def _pool_name(pool) -> str:
+    return pool.logging_name or "default"
+
+
+class _TimedCheckout:
+    """Times _do_get(), which is where a checkout waits for a free connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            checkout_timeouts_total.inc(pool=_pool_name(self))
+            raise
+        finally:
+            checkout_wait_seconds.observe(time.perf_counter() - start, pool=_pool_name(self))
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_TimedCheckout, NullPool):
+    pass
+
+
+def instrument_engine(engine: Union[Engine, AsyncEngine]) -> None:
+    """Count connects and checkouts on an engine and include it in pool_stats()."""
+    engine = getattr(engine, "sync_engine", engine)
+    name = _pool_name(engine.pool)
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        connects_total.inc(pool=name)
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        checkouts_total.inc(pool=name)
+        in_use.inc(pool=name)
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        in_use.dec(pool=name)
+
+    _engines[name] = engine
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    # Quantiles beyond the last bucket come back as inf, which JSON can't carry
+    if seconds is None or seconds == float("inf"):
+        return None
+    return round(seconds * 1000, 3)
+
+
+def pool_stats() -> list[dict]:
+    """Current state and checkout statistics of every instrumented pool.
+
+    Also refreshes the in_use/idle/overflow gauges. Wait quantiles are
+    the upper bound of the histogram bucket they fall in.
+    """
+    stats = []
+    for name, engine in sorted(_engines.items()):
+        pool = engine.pool
+        entry = {"name": name, "pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            in_use.set(pool.checkedout(), pool=name)
+            idle.set(pool.checkedin(), pool=name)
+            overflow.set(max(0, pool.overflow()), pool=name)
+            entry.update({
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+                "idle": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+            })
+        waits = next((value for labels, value in checkout_wait_seconds.samples() if labels["pool"] == name), None)
+        _, wait_total, wait_count = waits or (None, 0.0, 0)
+        entry.update({
+            "in_use": int(in_use.value(pool=name)),
+            "checkouts": int(checkouts_total.value(pool=name)),
+            "connects": int(connects_total.value(pool=name)),
+            "timeouts": int(checkout_timeouts_total.value(pool=name)),
+            "wait_ms": {
+                "mean": _ms(wait_total / wait_count) if wait_count else None,
+                "p50": _ms(checkout_wait_seconds.quantile(0.5, pool=name)),
+                "p95": _ms(checkout_wait_seconds.quantile(0.95, pool=name)),
+                "p99": _ms(checkout_wait_seconds.quantile(0.99, pool=name)),
+            },
+        })
+        stats.append(entry)
+    return stats
+
+
+registry.on_collect(pool_stats)
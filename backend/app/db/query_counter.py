@@ -0,0 +1,63 @@
+"""Counting the SQL statements a block of code sends.
+
+    with QueryCounter() as counter:
+        client.get("/api/v1/analytics/bankroll", headers=auth)
+    assert counter.count <= 2, counter.statements
+
+query_budget() does the same and raises QueryBudgetExceeded, listing the
+statements, when the block sends more than it is allowed.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.session import async_engine, engine as sync_engine
+
+AnyEngine = Union[Engine, AsyncEngine]
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block sends more SQL statements than its budget."""
+
+
+class QueryCounter:
+    """Records every statement sent through an engine while active.
+
+    Without an engine it watches both the request (async) engine and the
+    sync engine used by background tasks.
+    """
+
+    def __init__(self, engine: Optional[AnyEngine] = None):
+        engines = [engine] if engine is not None else [async_engine, sync_engine]
+        self.engines = [getattr(e, "sync_engine", e) for e in engines]
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._record)
+
+
+@contextmanager
+def query_budget(limit: int, label: str = "block", engine: Optional[AnyEngine] = None) -> Iterator[QueryCounter]:
+    """Fail if the enclosed block sends more than `limit` statements."""
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(f"  {i + 1}. {' '.join(sql.split())[:200]}" for i, sql in enumerate(counter.statements))
+        raise QueryBudgetExceeded(f"{label} sent {counter.count} queries (budget {limit}):\n{listing}")
@@ -0,0 +1,207 @@
+"""Per-request SQL statistics, Server-Timing headers and N+1 detection.
+
+SQLStatsMiddleware gives each HTTP request a RequestSQLStats in a context
+variable. Cursor-execute hooks on every engine add each statement's count
+and duration to it, including statements run through run_sync() and in
+threadpool code, which share the request's context. When the response
+starts, the middleware:
+
+  * adds a Server-Timing header with the statement count, total DB time
+    and slowest statement
+  * logs the stats as one JSON line on "app.sql" for requests that spent
+    more than SQL_STATS_SLOW_REQUEST_MS in the database, plus a
+    SQL_STATS_LOG_SAMPLE_RATE sample of the rest
+  * on a N_PLUS_ONE_SAMPLE_RATE sample of requests, warns about any
+    statement shape executed more than N_PLUS_ONE_THRESHOLD times, with
+    the code that first sent it
+
+Statements sent after the response starts (streamed bodies, background
+tasks) are not counted.
+"""
+
+import functools
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger("app.sql")
+
+n_plus_one_total = registry.counter(
+    "sql_n_plus_one_total", "Statement shapes repeated past N_PLUS_ONE_THRESHOLD in a request", ["endpoint"]
+)
+
+_current: ContextVar[Optional["RequestSQLStats"]] = ContextVar("request_sql_stats", default=None)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+_ROOT_DIR = os.path.dirname(_APP_DIR)
+
+# Bound parameters and literals collapse so repeated queries share a shape;
+# IN lists of any length become one
+_PARAM = re.compile(r"%\(\w+\)s|\$\d+|\?|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=4096)
+def statement_shape(statement: str) -> str:
+    """Normalise a statement so executions differing only in values match."""
+    shape = _PARAM.sub("?", statement)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class RequestSQLStats:
+    """Statements sent while handling one request."""
+    detect_n_plus_one: bool = False
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: Optional[str] = None
+    closed: bool = False
+    # Filled only when detecting: statement -> executions, first call site
+    executions: dict[str, int] = field(default_factory=dict)
+    call_sites: dict[str, str] = field(default_factory=dict)
+
+    def record(self, statement: str, seconds: float) -> None:
+        if self.closed:
+            return
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+        if self.detect_n_plus_one:
+            seen = self.executions.get(statement, 0)
+            if not seen:
+                self.call_sites[statement] = _call_site()
+            self.executions[statement] = seen + 1
+
+    def repeated_shapes(self, threshold: int) -> list[dict]:
+        """Statement shapes executed more than `threshold` times, most first."""
+        by_shape: dict[str, dict] = {}
+        for statement, executions in self.executions.items():
+            entry = by_shape.setdefault(statement_shape(statement), {
+                "count": 0, "call_site": self.call_sites.get(statement)
+            })
+            entry["count"] += executions
+        repeated = [
+            {"shape": shape[:500], **entry}
+            for shape, entry in by_shape.items() if entry["count"] > threshold
+        ]
+        return sorted(repeated, key=lambda entry: -entry["count"])
+
+    def server_timing(self) -> str:
+        value = f'db;dur={self.total_seconds * 1000:.2f};desc="{self.count} queries"'
+        if self.count:
+            value += f", db-slowest;dur={self.slowest_seconds * 1000:.2f}"
+        return value
+
+
+def _frame_site(frame) -> Optional[str]:
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and filename != _THIS_FILE:
+            return f"{os.path.relpath(filename, _ROOT_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _call_site() -> str:
+    """The innermost app frame that led to the current statement.
+
+    Async session calls execute inside a greenlet whose stack ends at
+    SQLAlchemy, so fall back to the suspended parent greenlet, where the
+    awaiting handler is.
+    """
+    site = _frame_site(sys._getframe(1))
+    if site is None:
+        parent = getcurrent().parent
+        if parent is not None:
+            site = _frame_site(parent.gr_frame)
+    return site or "unknown"
+
+
+# Start times live on the execution context, which is discarded with the
+# statement, so one that raises before after_cursor_execute leaves nothing
+# behind on the pooled connection
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    start = getattr(context, "_query_start", None)
+    if stats is not None and start is not None:
+        stats.record(statement, time.perf_counter() - start)
+
+
+class SQLStatsMiddleware:
+    """Collects RequestSQLStats for each HTTP request and reports them."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSQLStats(detect_n_plus_one=random.random() < settings.N_PLUS_ONE_SAMPLE_RATE)
+        token = _current.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                stats.closed = True
+                if settings.SQL_STATS_SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", stats.server_timing().encode()))
+                    message = {**message, "headers": headers}
+                _report(scope, message["status"], stats)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+
+
+def _report(scope, status: int, stats: RequestSQLStats) -> None:
+    endpoint = scope.get("endpoint")
+    endpoint_name = getattr(endpoint, "__name__", None) or "unmatched"
+    request = {"method": scope["method"], "path": scope["path"], "endpoint": endpoint_name}
+
+    if stats.detect_n_plus_one:
+        for repeated in stats.repeated_shapes(settings.N_PLUS_ONE_THRESHOLD):
+            n_plus_one_total.inc(endpoint=endpoint_name)
+            logger.warning(json.dumps({"event": "n_plus_one", **request, **repeated}))
+
+    db_ms = stats.total_seconds * 1000
+    if db_ms > settings.SQL_STATS_SLOW_REQUEST_MS or random.random() < settings.SQL_STATS_LOG_SAMPLE_RATE:
+        logger.info(json.dumps({
+            "event": "sql_stats",
+            **request,
+            "status": status,
+            "queries": stats.count,
+            "db_ms": round(db_ms, 2),
+            "slowest_ms": round(stats.slowest_seconds * 1000, 2),
+            "slowest_statement": _SPACE.sub(" ", stats.slowest_statement or "")[:300] or None,
+        }))
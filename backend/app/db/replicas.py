@@ -0,0 +1,136 @@
+"""Routing read-only endpoints to read replicas.
+
+Endpoints that only read take their session from get_read_db() instead
+of get_async_db(). With DATABASE_REPLICA_URLS set, each such request gets
+a session on the next healthy replica in round-robin order. A replica
+that fails to connect is skipped for REPLICA_RETRY_SECONDS, and when no
+replica can serve, the read goes to the primary.
+
+Replicas lag the primary, so a user who has just written reads from the
+primary for READ_YOUR_WRITES_SECONDS. A write is noticed when a request
+session tagged with the user's id by get_current_user commits. The
+window is tracked per process: with several workers, a read that lands
+on a different worker from the write can still see the replica's lag.
+"""
+
+import itertools
+import time
+from typing import AsyncIterator, Optional
+
+from fastapi import Depends
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.principal import Principal
+from app.core.security import get_current_user
+from app.db.session import get_async_db, replica_engines
+
+reads_total = registry.counter(
+    "db_reads_total", "Read-only requests by where they were served", ["target"]
+)
+
+# user id -> True while that user's reads must see their own writes
+recent_writers = TTLCache(settings.READ_YOUR_WRITES_MAX_USERS, settings.READ_YOUR_WRITES_SECONDS)
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_writer(session: Session) -> None:
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        recent_writers.set(user_id, True)
+
+
+class ReplicaSet:
+    """Round-robin over replica engines, skipping ones that recently failed.
+
+    Used only from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], retry_seconds: float):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._turn = itertools.count()
+        self._down_until: dict[int, float] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def candidates(self) -> list[AsyncEngine]:
+        """Healthy replicas, starting from the next one in turn."""
+        if not self.engines:
+            return []
+        start = next(self._turn) % len(self.engines)
+        now = time.monotonic()
+        ordered = self.engines[start:] + self.engines[:start]
+        return [engine for engine in ordered if self._down_until.get(id(engine), 0.0) <= now]
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        self._down_until[id(engine)] = time.monotonic() + self.retry_seconds
+
+    def status(self) -> list[dict]:
+        """Health of each replica, for /metrics/db."""
+        now = time.monotonic()
+        status = []
+        for engine in self.engines:
+            retry_in = self._down_until.get(id(engine), 0.0) - now
+            status.append({
+                "name": engine.pool.logging_name,
+                "healthy": retry_in <= 0,
+                "retry_in_seconds": round(retry_in, 1) if retry_in > 0 else None,
+            })
+        return status
+
+
+replica_set = ReplicaSet(replica_engines, settings.REPLICA_RETRY_SECONDS)
+
+
+async def get_read_db(
+    user: Principal = Depends(get_current_user),
+    primary: AsyncSession = Depends(get_async_db)
+) -> AsyncIterator[AsyncSession]:
+    """Dependency for read-only endpoints: a replica session where possible.
+
+    Reads kept on the primary share the request's get_async_db() session.
+    Never write through this session.
+    """
+    engine, connection = None, None
+    if not replica_set:
+        target = "primary"
+    elif recent_writers.get(user.id):
+        target = "primary_recent_write"
+    else:
+        engine, connection = await _connect_replica()
+        target = "replica" if connection is not None else "primary_fallback"
+    reads_total.inc(target=target)
+
+    if connection is None:
+        yield primary
+        return
+
+    try:
+        async with AsyncSession(bind=connection, autoflush=False, expire_on_commit=False) as db:
+            yield db
+    except exc.DBAPIError as e:
+        # The replica went away mid-request; stop sending reads to it
+        if e.connection_invalidated:
+            replica_set.mark_down(engine)
+        raise
+    finally:
+        await connection.close()
+
+
+async def _connect_replica() -> tuple[Optional[AsyncEngine], Optional[AsyncConnection]]:
+    """Check a connection out of the next replica that can serve one."""
+    for engine in replica_set.candidates():
+        try:
+            return engine, await engine.connect()
+        except exc.TimeoutError:
+            # Pool exhausted: the replica is busy, not broken
+            continue
+        except (exc.DBAPIError, OSError):
+            replica_set.mark_down(engine)
+    return None, None
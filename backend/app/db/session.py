@@ -1,18 +1,79 @@
+from typing import AsyncIterator, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.core.config import settings
+from app.db.pool_metrics import (
+    TimedAsyncAdaptedQueuePool,
+    TimedNullPool,
+    TimedQueuePool,
+    instrument_engine,
+)
+
+
+def engine_options(name: str, is_async: bool = False, pool_size: Optional[int] = None) -> dict:
+    """Pool and driver options for an engine, from settings.
 
-# Create SQLAlchemy engine
+    `name` labels the pool in /metrics/db.
+    """
+    if settings.DB_PGBOUNCER:
+        # PgBouncer owns the pooling, and in transaction mode consecutive
+        # statements may reach different server connections, so psycopg
+        # must not prepare statements on them
+        return {
+            "poolclass": TimedNullPool,
+            "pool_logging_name": name,
+            "connect_args": {"prepare_threshold": None},
+        }
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_logging_name": name,
+        "pool_size": pool_size or settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# Create SQLAlchemy engine (background tasks, scripts and migrations)
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
     echo=False,  # Set to True for SQL query logging
+    **engine_options("sync", pool_size=settings.DB_BACKGROUND_POOL_SIZE)
 )
+instrument_engine(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers. psycopg 3 serves both; a
+# postgresql+psycopg URL selects its asyncio driver here.
+async_engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=False,
+    **engine_options("async", is_async=True)
+)
+instrument_engine(async_engine)
+
+# Read replicas, used only by read-only endpoints (see app.db.replicas)
+replica_engines = [
+    create_async_engine(url, echo=False, **engine_options(f"replica{i}", is_async=True))
+    for i, url in enumerate(settings.replica_urls_list)
+]
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine)
+
+# Objects stay loaded after commit: touching an expired attribute would
+# need implicit IO, which an AsyncSession cannot do outside run_sync()
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 
 def get_db() -> Session:
     """Dependency to get database session."""
@@ -23,6 +84,16 @@ def get_db() -> Session:
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency to get an async database session.
+
+    Helpers written against a sync Session run on the same connection via
+    `await db.run_sync(helper, ...)`.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 async def init_db():
     """Initialize database (create tables if they don't exist)."""
     # Import models to register them with Base
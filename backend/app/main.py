@@ -1,9 +1,24 @@
-from fastapi import FastAPI
+import asyncio
+import time
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from app.core.config import settings
-from app.db.session import init_db
-from app.api.v1 import auth, bets, analytics, imports, sportsbooks, users, groups, calendar
+from app.core.metrics import registry
+from app.core.passwords import password_hasher
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.request_metrics import RequestMetricsMiddleware
+from app.db.pool_metrics import pool_stats
+from app.db.query_stats import SQLStatsMiddleware
+from app.db.replicas import replica_set
+from app.db.session import async_engine, init_db, replica_engines
+from app.utils.leaderboard_stream import leaderboard_broadcaster
+from app.utils.platform_stats import sketch_compactor
+from app.api.v1 import auth, bets, analytics, imports, sportsbooks, users, groups, calendar, entities
 
 # Create FastAPI application
 app = FastAPI(
@@ -12,6 +27,15 @@ app = FastAPI(
     description="REST API for tracking sports betting performance"
 )
 
+# Innermost, so Server-Timing is added to every response the app sends
+app.add_middleware(SQLStatsMiddleware)
+
+# Inside the rate limiter: rejected requests are counted there instead
+app.add_middleware(RequestMetricsMiddleware)
+
+# Rate limits run inside CORS so 429s still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +50,20 @@ app.add_middleware(
 async def startup():
     """Initialize application on startup."""
     await init_db()
+    leaderboard_broadcaster.start()
+    sketch_compactor.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background tasks on shutdown."""
+    await leaderboard_broadcaster.stop()
+    await sketch_compactor.stop()
+    password_hasher.shutdown()
+    imports.shutdown_parse_executors()
+    await async_engine.dispose()
+    for engine in replica_engines:
+        await engine.dispose()
 
 
 @app.get("/")
@@ -44,6 +82,59 @@ def health_check():
     return {"status": "healthy"}
 
 
+async def _check_database(engine: AsyncEngine) -> dict:
+    """Run SELECT 1 on an engine within HEALTH_CHECK_TIMEOUT_SECONDS."""
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(ping(), timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"no answer within {settings.HEALTH_CHECK_TIMEOUT_SECONDS}s"}
+    except Exception as e:
+        # Only the type: the message can carry connection details
+        return {"ok": False, "error": type(e).__name__}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+@app.get("/health/deep")
+async def deep_health_check():
+    """Check the primary database, and any replicas, answer a query in time.
+
+    503 if the primary does not; an unreachable replica only reports
+    "degraded", since reads fall back to the primary.
+    """
+    primary, *replicas = await asyncio.gather(
+        _check_database(async_engine),
+        *(_check_database(engine) for engine in replica_engines)
+    )
+    body = {
+        "status": "healthy",
+        "database": primary,
+        "replicas": {engine.pool.logging_name: result for engine, result in zip(replica_engines, replicas)},
+    }
+    if not primary["ok"]:
+        body["status"] = "unhealthy"
+        return JSONResponse(status_code=503, content=body)
+    if not all(result["ok"] for result in replicas):
+        body["status"] = "degraded"
+    return body
+
+
+@app.get("/metrics")
+def metrics():
+    """All in-process metrics in the Prometheus text format."""
+    return Response(content=registry.exposition(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/db")
+def db_metrics():
+    """Connection pool state and checkout wait times, per engine."""
+    return {"pools": pool_stats(), "replicas": replica_set.status()}
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(bets.router, prefix="/api/v1/bets", tags=["bets"])
@@ -53,3 +144,4 @@ app.include_router(sportsbooks.router, prefix="/api/v1/sportsbooks", tags=["spor
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(groups.router, prefix="/api/v1/groups", tags=["groups"])
 app.include_router(calendar.router, prefix="/api/v1/calendar", tags=["calendar"])
+app.include_router(entities.router, prefix="/api/v1/entities", tags=["entities"])
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field, field_validator
@@ -160,6 +160,7 @@ class BetOut(BaseModel):
     closing_odds_american: Optional[int] = None
     notes: Optional[str] = None
     parlay_group_id: Optional[UUID] = None
+    entity_id: Optional[UUID] = None
     calendar_provider: Optional[str] = None
     calendar_event_id: Optional[str] = None
     calendar_created_at: Optional[datetime] = None
@@ -204,6 +205,22 @@ class BankrollPoint(BaseModel):
     balance: float
 
 
+class MetricPercentile(BaseModel):
+    """Where a user's monthly stat falls among all users."""
+    metric: str
+    value: Optional[float] = None  # None if the user has no bets that month
+    percentile: Optional[float] = None  # Share of users at or below value, 0-100
+    quantiles: dict[str, Optional[float]]  # e.g. {"p50": 1.2}, across all users
+
+
+class PercentilesResponse(BaseModel):
+    """Platform-wide percentile response."""
+    month: str
+    user_count: int
+    rank_error: float  # Bound on percentile error, in percentile points
+    metrics: list[MetricPercentile]
+
+
 # ============================================================================
 # CSV Import Schemas
 # ============================================================================
@@ -220,15 +237,114 @@ class CSVImportRow(BaseModel):
     team_or_player: Optional[str] = None
     league: Optional[str] = None
     notes: Optional[str] = None
+    book_name: Optional[str] = None
+    book_id: Optional[UUID] = None
+    entity_id: Optional[UUID] = None
 
 
 class CSVImportResponse(BaseModel):
-    """CSV import response."""
+    """CSV import response.
+
+    valid_rows and invalid_rows are a sample; page through the rest with
+    GET /imports/{import_id}.
+    """
+    import_id: Optional[UUID] = None
     valid_rows: list[CSVImportRow]
     invalid_rows: list[dict]
+    valid_count: int = 0
+    invalid_count: int = 0
+    duplicate_rows: int = 0
     message: str
 
 
+class StagedImportOut(BaseModel):
+    """Staged import with one page of rows."""
+    id: UUID
+    filename: str
+    provider: str
+    valid_count: int
+    invalid_count: int
+    duplicate_rows: int
+    created_at: datetime
+    expires_at: datetime
+    offset: int
+    limit: int
+    valid_rows: list[CSVImportRow]
+    invalid_rows: list[dict]
+
+
+# ============================================================================
+# Entity Catalog Schemas
+# ============================================================================
+
+class EntityCreate(BaseModel):
+    """Canonical entity creation schema."""
+    kind: str = Field(..., description="team, player, or league")
+    sport: Optional[str] = None
+    name: str = Field(..., min_length=1)
+    aliases: list[str] = []
+
+    @field_validator('kind')
+    @classmethod
+    def validate_kind(cls, v):
+        allowed = ["team", "player", "league"]
+        if v not in allowed:
+            raise ValueError(f"Kind must be one of: {', '.join(allowed)}")
+        return v
+
+
+class EntityOut(BaseModel):
+    """Canonical entity output schema."""
+    id: UUID
+    kind: str
+    sport: Optional[str] = None
+    name: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class EntityAliasOut(BaseModel):
+    """Entity alias output schema."""
+    id: UUID
+    entity_id: UUID
+    entity_name: str
+    alias: str
+    confidence: float
+    status: str
+    created_at: datetime
+
+
+class EntityAliasReview(BaseModel):
+    """Review decision for a low-confidence alias."""
+    action: str = Field(..., description="confirm, reject, or reassign")
+    entity_id: Optional[UUID] = Field(None, description="Required if action is reassign")
+
+    @field_validator('action')
+    @classmethod
+    def validate_action(cls, v):
+        allowed = ["confirm", "reject", "reassign"]
+        if v not in allowed:
+            raise ValueError(f"Action must be one of: {', '.join(allowed)}")
+        return v
+
+
+class EntityResolveRequest(BaseModel):
+    """Batch name resolution request."""
+    kind: str = "team"
+    sport: Optional[str] = None
+    names: list[str] = Field(..., max_length=10000)
+
+
+class EntityMatchOut(BaseModel):
+    """Resolution result for a single name."""
+    name: str
+    entity_id: Optional[UUID] = None
+    canonical_name: Optional[str] = None
+    score: Optional[float] = None
+
+
 # ============================================================================
 # Group & Leaderboard Schemas
 # ============================================================================
@@ -275,7 +391,8 @@ class GroupDetailOut(GroupOut):
 
 class LeaderboardEntry(BaseModel):
     """Leaderboard entry for a single user."""
-    rank: int
+    rank: int  # Tied members share a rank
+    position: int  # Unique 1-based position; pass as cursor to page after it
     user_id: UUID
     email: str
     roi: float
@@ -285,16 +402,115 @@ class LeaderboardEntry(BaseModel):
     wins: int
     losses: int
     top_sport: Optional[str] = None
+    sport_splits: Optional[dict[str, float]] = None  # Units per sport, when requested
 
 
 class LeaderboardResponse(BaseModel):
     """Leaderboard response."""
     group_id: UUID
     group_name: str
-    month: str
+    month: str  # Period label, e.g. '2025-10', '2025-W41', '2025'
+    period: str = "month"
+    period_start: Optional[datetime] = None
+    period_end: Optional[datetime] = None
+    sort: str = "roi"
+    total_members: int = 0
+    next_cursor: Optional[int] = None  # Pass as cursor for the next page
     leaderboard: list[LeaderboardEntry]
 
 
+class LeaderboardStanding(BaseModel):
+    """A member's standing in one period."""
+    period: str  # Month ('2025-10') or trailing window ('30d')
+    rank: int
+    roi: float
+    units: float
+    win_rate: float
+    total_bets: int
+
+
+class LeaderboardHistoryEntry(BaseModel):
+    """A member's standings across a range of periods."""
+    user_id: UUID
+    email: str
+    history: list[LeaderboardStanding]  # One per month, oldest first
+    rolling: list[LeaderboardStanding]  # One per trailing window
+
+
+class LeaderboardHistoryResponse(BaseModel):
+    """Leaderboard history response."""
+    group_id: UUID
+    group_name: str
+    sort: str = "roi"
+    months: list[str]
+    windows: list[str]
+    members: list[LeaderboardHistoryEntry]
+
+
+class CompareSide(BaseModel):
+    """One member's side of a head-to-head comparison."""
+    user_id: UUID
+    email: str
+    kpis: KPIData
+    by_sport: list[BreakdownItem]
+    by_market: list[BreakdownItem]
+
+
+class SharedBet(BaseModel):
+    """One member's bet on a shared selection."""
+    bet_id: UUID
+    bet_name: str
+    odds_american: int
+    status: str
+    result_profit: Optional[float] = None
+
+
+class SharedSelection(BaseModel):
+    """The same side of the same event, backed by both members."""
+    event_day: date
+    sport: str
+    market_type: str
+    selection: Optional[str] = None
+    a: SharedBet
+    b: SharedBet
+
+
+class ComparePnLPoint(BaseModel):
+    """Both members' cumulative P&L at the end of a time bucket."""
+    bucket: datetime
+    a: float
+    b: float
+
+
+class CompareResponse(BaseModel):
+    """Head-to-head comparison of two group members."""
+    group_id: UUID
+    bucket: str  # 'day', 'week', or 'month'
+    a: CompareSide
+    b: CompareSide
+    shared_count: int  # Total shared selections; shared holds the newest
+    shared: list[SharedSelection]
+    pnl_series: list[ComparePnLPoint]
+
+
+class FeedEntryOut(BaseModel):
+    """Group activity feed entry."""
+    id: int
+    user_id: UUID
+    email: str
+    bet_id: Optional[UUID] = None
+    kind: str  # 'placed', 'settled', or 'big_win'
+    summary: dict  # bet_name, sport, odds_american, units, status, profit_units
+    created_at: datetime
+
+
+class FeedResponse(BaseModel):
+    """A page of a group's activity feed, newest first."""
+    group_id: UUID
+    entries: list[FeedEntryOut]
+    next_cursor: Optional[int] = None  # Pass as cursor for older entries
+
+
 # ============================================================================
 # Calendar Integration Schemas
 # ============================================================================
@@ -0,0 +1,392 @@
+"""Fuzzy resolution of free-text team, player, league and sportsbook names."""
+
+import enum
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from uuid import UUID
+
+from rapidfuzz import fuzz, process
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+# Match scores are rapidfuzz WRatio values (0-100)
+AUTO_ACCEPT_SCORE = 90.0  # At or above: accepted and learned as an alias
+REVIEW_SCORE = 75.0  # At or above (but below auto-accept): accepted, queued for review
+BOOK_MATCH_SCORE = 85.0
+
+# Rebuild the shared index at least this often so catalog edits made by
+# other processes become visible
+INDEX_TTL_SECONDS = 300
+
+# Blocks larger than this are never scanned as a fallback
+MAX_FALLBACK_CANDIDATES = 5000
+
+# Bound on cached resolutions per index
+MAX_CACHED_RESOLUTIONS = 50000
+
+# Tokens that describe the bet rather than the selection ("Chiefs ML", "Bills +3.5")
+_NOISE_TOKENS = {"ml", "moneyline", "spread", "ats"}
+_NON_WORD = re.compile(r"[^\w\s]")
+
+# Teams and players share a namespace because team_or_player can hold either
+_NAMESPACES = {
+    models.EntityKind.TEAM: "selection",
+    models.EntityKind.PLAYER: "selection",
+    models.EntityKind.LEAGUE: "league",
+}
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Normalize a name for matching.
+
+    Casefolds, strips punctuation, and drops numeric and bet-type tokens
+    so "KC Chiefs ML" and "kc chiefs" normalize identically.
+    """
+    if not name:
+        return ""
+    tokens = _NON_WORD.sub(" ", name.casefold()).split()
+    return " ".join(t for t in tokens if t not in _NOISE_TOKENS and not t.isdigit())
+
+
+def _sport_key(sport) -> Optional[str]:
+    """Return the plain string value of a sport enum or string."""
+    if sport is None:
+        return None
+    return sport.value if isinstance(sport, enum.Enum) else str(sport)
+
+
+@dataclass(frozen=True)
+class EntityMatch:
+    """Result of resolving a name against the entity catalog."""
+    entity_id: UUID
+    name: str
+    score: float
+    exact: bool
+
+
+class EntityIndex:
+    """In-memory fuzzy-match index over the entity catalog.
+
+    Exact alias hits are a dict lookup. Everything else is scored with
+    rapidfuzz against a candidate block keyed by (namespace, sport, token),
+    so a lookup only compares against names sharing its first token instead
+    of the whole catalog. Results are cached per normalized name.
+    """
+
+    def __init__(self):
+        self._exact: dict[tuple[str, Optional[str], str], EntityMatch] = {}
+        self._rejected: dict[tuple[str, str], set[UUID]] = {}
+        self._choices: list[str] = []
+        self._targets: list[tuple[UUID, str]] = []
+        self._blocks: dict[tuple[str, Optional[str], str], list[int]] = {}
+        self._sport_blocks: dict[tuple[str, Optional[str]], list[int]] = {}
+        self._cache: dict[tuple[str, Optional[str], str], Optional[EntityMatch]] = {}
+
+    @classmethod
+    def from_db(cls, db: Session) -> "EntityIndex":
+        """Build an index from every entity and its non-rejected aliases."""
+        index = cls()
+        rows = db.query(
+            models.Entity.id,
+            models.Entity.kind,
+            models.Entity.sport,
+            models.Entity.name,
+            models.EntityAlias.alias,
+            models.EntityAlias.status
+        ).outerjoin(
+            models.EntityAlias,
+            models.EntityAlias.entity_id == models.Entity.id
+        ).all()
+
+        seen_entities = set()
+        for row in rows:
+            if row.id not in seen_entities:
+                seen_entities.add(row.id)
+                index.add(row.id, row.kind, row.sport, row.name, normalize_name(row.name))
+            if row.alias is None:
+                continue
+            if row.status == models.AliasStatus.REJECTED:
+                index._rejected.setdefault((_NAMESPACES[row.kind], row.alias), set()).add(row.id)
+            else:
+                index.add(row.id, row.kind, row.sport, row.name, row.alias)
+        return index
+
+    def add(self, entity_id: UUID, kind, sport, name: str, alias: str) -> None:
+        """Register a normalized alias for an entity."""
+        if not alias:
+            return
+        namespace = _NAMESPACES[models.EntityKind(kind)]
+        sport = _sport_key(sport)
+
+        self._exact[(namespace, sport, alias)] = EntityMatch(entity_id, name, 100.0, True)
+
+        position = len(self._choices)
+        self._choices.append(alias)
+        self._targets.append((entity_id, name))
+        for token in set(alias.split()):
+            self._blocks.setdefault((namespace, sport, token), []).append(position)
+        self._sport_blocks.setdefault((namespace, sport), []).append(position)
+
+        # A new alias can change earlier answers
+        self._cache.clear()
+
+    def has_alias(self, alias: str, kind, sport=None) -> bool:
+        """Return True if the normalized alias is already an exact entry."""
+        return (_NAMESPACES[models.EntityKind(kind)], _sport_key(sport), alias) in self._exact
+
+    def resolve(self, name: Optional[str], kind, sport=None) -> Optional[EntityMatch]:
+        """Resolve a single name to its best catalog match, or None."""
+        key = normalize_name(name)
+        if not key:
+            return None
+
+        namespace = _NAMESPACES[models.EntityKind(kind)]
+        sport = _sport_key(sport)
+        cache_key = (namespace, sport, key)
+        if cache_key in self._cache:
+            return self._cache[cache_key]
+
+        match = (
+            self._exact.get((namespace, sport, key))
+            or self._exact.get((namespace, None, key))
+            or self._fuzzy(namespace, sport, key)
+        )
+
+        if len(self._cache) >= MAX_CACHED_RESOLUTIONS:
+            self._cache.clear()
+        self._cache[cache_key] = match
+        return match
+
+    def resolve_many(self, names: Iterable[Optional[str]], kind, sport=None) -> dict[str, Optional[EntityMatch]]:
+        """Resolve a batch of names, scoring each distinct name once."""
+        return {name: self.resolve(name, kind, sport) for name in set(names) if name}
+
+    def _candidates(self, namespace: str, sport: Optional[str], tokens: list[str]) -> list[int]:
+        """Collect candidate positions sharing a token with the query."""
+        for block_tokens in ([tokens[0]], tokens[1:]):
+            candidates = set()
+            for token in block_tokens:
+                candidates.update(self._blocks.get((namespace, sport, token), ()))
+                candidates.update(self._blocks.get((namespace, None, token), ()))
+            if candidates:
+                return sorted(candidates)
+
+        # No shared token (typos): scan the sport if it's small enough
+        fallback = self._sport_blocks.get((namespace, sport), []) + self._sport_blocks.get((namespace, None), [])
+        return fallback if len(fallback) <= MAX_FALLBACK_CANDIDATES else []
+
+    def _fuzzy(self, namespace: str, sport: Optional[str], key: str) -> Optional[EntityMatch]:
+        """Score the query against its candidate block."""
+        candidates = self._candidates(namespace, sport, key.split())
+        if not candidates:
+            return None
+
+        rejected = self._rejected.get((namespace, key), set())
+        results = process.extract(
+            key,
+            [self._choices[i] for i in candidates],
+            scorer=fuzz.WRatio,
+            score_cutoff=REVIEW_SCORE,
+            limit=5
+        )
+        for _, score, position in results:
+            entity_id, name = self._targets[candidates[position]]
+            if entity_id not in rejected:
+                return EntityMatch(entity_id, name, round(score, 1), False)
+        return None
+
+
+_index: Optional[EntityIndex] = None
+_index_built_at = 0.0
+_index_generation = 0  # Bumped on invalidation so in-flight rebuilds are not stored
+_index_lock = threading.Lock()
+
+# Session.info key for aliases learned in the current transaction
+_PENDING_KEY = "learned_aliases"
+
+
+def get_entity_index(db: Session) -> EntityIndex:
+    """Return the shared entity index, rebuilding it if stale.
+
+    The rebuild runs outside the lock: under AsyncSession.run_sync the
+    query suspends this greenlet on the event loop thread, and another
+    request on that thread waiting for the lock would block the loop.
+    Concurrent rebuilds are harmless; the last one wins.
+    """
+    global _index, _index_built_at
+
+    with _index_lock:
+        if _index is not None and time.monotonic() - _index_built_at <= INDEX_TTL_SECONDS:
+            return _index
+        generation = _index_generation
+
+    index = EntityIndex.from_db(db)
+    with _index_lock:
+        if generation == _index_generation:
+            _index = index
+            _index_built_at = time.monotonic()
+    return index
+
+
+def invalidate_entity_index() -> None:
+    """Drop the shared index so the next lookup rebuilds it from the catalog."""
+    global _index, _index_generation
+
+    with _index_lock:
+        _index = None
+        _index_generation += 1
+
+
+def learn_alias(db: Session, index: EntityIndex, name: str, kind, sport, match: EntityMatch) -> None:
+    """Persist a fuzzy match as an alias so the next lookup is exact.
+
+    Matches below AUTO_ACCEPT_SCORE are stored as pending for review. The
+    shared index only learns the alias once the session commits, so a
+    rolled-back write leaves nothing behind.
+    """
+    alias = normalize_name(name)
+    pending = db.info.setdefault(_PENDING_KEY, {})
+    key = (_NAMESPACES[models.EntityKind(kind)], _sport_key(sport), alias)
+    if key in pending or index.has_alias(alias, kind, sport):
+        return
+    status = models.AliasStatus.AUTO if match.score >= AUTO_ACCEPT_SCORE else models.AliasStatus.PENDING
+    db.add(models.EntityAlias(
+        entity_id=match.entity_id,
+        alias=alias,
+        confidence=match.score,
+        status=status
+    ))
+    pending[key] = (match.entity_id, kind, sport, match.name, alias)
+
+
+@event.listens_for(Session, "after_commit")
+def _add_committed_aliases(session: Session) -> None:
+    learned = session.info.pop(_PENDING_KEY, None)
+    if not learned:
+        return
+    with _index_lock:
+        # An invalidated index is rebuilt from the catalog, which has them
+        if _index is not None:
+            for entity_id, kind, sport, name, alias in learned.values():
+                _index.add(entity_id, kind, sport, name, alias)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_learned_aliases(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def resolve_entity_id(db: Session, name: Optional[str], sport, learn: bool = True) -> Optional[UUID]:
+    """Resolve a single team/player name to a canonical entity id."""
+    index = get_entity_index(db)
+    match = index.resolve(name, models.EntityKind.TEAM, sport)
+    if match is None:
+        return None
+    if learn and not match.exact:
+        learn_alias(db, index, name, models.EntityKind.TEAM, sport, match)
+    return match.entity_id
+
+
+def load_sportsbooks(db: Session, user_id: UUID) -> list[tuple[UUID, str]]:
+    """Return (id, name) of the global sportsbooks and the user's own."""
+    return [tuple(book) for book in db.query(models.Sportsbook.id, models.Sportsbook.name).filter(
+        (models.Sportsbook.user_id.is_(None)) |
+        (models.Sportsbook.user_id == user_id)
+    ).all()]
+
+
+def match_sportsbooks(books: list[tuple[UUID, str]], names: Iterable[Optional[str]]) -> dict[str, UUID]:
+    """Fuzzy-match sportsbook names against (id, name) pairs from load_sportsbooks."""
+    names = {name for name in names if name}
+    if not names or not books:
+        return {}
+
+    choices = [normalize_name(name) for _, name in books]
+    resolved = {}
+    for name in names:
+        result = process.extractOne(
+            normalize_name(name), choices, scorer=fuzz.WRatio, score_cutoff=BOOK_MATCH_SCORE
+        )
+        if result:
+            resolved[name] = books[result[2]][0]
+    return resolved
+
+
+def resolve_sportsbooks(db: Session, user_id: UUID, names: Iterable[Optional[str]]) -> dict[str, UUID]:
+    """Resolve sportsbook names to the user's visible Sportsbook rows."""
+    names = {name for name in names if name}
+    if not names:
+        return {}
+    return match_sportsbooks(load_sportsbooks(db, user_id), names)
+
+
+def load_resolution_context(db: Session, user_id: UUID) -> tuple[EntityIndex, list[tuple[UUID, str]]]:
+    """Everything match_bet_rows needs from the database, in one call."""
+    return get_entity_index(db), load_sportsbooks(db, user_id)
+
+
+def match_bet_rows(
+    index: EntityIndex,
+    books: list[tuple[UUID, str]],
+    rows: list[dict]
+) -> list[tuple[str, models.EntityKind, Optional[str], EntityMatch]]:
+    """Resolve selection, league and sportsbook names on parsed bet rows in place.
+
+    Each distinct (sport, name) pair is resolved once no matter how many
+    rows share it. Sets entity_id and book_id, and replaces league with its
+    canonical name. Needs no database, so it can run in a worker thread.
+
+    Returns the fuzzy matches as (name, kind, sport, match) for learn_aliases.
+    """
+    fuzzy = []
+    by_sport: dict[Optional[str], list[dict]] = {}
+    for row in rows:
+        by_sport.setdefault(_sport_key(row.get("sport")), []).append(row)
+
+    for sport, sport_rows in by_sport.items():
+        for kind, field in ((models.EntityKind.TEAM, "team_or_player"), (models.EntityKind.LEAGUE, "league")):
+            matches = index.resolve_many((row.get(field) for row in sport_rows), kind, sport)
+            fuzzy.extend((name, kind, sport, match) for name, match in matches.items() if match and not match.exact)
+
+            for row in sport_rows:
+                match = matches.get(row.get(field))
+                if match is None:
+                    continue
+                if field == "league":
+                    row["league"] = match.name
+                else:
+                    row["entity_id"] = match.entity_id
+
+    resolved_books = match_sportsbooks(books, (row.get("book_name") for row in rows))
+    for row in rows:
+        row["book_id"] = resolved_books.get(row.get("book_name"))
+    return fuzzy
+
+
+def learn_aliases(
+    db: Session,
+    index: EntityIndex,
+    matches: list[tuple[str, models.EntityKind, Optional[str], EntityMatch]]
+) -> None:
+    """Persist the fuzzy matches returned by match_bet_rows as aliases."""
+    for name, kind, sport, match in matches:
+        learn_alias(db, index, name, kind, sport, match)
+
+
+def resolve_bet_rows(db: Session, user_id: UUID, rows: list[dict], learn: bool = False) -> None:
+    """Resolve names on parsed bet rows in place; see match_bet_rows.
+
+    With learn=True, fuzzy matches are persisted as aliases. Async request
+    handlers should call the three steps separately, so the matching runs
+    off the event loop.
+    """
+    index, books = load_resolution_context(db, user_id)
+    matches = match_bet_rows(index, books, rows)
+    if learn:
+        learn_aliases(db, index, matches)
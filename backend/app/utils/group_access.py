@@ -0,0 +1,74 @@
+"""Group lookup and membership resolution with a short-lived cache."""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db import models
+
+
+@dataclass(frozen=True)
+class GroupAccess:
+    """A group's fields plus whether a given user belongs to it."""
+    id: UUID
+    name: str
+    description: Optional[str]
+    owner_id: UUID
+    invite_code: str
+    created_at: datetime
+    is_member: bool
+
+
+# Keyed by (group_id, user_id); join/leave in this process invalidate
+# immediately, other processes see changes within the TTL
+_access_cache = TTLCache(
+    maxsize=settings.GROUP_ACCESS_CACHE_SIZE,
+    ttl=settings.GROUP_ACCESS_CACHE_SECONDS,
+    name="group_access"
+)
+
+
+def get_group_access(db: Session, group_id: UUID, user_id: UUID) -> Optional[GroupAccess]:
+    """Return the group and the user's membership, or None if no such group.
+
+    Resolved with a single query on a cache miss.
+    """
+    key = (group_id, user_id)
+    access = _access_cache.get(key)
+    if access is not None:
+        return access
+
+    is_member = exists().where(
+        models.GroupMember.group_id == models.Group.id,
+        models.GroupMember.user_id == user_id
+    )
+    row = db.query(
+        models.Group.id,
+        models.Group.name,
+        models.Group.description,
+        models.Group.owner_id,
+        models.Group.invite_code,
+        models.Group.created_at,
+        is_member.label("is_member")
+    ).filter(models.Group.id == group_id).first()
+
+    if row is None:
+        return None
+
+    access = GroupAccess(**row._asdict())
+    _access_cache.set(key, access)
+    return access
+
+
+def invalidate_group_access(group_id: UUID, user_id: Optional[UUID] = None) -> None:
+    """Forget cached access for one member, or for everyone in a deleted group."""
+    if user_id is not None:
+        _access_cache.pop((group_id, user_id))
+    else:
+        _access_cache.evict(lambda key: key[0] == group_id)
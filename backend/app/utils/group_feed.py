@@ -0,0 +1,154 @@
+"""Group activity feeds, fanned out on write.
+
+When a member places or settles a bet, a GroupFeedEntry is inserted into
+every group they belong to with one INSERT ... SELECT from group_members,
+in the same transaction as the bet. Reading a page is then a single range
+scan on (group_id, id), however many members or bets the group has.
+
+Write cost is bounded: one statement per bet write (or per import), at
+most GROUP_FEED_MAX_FANOUT_GROUPS groups per event, and at most
+GROUP_FEED_IMPORT_MAX_EVENTS events per import. Each group keeps about
+its newest GROUP_FEED_MAX_ENTRIES entries; trimming runs on roughly one
+write in GROUP_FEED_TRIM_EVERY, so a group may briefly hold a few more.
+"""
+
+import random
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import Numeric, and_, case, cast, delete, func, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.db import models
+
+FEED_KINDS = ("placed", "settled", "big_win")
+
+
+def _enum_value(column, enum_cls):
+    """Render an Enum column as its value ('Won') rather than its name ('WON')."""
+    return case(*((column == member, literal(member.value)) for member in enum_cls))
+
+
+def _fanout_groups(user_id: UUID):
+    """The user's groups that receive their feed entries, newest joins first."""
+    return select(models.GroupMember.group_id).where(
+        models.GroupMember.user_id == user_id
+    ).order_by(
+        models.GroupMember.joined_at.desc()
+    ).limit(settings.GROUP_FEED_MAX_FANOUT_GROUPS).subquery('fanout_groups')
+
+
+def record_bet_events(db: Session, user_id: UUID, *criteria, limit: Optional[int] = None) -> None:
+    """Fan out feed entries for the user's bets matching criteria.
+
+    Pending bets become 'placed' entries, settled ones 'settled', and wins
+    of at least GROUP_FEED_BIG_WIN_UNITS units 'big_win'. With limit only
+    the most recently placed matches are posted. Does not commit.
+    """
+    # The fan-out reads the bets back, so pending changes must be visible
+    db.flush()
+
+    bet = models.Bet
+    profit_units = bet.result_profit / func.nullif(bet.stake, 0) * bet.units
+    kind = case(
+        (bet.status == models.BetStatus.PENDING, literal('placed')),
+        (and_(bet.status == models.BetStatus.WON, profit_units >= settings.GROUP_FEED_BIG_WIN_UNITS), literal('big_win')),
+        else_=literal('settled')
+    )
+    summary = func.jsonb_build_object(
+        'bet_name', bet.bet_name,
+        'sport', _enum_value(bet.sport, models.Sport),
+        'odds_american', bet.odds_american,
+        'units', bet.units,
+        'status', _enum_value(bet.status, models.BetStatus),
+        'profit_units', func.round(cast(profit_units, Numeric), 2)
+    )
+
+    events = select(
+        bet.id, bet.placed_at, kind.label('kind'), summary.label('summary')
+    ).where(
+        bet.user_id == user_id, *criteria
+    )
+    if limit is not None:
+        events = events.order_by(bet.placed_at.desc()).limit(limit)
+    events = events.subquery('events')
+
+    groups = _fanout_groups(user_id)
+    db.execute(
+        insert(models.GroupFeedEntry).from_select(
+            ['group_id', 'user_id', 'bet_id', 'kind', 'summary', 'created_at'],
+            select(
+                groups.c.group_id,
+                literal(user_id, models.GroupFeedEntry.user_id.type),
+                events.c.id,
+                events.c.kind,
+                events.c.summary,
+                literal(datetime.utcnow(), models.GroupFeedEntry.created_at.type)
+            ).select_from(
+                groups
+            ).join(
+                events,
+                literal(True)
+            ).order_by(
+                # Ids follow placement so imported bets read newest first
+                events.c.placed_at
+            )
+        )
+    )
+
+    if random.random() * settings.GROUP_FEED_TRIM_EVERY < 1:
+        trim_feeds(db, user_id)
+
+
+def trim_feeds(db: Session, user_id: UUID) -> None:
+    """Drop entries beyond GROUP_FEED_MAX_ENTRIES in the user's fan-out groups."""
+    feed = models.GroupFeedEntry
+    newer = aliased(feed)
+    groups = _fanout_groups(user_id)
+    cutoffs = select(
+        groups.c.group_id,
+        select(newer.id).where(
+            newer.group_id == groups.c.group_id
+        ).order_by(
+            newer.id.desc()
+        ).offset(settings.GROUP_FEED_MAX_ENTRIES).limit(1).scalar_subquery().label('cutoff')
+    ).subquery('cutoffs')
+
+    db.execute(
+        delete(feed).where(
+            feed.group_id == cutoffs.c.group_id,
+            feed.id <= cutoffs.c.cutoff
+        )
+    )
+
+
+def query_feed(db: Session, group_id: UUID, cursor: Optional[int], limit: int) -> tuple[list, Optional[int]]:
+    """Return one page of a group's feed, newest first, and the next cursor.
+
+    The cursor is the id of the last entry already seen, so a page costs
+    an index range scan of limit + 1 rows wherever it starts.
+    """
+    feed = models.GroupFeedEntry
+    query = db.query(
+        feed.id,
+        feed.user_id,
+        models.User.email,
+        feed.bet_id,
+        feed.kind,
+        feed.summary,
+        feed.created_at
+    ).join(
+        models.User,
+        models.User.id == feed.user_id
+    ).filter(
+        feed.group_id == group_id
+    )
+    if cursor is not None:
+        query = query.filter(feed.id < cursor)
+
+    rows = query.order_by(feed.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].id
+    return rows, None
@@ -0,0 +1,216 @@
+"""Head-to-head comparison of two group members, computed in the database.
+
+Three statements regardless of how many bets either member has: totals
+and per-sport/market breakdowns from one GROUPING SETS aggregate, shared
+selections from one self-join, and both cumulative P&L series from one
+windowed aggregate over shared time buckets.
+"""
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import String, and_, case, cast, column, func, select, true, tuple_, values
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+
+from app.db import models
+
+
+COMPARE_BUCKETS = ("day", "week", "month")
+
+# Shared selections returned with a comparison, newest first
+SHARED_SELECTION_LIMIT = 50
+
+
+def _date_filters(bet, from_date: Optional[datetime], to_date: Optional[datetime]) -> list:
+    """Mirror the analytics endpoints' inclusive placed_at filters."""
+    filters = []
+    if from_date:
+        filters.append(bet.placed_at >= from_date)
+    if to_date:
+        filters.append(bet.placed_at <= to_date)
+    return filters
+
+
+def query_member_totals(
+    db: Session,
+    group_id: UUID,
+    user_ids: list[UUID],
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+) -> list:
+    """Aggregate KPIs overall, by sport and by market for members of a group.
+
+    Members are read from group_members, so a user outside the group has
+    no rows. Rows with dimension 'total' carry the KPIs; 'sport' and
+    'market' rows carry one breakdown key each.
+    """
+    bet = models.Bet
+    decided = bet.status.in_(['Won', 'Lost'])
+    grouped_sport = func.grouping(bet.sport)
+    grouped_market = func.grouping(bet.market_type)
+
+    query = select(
+        models.GroupMember.user_id,
+        models.User.email,
+        case(
+            (grouped_sport == 0, 'sport'),
+            (grouped_market == 0, 'market'),
+            else_='total'
+        ).label('dimension'),
+        bet.sport,
+        bet.market_type,
+        func.count(bet.id).label('total_bets'),
+        func.count(bet.id).filter(bet.status == 'Won').label('wins'),
+        func.count(bet.id).filter(bet.status == 'Lost').label('losses'),
+        func.count(bet.id).filter(bet.status == 'Pending').label('pending'),
+        func.coalesce(func.sum(bet.result_profit), 0).label('pnl'),
+        func.coalesce(func.sum(bet.units * func.sign(bet.result_profit)), 0).label('units'),
+        func.coalesce(func.sum(bet.stake).filter(decided), 0).label('staked'),
+        func.coalesce(func.avg(bet.odds_american), 0).label('avg_odds')
+    ).select_from(
+        models.GroupMember
+    ).join(
+        models.User,
+        models.User.id == models.GroupMember.user_id
+    ).outerjoin(
+        bet,
+        and_(bet.user_id == models.GroupMember.user_id, *_date_filters(bet, from_date, to_date))
+    ).where(
+        models.GroupMember.group_id == group_id,
+        models.GroupMember.user_id.in_(user_ids)
+    ).group_by(
+        func.grouping_sets(
+            tuple_(models.GroupMember.user_id, models.User.email),
+            tuple_(models.GroupMember.user_id, models.User.email, bet.sport),
+            tuple_(models.GroupMember.user_id, models.User.email, bet.market_type)
+        )
+    )
+
+    return db.execute(query).all()
+
+
+def query_shared_selections(
+    db: Session,
+    user_a: UUID,
+    user_b: UUID,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    limit: int = SHARED_SELECTION_LIMIT
+) -> list:
+    """Pair bets where both users backed the same side of the same event.
+
+    Bets match on sport, market and event day (event_date, else placed_at)
+    and on the side: the canonical entity when resolved, otherwise the
+    case-folded selection text. Returns the newest pairs, each row also
+    carrying the total number of pairs as shared_count.
+    """
+    a = aliased(models.Bet)
+    b = aliased(models.Bet)
+
+    def side(bet):
+        return func.coalesce(cast(bet.entity_id, String), func.lower(func.trim(bet.team_or_player)))
+
+    def event_day(bet):
+        return func.date(func.coalesce(bet.event_date, bet.placed_at))
+
+    query = select(
+        event_day(a).label('event_day'),
+        a.sport,
+        a.market_type,
+        a.team_or_player.label('selection'),
+        a.id.label('a_bet_id'),
+        a.bet_name.label('a_bet_name'),
+        a.odds_american.label('a_odds_american'),
+        a.status.label('a_status'),
+        a.result_profit.label('a_result_profit'),
+        b.id.label('b_bet_id'),
+        b.bet_name.label('b_bet_name'),
+        b.odds_american.label('b_odds_american'),
+        b.status.label('b_status'),
+        b.result_profit.label('b_result_profit'),
+        func.count().over().label('shared_count')
+    ).select_from(
+        a
+    ).join(
+        b,
+        and_(
+            b.user_id == user_b,
+            b.sport == a.sport,
+            b.market_type == a.market_type,
+            side(b) == side(a),
+            event_day(b) == event_day(a)
+        )
+    ).where(
+        a.user_id == user_a,
+        *_date_filters(a, from_date, to_date),
+        *_date_filters(b, from_date, to_date)
+    ).order_by(
+        event_day(a).desc(),
+        a.placed_at.desc()
+    ).limit(limit)
+
+    return db.execute(query).all()
+
+
+def query_pnl_series(
+    db: Session,
+    user_ids: list[UUID],
+    bucket: str = "week",
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+) -> list:
+    """Cumulative P&L of each user at the end of every shared time bucket.
+
+    Buckets are every date_trunc(bucket, placed_at) in which either user
+    settled a bet; each user gets a row per bucket, carrying their total
+    forward through buckets where they had no settled bets. Rows are
+    ordered by bucket, then user.
+    """
+    bet = models.Bet
+    period = func.date_trunc(bucket, bet.placed_at)
+
+    per_bucket = select(
+        bet.user_id,
+        period.label('bucket'),
+        func.sum(bet.result_profit).label('pnl')
+    ).where(
+        bet.user_id.in_(user_ids),
+        bet.result_profit.isnot(None),
+        *_date_filters(bet, from_date, to_date)
+    ).group_by(
+        bet.user_id,
+        period
+    ).subquery('per_bucket')
+
+    buckets = select(per_bucket.c.bucket).distinct().subquery('buckets')
+    users = values(
+        column('user_id', PGUUID(as_uuid=True)),
+        name='users'
+    ).data([(user_id,) for user_id in user_ids])
+
+    query = select(
+        users.c.user_id,
+        buckets.c.bucket,
+        func.sum(func.coalesce(per_bucket.c.pnl, 0)).over(
+            partition_by=users.c.user_id,
+            order_by=buckets.c.bucket
+        ).label('cumulative_pnl')
+    ).select_from(
+        users
+    ).join(
+        buckets,
+        true()
+    ).outerjoin(
+        per_bucket,
+        and_(
+            per_bucket.c.user_id == users.c.user_id,
+            per_bucket.c.bucket == buckets.c.bucket
+        )
+    ).order_by(
+        buckets.c.bucket,
+        users.c.user_id
+    )
+
+    return db.execute(query).all()
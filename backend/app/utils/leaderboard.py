@@ -0,0 +1,419 @@
+"""Database-side leaderboard ranking shared by the REST and streaming endpoints."""
+
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import String, and_, case, cast, column, func, select, true, values
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.utils.monthly_stats import top_sport
+from app.utils.periods import Period
+
+
+LEADERBOARD_SORTS = ("roi", "units", "win_rate", "total_bets")
+
+
+def _in_period(user_id, start: datetime, end: datetime) -> tuple:
+    """Filter a user's bets to the half-open range [start, end)."""
+    return (
+        models.Bet.user_id == user_id,
+        models.Bet.placed_at >= start,
+        models.Bet.placed_at < end
+    )
+
+
+def _decided(column):
+    """Sum a bet column over Won/Lost bets only."""
+    return func.sum(
+        case(
+            ((models.Bet.status.in_(['Won', 'Lost']), column)),
+            else_=0
+        )
+    )
+
+
+def ranking_metrics(total_bets, wins, losses, pnl, units, total_stake) -> dict:
+    """Build the sortable metric expressions from aggregate columns."""
+    decided = wins + losses
+    return {
+        'roi': case(
+            (total_stake > 0, pnl / total_stake * 100),
+            else_=0
+        ),
+        'units': units,
+        'win_rate': case(
+            (decided > 0, wins * 100.0 / decided),
+            else_=0
+        ),
+        'total_bets': total_bets,
+    }
+
+
+def rank_order(metrics: dict, sort: str) -> list:
+    """Order by the sort metric; ties fall back to ROI, then units."""
+    return [metrics[sort].desc()] + [
+        metrics[key].desc() for key in ('roi', 'units') if key != sort
+    ]
+
+
+def leaderboard_totals(group_id: UUID, start: datetime, end: datetime):
+    """Build one row of totals per member from bets placed in [start, end).
+
+    The per-member aggregate is a LATERAL subquery filtered on user_id and
+    a half-open placed_at range, so Postgres answers it with one
+    (user_id, placed_at) index range scan per member instead of scanning
+    every bet in the members' full histories.
+    """
+    member_bets = select(
+        func.count().label('total_bets'),
+        func.coalesce(func.sum(
+            case((models.Bet.status == 'Won', 1), else_=0)
+        ), 0).label('wins'),
+        func.coalesce(func.sum(
+            case((models.Bet.status == 'Lost', 1), else_=0)
+        ), 0).label('losses'),
+        func.coalesce(func.sum(models.Bet.result_profit), 0).label('pnl'),
+        func.coalesce(_decided(models.Bet.units), 0).label('units'),
+        func.coalesce(_decided(models.Bet.stake), 0).label('total_stake')
+    ).where(
+        *_in_period(models.GroupMember.user_id, start, end)
+    ).lateral('member_bets')
+
+    return select(
+        models.User.id.label('user_id'),
+        models.User.email,
+        member_bets.c.total_bets,
+        member_bets.c.wins,
+        member_bets.c.losses,
+        member_bets.c.pnl,
+        member_bets.c.units,
+        member_bets.c.total_stake
+    ).select_from(
+        models.GroupMember
+    ).join(
+        models.User,
+        models.User.id == models.GroupMember.user_id
+    ).join(
+        member_bets,
+        true()
+    ).where(
+        models.GroupMember.group_id == group_id
+    ).subquery('member_stats')
+
+
+def monthly_leaderboard_totals(group_id: UUID, month: str):
+    """Build one row of totals per member from precomputed monthly stats.
+
+    Served from UserMonthlyStats, so the cost is one primary-key lookup
+    per member regardless of how many bets they have.
+    """
+    return select(
+        models.User.id.label('user_id'),
+        models.User.email,
+        func.coalesce(models.UserMonthlyStats.total_bets, 0).label('total_bets'),
+        func.coalesce(models.UserMonthlyStats.wins, 0).label('wins'),
+        func.coalesce(models.UserMonthlyStats.losses, 0).label('losses'),
+        func.coalesce(models.UserMonthlyStats.pnl, 0).label('pnl'),
+        func.coalesce(models.UserMonthlyStats.units, 0).label('units'),
+        func.coalesce(models.UserMonthlyStats.staked, 0).label('total_stake'),
+        models.UserMonthlyStats.sport_breakdown
+    ).select_from(
+        models.GroupMember
+    ).join(
+        models.User,
+        models.User.id == models.GroupMember.user_id
+    ).outerjoin(
+        models.UserMonthlyStats,
+        and_(
+            models.UserMonthlyStats.user_id == models.GroupMember.user_id,
+            models.UserMonthlyStats.month_year == month
+        )
+    ).where(
+        models.GroupMember.group_id == group_id
+    ).subquery('member_stats')
+
+
+def _member_sports(user_id, start: datetime, end: datetime, top_sport_by: str):
+    """Build a LATERAL of a member's per-sport units, numbered by top_sport_by."""
+    sport_units = _decided(models.Bet.units)
+    if top_sport_by == "units":
+        sport_order = (sport_units.desc(), func.count().desc())
+    else:
+        sport_order = (func.count().desc(), sport_units.desc())
+
+    return select(
+        models.Bet.sport,
+        sport_units.label('sport_units'),
+        func.row_number().over(
+            order_by=(*sport_order, cast(models.Bet.sport, String))
+        ).label('sport_rank')
+    ).where(
+        *_in_period(user_id, start, end)
+    ).group_by(models.Bet.sport).lateral('member_sports')
+
+
+def query_leaderboard(
+    db: Session,
+    group_id: UUID,
+    window: Period,
+    viewer_id: UUID,
+    sort: str = "roi",
+    top_sport_by: str = "bets",
+    splits: bool = False,
+    cursor: int = 0,
+    limit: int = 100,
+    around_me: int | None = None
+) -> tuple[list[dict], int]:
+    """Rank a group's members for a period and return one page.
+
+    Ranking happens in Postgres: ROI and win rate are derived from the
+    member totals and ordered with RANK() (ties share a rank) and
+    ROW_NUMBER() (a stable position used as the cursor). Only the page,
+    or the viewer's neighbourhood with around_me, is returned.
+
+    For raw periods a per-sport LATERAL joined after paging supplies the
+    top sport (and splits), so sports are only aggregated for members on
+    the page. Monthly periods read the stored sport breakdown instead.
+    Either way it is a single statement regardless of group size.
+
+    Returns the page's entries and the number of ranked members.
+    """
+    monthly = window.kind == "month"
+    if monthly:
+        totals = monthly_leaderboard_totals(group_id, window.label)
+    else:
+        totals = leaderboard_totals(group_id, window.start, window.end)
+
+    sort_columns = ranking_metrics(
+        totals.c.total_bets, totals.c.wins, totals.c.losses,
+        totals.c.pnl, totals.c.units, totals.c.total_stake
+    )
+    order = rank_order(sort_columns, sort)
+
+    ranked = select(
+        totals,
+        sort_columns['roi'].label('roi'),
+        sort_columns['win_rate'].label('win_rate'),
+        func.rank().over(order_by=order).label('rank'),
+        func.row_number().over(order_by=(*order, totals.c.email)).label('position')
+    ).cte('ranked')
+
+    if around_me is not None:
+        viewer_position = select(ranked.c.position).where(
+            ranked.c.user_id == viewer_id
+        ).scalar_subquery()
+        page = ranked.c.position.between(viewer_position - around_me, viewer_position + around_me)
+    else:
+        page = and_(ranked.c.position > cursor, ranked.c.position <= cursor + limit)
+
+    if monthly:
+        rows = select(ranked).where(page).subquery('page')
+        order_by = (rows.c.position,)
+    else:
+        member_sports = _member_sports(ranked.c.user_id, window.start, window.end, top_sport_by)
+        rows = select(
+            ranked,
+            member_sports.c.sport,
+            member_sports.c.sport_units,
+            member_sports.c.sport_rank
+        ).select_from(
+            ranked
+        ).outerjoin(
+            member_sports,
+            true() if splits else member_sports.c.sport_rank == 1
+        ).where(page).subquery('page')
+        order_by = (rows.c.position, rows.c.sport_rank)
+
+    # The member count rides along on every row, and on a lone row of
+    # NULLs when the page is past the end
+    counts = select(func.count().label('total_members')).select_from(ranked).subquery('counts')
+    query = select(
+        counts.c.total_members,
+        rows
+    ).select_from(
+        counts
+    ).outerjoin(
+        rows,
+        true()
+    ).order_by(*order_by)
+
+    entries = {}
+    total_members = 0
+    for row in db.execute(query):
+        total_members = row.total_members
+        if row.user_id is None:
+            continue
+        entry = entries.get(row.user_id)
+        if entry is None:
+            entry = entries[row.user_id] = {
+                'rank': row.rank,
+                'position': row.position,
+                'user_id': row.user_id,
+                'email': row.email,
+                'roi': round(float(row.roi), 2),
+                'units': round(float(row.units), 2),
+                'win_rate': round(float(row.win_rate), 2),
+                'total_bets': int(row.total_bets),
+                'wins': int(row.wins),
+                'losses': int(row.losses),
+                'top_sport': None,
+                'sport_splits': {} if splits else None
+            }
+            if monthly:
+                breakdown = row.sport_breakdown or {}
+                entry['top_sport'] = top_sport(breakdown, top_sport_by)
+                if splits:
+                    entry['sport_splits'] = {
+                        sport: round(float(values['units']), 2) for sport, values in breakdown.items()
+                    }
+
+        if monthly or row.sport is None:
+            continue
+        if row.sport_rank == 1:
+            entry['top_sport'] = row.sport.value
+        if splits:
+            entry['sport_splits'][row.sport.value] = round(float(row.sport_units or 0), 2)
+
+    return list(entries.values()), total_members
+
+
+def query_leaderboard_history(
+    db: Session,
+    group_id: UUID,
+    months: list[str],
+    sort: str = "roi",
+    windows: list[int] | None = None,
+    now: datetime | None = None
+) -> list:
+    """Rank a group's members in every month of a range in one statement.
+
+    Members are crossed with the months and outer-joined to their
+    precomputed monthly stats, then ranked with RANK() partitioned by
+    month, so each month matches what the monthly leaderboard shows.
+    With windows, each row also carries the member's trailing-window
+    standings from rolling_standings() (repeated on every month row).
+    Returns one row per (member, month), ordered by member then month.
+    """
+    month_list = values(
+        column('month_year', String),
+        name='months'
+    ).data([(month,) for month in months])
+
+    stats = models.UserMonthlyStats
+    metrics = ranking_metrics(
+        func.coalesce(stats.total_bets, 0),
+        func.coalesce(stats.wins, 0),
+        func.coalesce(stats.losses, 0),
+        func.coalesce(stats.pnl, 0),
+        func.coalesce(stats.units, 0),
+        func.coalesce(stats.staked, 0)
+    )
+
+    rolling = rolling_standings(group_id, windows, sort, now) if windows else None
+
+    query = select(
+        models.User.id.label('user_id'),
+        models.User.email,
+        month_list.c.month_year.label('period'),
+        metrics['total_bets'].label('total_bets'),
+        metrics['roi'].label('roi'),
+        metrics['units'].label('units'),
+        metrics['win_rate'].label('win_rate'),
+        func.rank().over(
+            partition_by=month_list.c.month_year,
+            order_by=rank_order(metrics, sort)
+        ).label('rank')
+    ).select_from(
+        models.GroupMember
+    ).join(
+        models.User,
+        models.User.id == models.GroupMember.user_id
+    ).join(
+        month_list,
+        true()
+    ).outerjoin(
+        stats,
+        and_(
+            stats.user_id == models.GroupMember.user_id,
+            stats.month_year == month_list.c.month_year
+        )
+    ).where(
+        models.GroupMember.group_id == group_id
+    ).order_by(
+        models.User.email,
+        month_list.c.month_year
+    )
+
+    if rolling is not None:
+        query = query.add_columns(
+            *(c for c in rolling.c if c.key != 'user_id')
+        ).outerjoin(
+            rolling,
+            rolling.c.user_id == models.GroupMember.user_id
+        )
+
+    return db.execute(query).all()
+
+
+def rolling_standings(
+    group_id: UUID,
+    windows: list[int],
+    sort: str = "roi",
+    now: datetime | None = None
+):
+    """Rank a group's members over trailing windows of days.
+
+    A LATERAL per member scans the longest window once on the
+    (user_id, placed_at) index and splits it into every shorter window
+    with conditional sums. Each window is then ranked with its own RANK().
+    Returns a subquery with one row per member and columns suffixed by
+    the window, e.g. roi_30 and rank_30.
+    """
+    now = now or datetime.utcnow()
+    longest = now - timedelta(days=max(windows))
+
+    aggregates = []
+    for days in windows:
+        in_window = models.Bet.placed_at >= now - timedelta(days=days)
+        decided = and_(in_window, models.Bet.status.in_(['Won', 'Lost']))
+        aggregates += [
+            func.count().filter(in_window).label(f'total_bets_{days}'),
+            func.count().filter(and_(in_window, models.Bet.status == 'Won')).label(f'wins_{days}'),
+            func.count().filter(and_(in_window, models.Bet.status == 'Lost')).label(f'losses_{days}'),
+            func.coalesce(func.sum(models.Bet.result_profit).filter(in_window), 0).label(f'pnl_{days}'),
+            func.coalesce(func.sum(models.Bet.units).filter(decided), 0).label(f'units_{days}'),
+            func.coalesce(func.sum(models.Bet.stake).filter(decided), 0).label(f'stake_{days}'),
+        ]
+
+    member_bets = select(*aggregates).where(
+        models.Bet.user_id == models.GroupMember.user_id,
+        models.Bet.placed_at >= longest,
+        models.Bet.placed_at < now
+    ).lateral('member_bets')
+
+    columns = []
+    for days in windows:
+        metrics = ranking_metrics(*(
+            member_bets.c[f'{name}_{days}']
+            for name in ('total_bets', 'wins', 'losses', 'pnl', 'units', 'stake')
+        ))
+        columns += [
+            metrics['total_bets'].label(f'total_bets_{days}'),
+            metrics['roi'].label(f'roi_{days}'),
+            metrics['units'].label(f'units_{days}'),
+            metrics['win_rate'].label(f'win_rate_{days}'),
+            func.rank().over(order_by=rank_order(metrics, sort)).label(f'rank_{days}'),
+        ]
+
+    return select(
+        models.GroupMember.user_id,
+        *columns
+    ).select_from(
+        models.GroupMember
+    ).join(
+        member_bets,
+        true()
+    ).where(
+        models.GroupMember.group_id == group_id
+    ).subquery('rolling')
@@ -0,0 +1,170 @@
+"""Live leaderboard updates pushed over the pub/sub bus.
+
+Bet write paths publish the groups a user belongs to on DIRTY_CHANNEL.
+A single LeaderboardBroadcaster per process collects those, waits out the
+coalescing interval, then recomputes each dirty group's leaderboard once
+and publishes the rank changes on that group's channel, where every SSE
+subscriber picks them up. A burst of settlements therefore costs one
+recompute per group per interval no matter how many clients are watching.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Optional
+from uuid import UUID
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.core.config import settings
+from app.core.pubsub import PubSubBackend, get_bus
+from app.db import models
+from app.db.session import SessionLocal
+from app.utils.leaderboard import query_leaderboard
+from app.utils.periods import resolve_period
+
+logger = logging.getLogger(__name__)
+
+DIRTY_CHANNEL = "leaderboard:dirty"
+
+# Streamed leaderboards cover the top of the current month's ranking
+STREAM_MAX_ENTRIES = 1000
+
+
+def group_channel(group_id: UUID) -> str:
+    """Return the bus channel carrying a group's leaderboard updates."""
+    return f"leaderboard:{group_id}"
+
+
+def publish_bet_change(db: Session, user_id: UUID) -> None:
+    """Mark every group the user belongs to as needing a leaderboard refresh.
+
+    Call after committing a bet change.
+    """
+    bus = get_bus()
+    if not bus.has_subscribers(DIRTY_CHANNEL):
+        return
+
+    group_ids = [
+        str(row.group_id) for row in db.query(models.GroupMember.group_id).filter(
+            models.GroupMember.user_id == user_id
+        )
+    ]
+    if group_ids:
+        bus.publish(DIRTY_CHANNEL, {"group_ids": group_ids})
+
+
+def compute_snapshot(group_id: UUID) -> tuple[str, dict[str, dict[str, Any]]]:
+    """Rank a group for the current month in a fresh session.
+
+    Returns the month label and JSON-ready entries keyed by user id.
+    """
+    window = resolve_period("month")
+    db = SessionLocal()
+    try:
+        entries, _ = query_leaderboard(db, group_id, window, None, limit=STREAM_MAX_ENTRIES)
+    finally:
+        db.close()
+
+    return window.label, {
+        str(entry["user_id"]): schemas.LeaderboardEntry(**entry).model_dump(mode="json")
+        for entry in entries
+    }
+
+
+def snapshot_message(group_id: UUID, month: str, entries: dict[str, dict]) -> dict[str, Any]:
+    """Build a full-leaderboard message."""
+    return {
+        "type": "snapshot",
+        "group_id": str(group_id),
+        "month": month,
+        "leaderboard": sorted(entries.values(), key=lambda entry: entry["position"]),
+    }
+
+
+def diff_snapshots(previous: dict[str, dict], current: dict[str, dict]) -> tuple[list[dict], list[str]]:
+    """Return entries that are new or changed, and user ids that dropped out."""
+    changed = [entry for user_id, entry in current.items() if previous.get(user_id) != entry]
+    removed = [user_id for user_id in previous if user_id not in current]
+    changed.sort(key=lambda entry: entry["position"])
+    return changed, removed
+
+
+def format_sse(event: str, data: dict[str, Any]) -> str:
+    """Encode one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class LeaderboardBroadcaster:
+    """Coalesces dirty groups and publishes leaderboard deltas."""
+
+    def __init__(self, bus: Optional[PubSubBackend] = None, interval: Optional[float] = None):
+        self.bus = bus or get_bus()
+        self.interval = settings.LEADERBOARD_STREAM_INTERVAL_SECONDS if interval is None else interval
+        self._snapshots: dict[UUID, tuple[str, dict[str, dict]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start consuming dirty-group notifications on the running loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        subscription = self.bus.subscribe(DIRTY_CHANNEL)
+        try:
+            while True:
+                dirty = set((await subscription.get())["group_ids"])
+
+                # Let the burst settle, then take everything that arrived meanwhile
+                await asyncio.sleep(self.interval)
+                for message in subscription.drain():
+                    dirty.update(message["group_ids"])
+
+                for group_id in dirty:
+                    try:
+                        await self.refresh(UUID(group_id))
+                    except Exception:
+                        logger.exception("Failed to refresh leaderboard for group %s", group_id)
+        finally:
+            subscription.close()
+
+    async def refresh(self, group_id: UUID) -> None:
+        """Recompute one group's leaderboard and publish what changed."""
+        channel = group_channel(group_id)
+        if not self.bus.has_subscribers(channel):
+            self._snapshots.pop(group_id, None)
+            return
+
+        month, current = await run_in_threadpool(compute_snapshot, group_id)
+        previous = self._snapshots.get(group_id)
+        self._snapshots[group_id] = (month, current)
+
+        # Nothing to diff against, or the month rolled over
+        if previous is None or previous[0] != month:
+            self.bus.publish(channel, snapshot_message(group_id, month, current))
+            return
+
+        changed, removed = diff_snapshots(previous[1], current)
+        if changed or removed:
+            self.bus.publish(channel, {
+                "type": "delta",
+                "group_id": str(group_id),
+                "month": month,
+                "changed": changed,
+                "removed": removed,
+            })
+
+
+leaderboard_broadcaster = LeaderboardBroadcaster()
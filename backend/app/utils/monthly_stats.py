@@ -0,0 +1,223 @@
+"""Maintenance of precomputed per-user monthly stats (UserMonthlyStats)."""
+
+from datetime import datetime
+from itertools import groupby
+from typing import Iterable, Iterator, Optional
+from uuid import UUID
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.utils.periods import month_bounds
+from app.utils.platform_stats import PERCENTILE_METRICS, record_stat_change
+
+
+STAT_FIELDS = (
+    "total_bets", "wins", "losses", "pushes", "units",
+    "pnl", "staked", "roi", "win_rate", "top_sport", "sport_breakdown",
+)
+
+# Orderings for picking a member's top sport; later keys break ties
+TOP_SPORT_ORDERINGS = ("bets", "units")
+
+# Rows per INSERT when rebuilding
+REBUILD_BATCH_SIZE = 1000
+
+# Float fields are compared with this tolerance by the consistency checker
+FLOAT_TOLERANCE = 0.01
+
+
+def month_key(dt: Optional[datetime]) -> Optional[str]:
+    """Return the YYYY-MM stats key for a timestamp."""
+    return dt.strftime("%Y-%m") if dt else None
+
+
+def _sport_aggregates() -> tuple:
+    """Per-sport aggregate columns shared by refresh, rebuild and check."""
+    return (
+        func.count().label("total_bets"),
+        func.sum(case((models.Bet.status == 'Won', 1), else_=0)).label("wins"),
+        func.sum(case((models.Bet.status == 'Lost', 1), else_=0)).label("losses"),
+        func.sum(case((models.Bet.status == 'Push', 1), else_=0)).label("pushes"),
+        func.sum(models.Bet.result_profit).label("pnl"),
+        func.sum(
+            case((models.Bet.status.in_(['Won', 'Lost']), models.Bet.units), else_=0)
+        ).label("units"),
+        func.sum(
+            case((models.Bet.status.in_(['Won', 'Lost']), models.Bet.stake), else_=0)
+        ).label("staked"),
+    )
+
+
+def top_sport(breakdown: Optional[dict], by: str = "bets") -> Optional[str]:
+    """Pick the top sport from a {sport: {"bets", "units"}} breakdown.
+
+    Ranks by bet count or units, using the other as a tie-breaker and the
+    sport name last so the choice is deterministic.
+    """
+    if not breakdown:
+        return None
+    other = "units" if by == "bets" else "bets"
+    return min(breakdown, key=lambda sport: (-breakdown[sport][by], -breakdown[sport][other], sport))
+
+
+def _fold(sport_rows: Iterable) -> Optional[dict]:
+    """Combine per-sport aggregate rows into one month's stats.
+
+    Returns None when there are no bets. ROI and win rate are derived
+    the same way as the leaderboard; top_sport is the most-bet sport, ties
+    broken by units.
+    """
+    totals = {"total_bets": 0, "wins": 0, "losses": 0, "pushes": 0, "units": 0.0, "pnl": 0.0, "staked": 0.0}
+    breakdown = {}
+
+    for row in sport_rows:
+        for field, total in totals.items():
+            totals[field] = total + type(total)(getattr(row, field) or 0)
+        sport = row.sport.value if hasattr(row.sport, "value") else row.sport
+        breakdown[sport] = {"bets": row.total_bets, "units": round(float(row.units or 0), 4)}
+
+    if totals["total_bets"] == 0:
+        return None
+
+    decided = totals["wins"] + totals["losses"]
+    totals["units"] = round(float(totals["units"]), 4)
+    totals["pnl"] = round(float(totals["pnl"]), 2)
+    totals["staked"] = round(float(totals["staked"]), 2)
+    totals["roi"] = round(totals["pnl"] / totals["staked"] * 100, 2) if totals["staked"] > 0 else 0.0
+    totals["win_rate"] = round(totals["wins"] / decided * 100, 2) if decided > 0 else 0.0
+    totals["top_sport"] = top_sport(breakdown)
+    totals["sport_breakdown"] = breakdown
+    return totals
+
+
+def _store(db: Session, user_id: UUID, month: str, stats: Optional[dict]) -> None:
+    """Upsert one user-month row, or delete it when the month has no bets.
+
+    Also queues the change for the platform percentile sketches.
+    """
+    previous = db.query(
+        *(getattr(models.UserMonthlyStats, metric) for metric in PERCENTILE_METRICS)
+    ).filter(
+        models.UserMonthlyStats.user_id == user_id,
+        models.UserMonthlyStats.month_year == month
+    ).first()
+    record_stat_change(db, month, previous._asdict() if previous else None, stats)
+
+    if stats is None:
+        db.query(models.UserMonthlyStats).filter(
+            models.UserMonthlyStats.user_id == user_id,
+            models.UserMonthlyStats.month_year == month
+        ).delete(synchronize_session=False)
+        return
+
+    values = dict(stats, updated_at=datetime.utcnow())
+    db.execute(
+        insert(models.UserMonthlyStats).values(user_id=user_id, month_year=month, **values).on_conflict_do_update(
+            index_elements=["user_id", "month_year"],
+            set_=values
+        )
+    )
+
+
+def refresh_user_months(db: Session, user_id: UUID, months: Iterable[Optional[str]]) -> None:
+    """Recompute a user's stats for the given months from their bets.
+
+    Call after changing bets and before committing, so the stats commit
+    atomically with the bets. Each month is one aggregate over a single
+    (user_id, placed_at) index range, so the cost doesn't grow with the
+    user's full history.
+    """
+    months = sorted({month for month in months if month})
+    if not months:
+        return
+
+    db.flush()
+    for month in months:
+        start, end = month_bounds(month)
+        rows = db.query(models.Bet.sport, *_sport_aggregates()).filter(
+            models.Bet.user_id == user_id,
+            models.Bet.placed_at >= start,
+            models.Bet.placed_at < end
+        ).group_by(models.Bet.sport).all()
+        _store(db, user_id, month, _fold(rows))
+
+
+def compute_monthly_stats(db: Session, user_id: Optional[UUID] = None) -> Iterator[tuple[UUID, str, dict]]:
+    """Stream (user_id, month, stats) computed from raw bets.
+
+    Used for backfills and consistency checks; scans every bet (or every
+    bet of one user).
+    """
+    month = func.to_char(models.Bet.placed_at, 'YYYY-MM')
+    query = db.query(
+        models.Bet.user_id,
+        month.label("month_year"),
+        models.Bet.sport,
+        *_sport_aggregates()
+    ).group_by(
+        models.Bet.user_id, month, models.Bet.sport
+    ).order_by(
+        models.Bet.user_id, month
+    )
+    if user_id is not None:
+        query = query.filter(models.Bet.user_id == user_id)
+
+    rows = query.yield_per(REBUILD_BATCH_SIZE)
+    for (row_user_id, row_month), sport_rows in groupby(rows, key=lambda r: (r.user_id, r.month_year)):
+        yield row_user_id, row_month, _fold(sport_rows)
+
+
+def rebuild_monthly_stats(db: Session, user_id: Optional[UUID] = None) -> int:
+    """Replace stored monthly stats with values recomputed from raw bets.
+
+    Returns the number of user-month rows written. Does not commit.
+    """
+    delete = db.query(models.UserMonthlyStats)
+    if user_id is not None:
+        delete = delete.filter(models.UserMonthlyStats.user_id == user_id)
+    delete.delete(synchronize_session=False)
+
+    now = datetime.utcnow()
+    written = 0
+    batch = []
+    for row_user_id, month, stats in compute_monthly_stats(db, user_id):
+        batch.append(dict(stats, user_id=row_user_id, month_year=month, updated_at=now))
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            db.execute(insert(models.UserMonthlyStats), batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(models.UserMonthlyStats), batch)
+        written += len(batch)
+
+    return written
+
+
+def check_monthly_stats(db: Session, user_id: Optional[UUID] = None) -> list[str]:
+    """Compare stored monthly stats with raw bets and describe any drift."""
+    expected = {(u, m): stats for u, m, stats in compute_monthly_stats(db, user_id)}
+
+    query = db.query(models.UserMonthlyStats)
+    if user_id is not None:
+        query = query.filter(models.UserMonthlyStats.user_id == user_id)
+    stored = {(row.user_id, row.month_year): row for row in query.yield_per(REBUILD_BATCH_SIZE)}
+
+    problems = []
+    for key in sorted(expected.keys() - stored.keys(), key=str):
+        problems.append(f"{key[0]} {key[1]}: missing")
+    for key in sorted(stored.keys() - expected.keys(), key=str):
+        problems.append(f"{key[0]} {key[1]}: stored but user has no bets that month")
+    for key in sorted(expected.keys() & stored.keys(), key=str):
+        for field in STAT_FIELDS:
+            want, have = expected[key][field], getattr(stored[key], field)
+            if isinstance(want, float) or isinstance(have, float):
+                if abs((want or 0) - (have or 0)) <= FLOAT_TOLERANCE:
+                    continue
+            elif want == have:
+                continue
+            problems.append(f"{key[0]} {key[1]}: {field} stored={have} expected={want}")
+
+    return problems
@@ -0,0 +1,107 @@
+"""Leaderboard period parsing into half-open [start, end) datetime ranges."""
+
+from datetime import date, datetime, timedelta
+from typing import NamedTuple, Optional
+
+
+# Betting seasons start in September so a season covers the NFL, NCAA,
+# NBA and NHL calendars without splitting them across two labels
+SEASON_START_MONTH = 9
+
+PERIODS = ("week", "month", "season", "custom")
+
+
+class Period(NamedTuple):
+    """A labelled half-open datetime range."""
+    kind: str
+    label: str
+    start: datetime
+    end: datetime
+
+
+def month_bounds(month: str) -> tuple[datetime, datetime]:
+    """Return [start, end) for a month in YYYY-MM format."""
+    start = datetime.strptime(month, "%Y-%m")
+    if start.month == 12:
+        end = start.replace(year=start.year + 1, month=1)
+    else:
+        end = start.replace(month=start.month + 1)
+    return start, end
+
+
+def month_range(first: str, last: str) -> list[str]:
+    """Return every YYYY-MM month from first through last inclusive."""
+    start, _ = month_bounds(first)
+    end, _ = month_bounds(last)
+    months = []
+    while start <= end:
+        months.append(start.strftime("%Y-%m"))
+        start = month_bounds(months[-1])[1]
+    return months
+
+
+def week_bounds(week: str) -> tuple[datetime, datetime]:
+    """Return [start, end) for an ISO week in YYYY-Www format (Monday start)."""
+    year, _, number = week.upper().partition("-W")
+    start = datetime.combine(date.fromisocalendar(int(year), int(number), 1), datetime.min.time())
+    return start, start + timedelta(days=7)
+
+
+def season_bounds(season: str) -> tuple[datetime, datetime]:
+    """Return [start, end) for the betting season starting in September of YYYY."""
+    year = int(season)
+    return datetime(year, SEASON_START_MONTH, 1), datetime(year + 1, SEASON_START_MONTH, 1)
+
+
+def current_month() -> str:
+    """Return the current UTC month in YYYY-MM format."""
+    return datetime.utcnow().strftime("%Y-%m")
+
+
+def resolve_period(
+    period: str = "month",
+    month: Optional[str] = None,
+    week: Optional[str] = None,
+    season: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Period:
+    """Resolve leaderboard query parameters into a Period.
+
+    Missing values default to the period containing the current time.
+    Raises ValueError for unknown periods or malformed values.
+    """
+    now = datetime.utcnow()
+
+    if period == "month":
+        month = month or current_month()
+        try:
+            return Period("month", month, *month_bounds(month))
+        except ValueError:
+            raise ValueError("month must be in YYYY-MM format")
+
+    if period == "week":
+        if not week:
+            iso = now.isocalendar()
+            week = f"{iso.year}-W{iso.week:02d}"
+        try:
+            return Period("week", week, *week_bounds(week))
+        except ValueError:
+            raise ValueError("week must be an ISO week in YYYY-Www format")
+
+    if period == "season":
+        if not season:
+            season = str(now.year if now.month >= SEASON_START_MONTH else now.year - 1)
+        try:
+            return Period("season", season, *season_bounds(season))
+        except ValueError:
+            raise ValueError("season must be a year in YYYY format")
+
+    if period == "custom":
+        if start is None or end is None:
+            raise ValueError("Custom periods require both start and end")
+        if end <= start:
+            raise ValueError("end must be after start")
+        return Period("custom", f"{start.date().isoformat()}..{end.date().isoformat()}", start, end)
+
+    raise ValueError(f"Period must be one of: {', '.join(PERIODS)}")
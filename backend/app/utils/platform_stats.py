@@ -0,0 +1,224 @@
+"""Platform-wide percentiles of per-user monthly stats.
+
+Each (metric, month) keeps a SignedQuantileSketch over every user's
+value. Writes to user monthly stats append +1/-1 PlatformSketchDelta rows
+in the same transaction (an insert, so bet writes never queue on a shared
+row); the SketchCompactor folds pending deltas into the persisted
+sketches every SKETCH_COMPACT_INTERVAL_SECONDS. Reads deserialize a
+sketch of a few KB, cached briefly in process, so percentile lookups
+cost the same for ten users or ten million.
+
+Percentiles may trail writes by one compaction interval. The rank error
+is at most rank_error() of the sketch (about 1.7 percentile points
+without churn); a month whose churn would push it past
+MAX_CHURN is rebuilt from user_monthly_stats during compaction.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+from app.utils.quantiles import SignedQuantileSketch
+
+logger = logging.getLogger(__name__)
+
+PERCENTILE_METRICS = ("roi", "units", "win_rate")
+
+# Deltas folded per compaction transaction
+COMPACT_BATCH_SIZE = 10000
+
+# Rebuild a month's sketch once (added + removed) / live exceeds this,
+# capping the rank error at MAX_CHURN times the churn-free bound
+MAX_CHURN = 2.0
+
+# Deserialized sketches are reused for this long
+SKETCH_CACHE_SECONDS = 30
+
+_sketch_cache: dict[tuple[str, str], tuple[float, Optional[SignedQuantileSketch]]] = {}
+_sketch_cache_lock = threading.Lock()
+
+
+def record_stat_change(db: Session, month: str, old: Optional[dict], new: Optional[dict]) -> None:
+    """Queue sketch updates for one user-month changing from old to new stats."""
+    rows = []
+    for metric in PERCENTILE_METRICS:
+        before = old[metric] if old else None
+        after = new[metric] if new else None
+        if before == after:
+            continue
+        if before is not None:
+            rows.append({"metric": metric, "month_year": month, "value": before, "weight": -1})
+        if after is not None:
+            rows.append({"metric": metric, "month_year": month, "value": after, "weight": 1})
+
+    if rows:
+        db.execute(insert(models.PlatformSketchDelta), rows)
+
+
+def _build_sketch(db: Session, metric: str, month: str) -> SignedQuantileSketch:
+    """Build a sketch from the exact monthly stats."""
+    sketch = SignedQuantileSketch()
+    column = getattr(models.UserMonthlyStats, metric)
+    for (value,) in db.query(column).filter(models.UserMonthlyStats.month_year == month).yield_per(10000):
+        sketch.add(value)
+    return sketch
+
+
+def _save_sketch(db: Session, metric: str, month: str, sketch: SignedQuantileSketch) -> None:
+    values = {"payload": sketch.to_bytes(), "user_count": sketch.n, "updated_at": datetime.utcnow()}
+    db.execute(
+        insert(models.PlatformSketch).values(metric=metric, month_year=month, **values).on_conflict_do_update(
+            index_elements=["metric", "month_year"],
+            set_=values
+        )
+    )
+
+
+def compact_sketches(db: Session) -> int:
+    """Fold a batch of pending deltas into their sketches and commit.
+
+    Safe to run from several processes: deltas are claimed with
+    SKIP LOCKED and each sketch row is locked while it is rewritten.
+    Returns the number of deltas folded.
+    """
+    deltas = db.query(models.PlatformSketchDelta).order_by(
+        models.PlatformSketchDelta.id
+    ).with_for_update(skip_locked=True).limit(COMPACT_BATCH_SIZE).all()
+    if not deltas:
+        db.rollback()
+        return 0
+
+    by_sketch = defaultdict(list)
+    for delta in deltas:
+        by_sketch[(delta.metric, delta.month_year)].append(delta)
+
+    for (metric, month), sketch_deltas in by_sketch.items():
+        row = db.query(models.PlatformSketch).filter(
+            models.PlatformSketch.metric == metric,
+            models.PlatformSketch.month_year == month
+        ).with_for_update().first()
+        sketch = SignedQuantileSketch.from_bytes(row.payload) if row else SignedQuantileSketch()
+
+        for delta in sketch_deltas:
+            if delta.weight > 0:
+                sketch.add(delta.value)
+            else:
+                sketch.remove(delta.value)
+
+        if sketch.churn() > MAX_CHURN:
+            # Later deltas for this month are already reflected in the stats;
+            # ones another compactor has claimed are left to it
+            pending = select(models.PlatformSketchDelta.id).where(
+                models.PlatformSketchDelta.metric == metric,
+                models.PlatformSketchDelta.month_year == month
+            ).with_for_update(skip_locked=True)
+            db.query(models.PlatformSketchDelta).filter(
+                models.PlatformSketchDelta.id.in_(pending)
+            ).delete(synchronize_session=False)
+            sketch = _build_sketch(db, metric, month)
+
+        _save_sketch(db, metric, month, sketch)
+
+    db.query(models.PlatformSketchDelta).filter(
+        models.PlatformSketchDelta.id.in_([delta.id for delta in deltas])
+    ).delete(synchronize_session=False)
+    db.commit()
+    return len(deltas)
+
+
+def rebuild_platform_sketches(db: Session) -> int:
+    """Rebuild every sketch from user_monthly_stats and drop pending deltas.
+
+    Returns the number of sketches written. Does not commit.
+    """
+    db.query(models.PlatformSketchDelta).delete(synchronize_session=False)
+    db.query(models.PlatformSketch).delete(synchronize_session=False)
+
+    months = [
+        row.month_year for row in db.query(models.UserMonthlyStats.month_year).distinct()
+    ]
+    for month in months:
+        for metric in PERCENTILE_METRICS:
+            _save_sketch(db, metric, month, _build_sketch(db, metric, month))
+
+    return len(months) * len(PERCENTILE_METRICS)
+
+
+def get_sketch(db: Session, metric: str, month: str) -> Optional[SignedQuantileSketch]:
+    """Return the persisted sketch for a metric and month, cached briefly."""
+    key = (metric, month)
+    now = time.monotonic()
+    with _sketch_cache_lock:
+        cached = _sketch_cache.get(key)
+        if cached and now - cached[0] < SKETCH_CACHE_SECONDS:
+            return cached[1]
+
+    row = db.query(models.PlatformSketch.payload).filter(
+        models.PlatformSketch.metric == metric,
+        models.PlatformSketch.month_year == month
+    ).first()
+    sketch = SignedQuantileSketch.from_bytes(row.payload) if row else None
+
+    with _sketch_cache_lock:
+        _sketch_cache[key] = (now, sketch)
+    return sketch
+
+
+def _compact_pending() -> int:
+    """Fold every pending delta, one batch per transaction."""
+    db = SessionLocal()
+    try:
+        total = 0
+        while True:
+            folded = compact_sketches(db)
+            total += folded
+            if folded < COMPACT_BATCH_SIZE:
+                return total
+    finally:
+        db.close()
+
+
+class SketchCompactor:
+    """Background task folding sketch deltas on an interval."""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = settings.SKETCH_COMPACT_INTERVAL_SECONDS if interval is None else interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start compacting on the running loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_in_threadpool(_compact_pending)
+            except Exception:
+                logger.exception("Failed to compact platform sketches")
+
+
+sketch_compactor = SketchCompactor()
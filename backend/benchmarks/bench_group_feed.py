@@ -0,0 +1,153 @@
+"""Load-test group feed fan-out writes and cursor reads.
+
+Usage:
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_group_feed [--users 5000] [--writes 5000]
+
+Seeds a throwaway "bench_group_feed" schema with --users users spread
+over groups of realistic sizes (most between 5 and 30 members, a few of
+several hundred), where each user belongs to one to eight groups and one
+"power user" belongs to --power-groups groups. Then:
+
+- places --writes bets from random users, each fanned out and committed
+  like POST /bets, and reports per-write latency and entries kept;
+- times the same write for the power user, whose fan-out is capped at
+  GROUP_FEED_MAX_FANOUT_GROUPS;
+- reads the largest group's feed from the newest page and from a deep
+  cursor, which should cost the same.
+
+The schema is dropped afterwards.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from sqlalchemy import create_engine, func, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db import models  # noqa: E402
+from app.utils.group_feed import query_feed, record_bet_events  # noqa: E402
+
+SCHEMA = "bench_group_feed"
+
+
+def seed(db, users: int, power_groups: int, rng: random.Random) -> tuple[list, uuid.UUID, uuid.UUID]:
+    """Insert users, groups and memberships; return user ids, the power user and the largest group."""
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    db.execute(models.User.__table__.insert(), [
+        {"id": user_id, "email": f"bench{i}@example.com", "hashed_password": "x",
+         "created_at": datetime.utcnow(), "updated_at": datetime.utcnow()}
+        for i, user_id in enumerate(user_ids)
+    ])
+
+    # Mostly small friend groups with a long tail of large public ones
+    sizes = []
+    seats = sum(rng.randint(1, 8) for _ in range(users))
+    while sum(sizes) < seats:
+        sizes.append(rng.randint(300, 800) if rng.random() < 0.01 else rng.randint(5, 30))
+
+    groups, members = [], set()
+    for i, size in enumerate(sizes):
+        group_id = uuid.uuid4()
+        groups.append({"id": group_id, "name": f"Group {i}", "owner_id": user_ids[0],
+                       "invite_code": f"bench{i}", "created_at": datetime.utcnow()})
+        for user_id in rng.sample(user_ids, min(size, users)):
+            members.add((group_id, user_id))
+
+    power_user = user_ids[0]
+    for group in rng.sample(groups, min(power_groups, len(groups))):
+        members.add((group["id"], power_user))
+
+    db.execute(models.Group.__table__.insert(), groups)
+    db.execute(models.GroupMember.__table__.insert(), [
+        {"group_id": group_id, "user_id": user_id, "joined_at": datetime.utcnow()}
+        for group_id, user_id in members
+    ])
+    db.commit()
+
+    largest = groups[max(range(len(groups)), key=sizes.__getitem__)]["id"]
+    print(f"Seeded {users} users, {len(groups)} groups, {len(members)} memberships "
+          f"(largest group {max(sizes)}, power user in {power_groups} groups)")
+    return user_ids, power_user, largest
+
+
+def place_bet(db, user_id: uuid.UUID) -> None:
+    """Insert a pending bet and fan it out, as POST /bets does."""
+    bet = models.Bet(
+        user_id=user_id, bet_name="Bench", sport=models.Sport.NFL, market_type=models.MarketType.ML,
+        odds_american=-110, stake=10, units=1, status=models.BetStatus.PENDING, placed_at=datetime.utcnow()
+    )
+    db.add(bet)
+    db.flush()
+    record_bet_events(db, user_id, models.Bet.id == bet.id)
+    db.commit()
+
+
+def time_ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) >= 20 else samples[-1]
+    print(f"{label:<28} p50 {statistics.median(samples):7.2f} ms  p95 {p95:7.2f} ms  max {samples[-1]:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--writes", type=int, default=5000)
+    parser.add_argument("--power-groups", type=int, default=300)
+    parser.add_argument("--reads", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    admin = create_engine(settings.DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    engine = create_engine(settings.DATABASE_URL, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    try:
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        user_ids, power_user, largest = seed(db, args.users, args.power_groups, rng)
+
+        writes = [time_ms(lambda: place_bet(db, rng.choice(user_ids))) for _ in range(args.writes)]
+        rows = db.query(func.count()).select_from(models.GroupFeedEntry).scalar()
+        report("fan-out write", writes)
+        print(f"{'':<28} {rows} feed entries kept after trimming")
+
+        power = [time_ms(lambda: place_bet(db, power_user)) for _ in range(50)]
+        report("fan-out write (power user)", power)
+
+        with engine.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM ANALYZE"))
+
+        pages, cursor = [], None
+        while True:
+            page, cursor = query_feed(db, largest, cursor, 50)
+            pages.append(cursor)
+            if cursor is None:
+                break
+        deep = pages[-2] if len(pages) > 1 else None
+
+        report("feed read (first page)", [time_ms(lambda: query_feed(db, largest, None, 50)) for _ in range(args.reads)])
+        report(f"feed read (page {len(pages) - 1})", [time_ms(lambda: query_feed(db, largest, deep, 50)) for _ in range(args.reads)])
+        db.close()
+    finally:
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
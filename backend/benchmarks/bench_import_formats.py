@@ -0,0 +1,97 @@
+"""Benchmark import throughput and peak memory per file format.
+
+Usage:
+    python -m benchmarks.bench_import_formats [--rows 100000]
+
+Writes the same synthetic bets as CSV, NDJSON, JSON and XLSX, then times
+read_and_parse (reader + shared parse/validate stage) on each and reports
+peak traced memory relative to the file size.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import time
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg://localhost/benchmark")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from openpyxl import Workbook  # noqa: E402
+
+from app.api.v1.imports import read_and_parse  # noqa: E402
+
+FIELDS = ["Event", "Sport", "Market", "Selection", "Odds", "Stake", "Result", "Date", "Sportsbook"]
+TEAMS = ["Chiefs", "Bills", "Eagles", "49ers", "Lakers", "Celtics", "Yankees", "Dodgers"]
+
+
+def build_rows(count: int, seed: int = 7) -> list[dict]:
+    """Build synthetic bet rows with typed values."""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        home, away = rng.sample(TEAMS, 2)
+        rows.append({
+            "Event": f"{away} @ {home}",
+            "Sport": "NFL",
+            "Market": "Moneyline",
+            "Selection": home,
+            "Odds": rng.choice([-1, 1]) * rng.randint(100, 400),
+            "Stake": rng.randint(5, 500),
+            "Result": rng.choice(["Win", "Loss", "Push"]),
+            "Date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 13:00",
+            "Sportsbook": rng.choice(["DraftKings", "FanDuel"]),
+        })
+    return rows
+
+
+def encode(rows: list[dict], extension: str) -> bytes:
+    """Serialize rows in the given format."""
+    if extension == ".csv":
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+        return out.getvalue().encode("utf-8")
+    if extension == ".ndjson":
+        return "\n".join(json.dumps(row) for row in rows).encode("utf-8")
+    if extension == ".json":
+        return json.dumps(rows).encode("utf-8")
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(FIELDS)
+    for row in rows:
+        sheet.append([row[field] for field in FIELDS])
+    out = io.BytesIO()
+    workbook.save(out)
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    for extension in (".csv", ".ndjson", ".json", ".xlsx"):
+        payload = encode(rows, extension)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        results = list(read_and_parse(io.BytesIO(payload), extension))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert len(results) == args.rows
+        print(
+            f"{extension:<8} {len(payload) / 1e6:6.1f} MB  {elapsed:6.2f}s  "
+            f"{args.rows / elapsed:>9,.0f} rows/s  peak {peak / 1e6:6.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark CSV import parsing across worker counts.
+
+Usage:
+    python -m benchmarks.bench_import_parse [--rows 400000] [--workers 1 2 4 8]
+
+Generates a synthetic sportsbook export (including quoted fields with
+embedded newlines) and times parse_csv_text for each worker count.
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg://localhost/benchmark")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+os.environ.setdefault("IMPORT_PARALLEL_MIN_BYTES", "0")
+
+from app.api.v1.imports import parse_csv_text  # noqa: E402
+
+HEADER = "Event,Sport,Market,Selection,Odds,Stake,Result,Date,Sportsbook,Notes\n"
+TEAMS = ["Chiefs", "Bills", "Eagles", "49ers", "Lakers", "Celtics", "Yankees", "Dodgers"]
+BOOKS = ["DraftKings", "FanDuel", "BetMGM", "Caesars"]
+
+
+def build_csv(rows: int, seed: int = 7) -> str:
+    """Build a synthetic CSV export with the given number of records."""
+    rng = random.Random(seed)
+    lines = [HEADER]
+    for i in range(rows):
+        home, away = rng.sample(TEAMS, 2)
+        odds = rng.choice([-1, 1]) * rng.randint(100, 400)
+        notes = '"line moved,\nfaded public"' if i % 50 == 0 else ""
+        lines.append(
+            f"{away} @ {home},NFL,Moneyline,{home},{odds:+d},${rng.randint(5, 500)}.00,"
+            f"{rng.choice(['Win', 'Loss', 'Push'])},2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 13:00,"
+            f"{rng.choice(BOOKS)},{notes}\n"
+        )
+    return "".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=400_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    csv_text = build_csv(args.rows)
+    print(f"{args.rows} rows, {len(csv_text) / 1e6:.1f} MB, {os.cpu_count()} CPUs")
+
+    baseline = None
+    expected = None
+    for workers in args.workers:
+        parse_csv_text(csv_text[:200_000], workers=workers)  # Warm up the pool
+        start = time.perf_counter()
+        results = parse_csv_text(csv_text, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        if expected is None:
+            expected = len(results)
+        assert len(results) == expected, "worker count changed the record count"
+
+        baseline = baseline or elapsed
+        print(
+            f"workers={workers:<2} {elapsed:7.2f}s  {len(results) / elapsed:>10,.0f} rows/s  "
+            f"speedup {baseline / elapsed:4.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
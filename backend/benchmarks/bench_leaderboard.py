@@ -0,0 +1,127 @@
+"""Benchmark the group leaderboard aggregate on a large synthetic group.
+
+Usage:
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_leaderboard [--members 500] [--bets 10000]
+
+Seeds a group of --members users with --bets bets each (spread over three
+years) into a throwaway "bench_leaderboard" schema, then times the month
+leaderboard with the old to_char() predicate and with the placed_at range
+used by query_leaderboard. The schema is dropped afterwards.
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from sqlalchemy import create_engine, func, case, and_, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db import models  # noqa: E402
+from app.utils.leaderboard import query_leaderboard  # noqa: E402
+from app.utils.periods import Period, month_bounds  # noqa: E402
+
+SCHEMA = "bench_leaderboard"
+MONTH = "2025-06"
+
+
+def to_char_stats(db, group_id, month):
+    """The pre-index leaderboard aggregate, kept for comparison."""
+    return db.query(
+        models.User.id,
+        func.count(models.Bet.id),
+        func.sum(case((models.Bet.status == 'Won', 1), else_=0)),
+        func.sum(models.Bet.result_profit),
+    ).join(
+        models.GroupMember, models.User.id == models.GroupMember.user_id
+    ).outerjoin(
+        models.Bet,
+        and_(
+            models.Bet.user_id == models.User.id,
+            func.to_char(models.Bet.placed_at, 'YYYY-MM') == month
+        )
+    ).filter(
+        models.GroupMember.group_id == group_id
+    ).group_by(models.User.id).all()
+
+
+def seed(db, members: int, bets: int):
+    """Insert one group, its members and their bets with set-based SQL."""
+    db.execute(text("""
+        INSERT INTO users (id, email, hashed_password, created_at, updated_at)
+        SELECT gen_random_uuid(), 'bench' || i || '@example.com', 'x', now(), now()
+        FROM generate_series(1, :members) AS i
+    """), {"members": members})
+    group_id = db.execute(text("""
+        INSERT INTO groups (id, name, owner_id, invite_code, created_at)
+        SELECT gen_random_uuid(), 'Benchmark', id, 'bench', now() FROM users LIMIT 1
+        RETURNING id
+    """)).scalar()
+    db.execute(text("""
+        INSERT INTO group_members (group_id, user_id, joined_at)
+        SELECT :group_id, id, now() FROM users
+    """), {"group_id": group_id})
+    db.execute(text("""
+        INSERT INTO bets (id, user_id, bet_name, sport, market_type, odds_american, stake, units,
+                          status, result_profit, placed_at, created_at, updated_at)
+        SELECT gen_random_uuid(), u.id, 'Bench', 'NFL', 'ML', -110, 10, 0.2,
+               CASE WHEN w THEN 'WON'::betstatus ELSE 'LOST'::betstatus END,
+               CASE WHEN w THEN 9.09 ELSE -10 END,
+               timestamp '2023-01-01' + random() * interval '3 years', now(), now()
+        FROM users u
+        CROSS JOIN LATERAL (SELECT random() < 0.5 AS w FROM generate_series(1, :bets)) AS b
+    """), {"bets": bets})
+    db.commit()
+    with db.get_bind().connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM ANALYZE"))
+    return group_id
+
+
+def time_query(fn, repeat: int) -> float:
+    """Return the median wall time of fn over repeat runs."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument("--bets", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    admin = create_engine(settings.DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    engine = create_engine(settings.DATABASE_URL, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    try:
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+
+        start = time.perf_counter()
+        group_id = seed(db, args.members, args.bets)
+        print(f"Seeded {args.members} members x {args.bets} bets in {time.perf_counter() - start:.1f}s")
+
+        # A custom window ranks from raw bets rather than the monthly rollup
+        window = Period("custom", MONTH, *month_bounds(MONTH))
+        old = time_query(lambda: to_char_stats(db, group_id, MONTH), args.repeat)
+        new = time_query(lambda: query_leaderboard(db, group_id, window, None, limit=args.members), args.repeat)
+        print(f"to_char predicate  {old * 1000:9.1f} ms")
+        print(f"placed_at range    {new * 1000:9.1f} ms  ({old / new:.1f}x faster)")
+        db.close()
+    finally:
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Check percentile sketch accuracy against exact ranks, with and without churn.
+
+Usage:
+    python -m benchmarks.bench_percentiles [--users 200000] [--churn 0.5] [--trials 5]
+
+Simulates a month of per-user ROI values: every user is added once, then
+a --churn fraction of users change their value (a removal plus an add),
+which is how monthly stats updates reach the sketch. Reports the worst
+rank error over 99 evenly spaced query points, the bound the sketch
+reports, sketch size, and query latency. Exits non-zero if any trial
+exceeds the reported bound.
+"""
+import argparse
+import bisect
+import random
+import sys
+import time
+
+from app.utils.quantiles import SignedQuantileSketch
+
+
+def simulate(users: int, churn: float, seed: int) -> tuple[SignedQuantileSketch, list[float]]:
+    """Feed a sketch the add/remove stream and return it with the exact live values."""
+    rng = random.Random(seed)
+    values = [rng.gauss(-3, 25) for _ in range(users)]
+
+    sketch = SignedQuantileSketch()
+    for value in values:
+        sketch.add(value)
+
+    for user in rng.sample(range(users), int(users * churn)):
+        sketch.remove(values[user])
+        values[user] = rng.gauss(-3, 25)
+        sketch.add(values[user])
+
+    return sketch, sorted(values)
+
+
+def max_rank_error(sketch: SignedQuantileSketch, exact: list[float]) -> float:
+    """Return the worst |estimated - exact| normalized rank over 99 query points."""
+    n = len(exact)
+    worst = 0.0
+    for i in range(1, 100):
+        value = exact[i * n // 100]
+        worst = max(worst, abs(sketch.rank(value) - bisect.bisect_right(exact, value)) / n)
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--churn", type=float, default=0.5)
+    parser.add_argument("--trials", type=int, default=5)
+    args = parser.parse_args()
+
+    failures = 0
+    for trial in range(args.trials):
+        sketch, exact = simulate(args.users, args.churn, seed=trial)
+        error = max_rank_error(sketch, exact)
+        bound = sketch.rank_error()
+
+        start = time.perf_counter()
+        for _ in range(100):
+            sketch.cdf(exact[len(exact) // 2])
+        cdf_us = (time.perf_counter() - start) / 100 * 1e6
+
+        failures += error > bound
+        print(
+            f"trial {trial}: max error {error * 100:5.2f} pts  bound {bound * 100:5.2f} pts  "
+            f"{len(sketch.to_bytes()) / 1024:5.1f} KB  cdf {cdf_us:6.0f} us"
+        )
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Measure the principal cache's hit rate and the per-request latency it saves.
+
+Usage:
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_principal_cache [--users 2000] [--requests 50000]
+
+Seeds --users users with settings into a throwaway "bench_principal_cache"
+schema, then replays --requests authentications drawn from a Zipf-like
+distribution (a few users make most requests), with a settings update
+every --update-every requests. Reports the cache hit rate and the p50/p95
+cost of resolving the principal with the cache and without it (the old
+users SELECT plus the settings lazy load). The schema is dropped afterwards.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.principal import load_principal, principal_cache  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db import models  # noqa: E402
+
+SCHEMA = "bench_principal_cache"
+
+
+def seed(db, users: int) -> list[uuid.UUID]:
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    now = datetime.utcnow()
+    db.execute(models.User.__table__.insert(), [
+        {"id": user_id, "email": f"bench{i}@example.com", "hashed_password": "x", "created_at": now, "updated_at": now}
+        for i, user_id in enumerate(user_ids)
+    ])
+    db.execute(models.UserSettings.__table__.insert(), [
+        {"user_id": user_id, "base_unit": 50.0, "timezone": "America/New_York", "calendar_reminder_min": 30,
+         "google_oauth_connected": False, "created_at": now, "updated_at": now}
+        for user_id in user_ids
+    ])
+    db.commit()
+    return user_ids
+
+
+def uncached(db, user_id: uuid.UUID) -> None:
+    """What get_current_user and the handler's settings access did before."""
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user.settings.base_unit
+    db.expire_all()
+
+
+def cached(db, user_id: uuid.UUID) -> None:
+    load_principal(db, user_id).settings.base_unit
+
+
+def percentile(samples: list[float], p: float) -> float:
+    return sorted(samples)[int(len(samples) * p) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--update-every", type=int, default=500)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    admin = create_engine(settings.DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    engine = create_engine(settings.DATABASE_URL, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    try:
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        user_ids = seed(db, args.users)
+        weights = [1 / (rank + 1) for rank in range(len(user_ids))]
+        stream = rng.choices(user_ids, weights=weights, k=args.requests)
+
+        timings = {"uncached": [], "cached": []}
+        principal_cache.clear()
+        principal_cache.hits = principal_cache.misses = 0
+        for i, user_id in enumerate(stream):
+            if i and i % args.update_every == 0:
+                # A settings write through the ORM invalidates on commit
+                row = db.get(models.UserSettings, rng.choice(user_ids))
+                row.base_unit += 1
+                db.commit()
+
+            for name, fn in (("uncached", uncached), ("cached", cached)):
+                start = time.perf_counter()
+                fn(db, user_id)
+                timings[name].append((time.perf_counter() - start) * 1e6)
+
+        stats = principal_cache.stats()
+        hit_rate = stats["hits"] / (stats["hits"] + stats["misses"])
+        print(f"{args.requests} requests over {args.users} users, hit rate {hit_rate:.1%}")
+        for name, samples in timings.items():
+            print(f"{name:<9} p50 {statistics.median(samples):8.1f} us  p95 {percentile(samples, 0.95):8.1f} us")
+        saved = statistics.median(timings["uncached"]) - statistics.median(timings["cached"])
+        print(f"p50 saved per request: {saved:.1f} us")
+        db.close()
+    finally:
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
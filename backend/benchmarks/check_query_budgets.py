@@ -0,0 +1,168 @@
+"""Check the number of SQL statements each core endpoint sends against a budget.
+
+Usage:
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.check_query_budgets
+
+Runs the app in-process against a throwaway "check_query_budgets" schema
+with ORM_RAISE_ON_LAZY_LOAD on, so an accidental lazy load fails the
+request outright. Each endpoint is called once with a warm principal
+cache and its statements are counted; any endpoint over its budget is
+printed with the statements it sent and the script exits non-zero. The
+schema is dropped afterwards.
+"""
+import os
+import sys
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+os.environ.setdefault("ORM_RAISE_ON_LAZY_LOAD", "true")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_EXECUTOR", "thread")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.query_counter import QueryBudgetExceeded, query_budget  # noqa: E402
+from app.db.session import get_async_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+SCHEMA = "check_query_budgets"
+GROUP_MEMBERS = 5
+
+# (label, method, path, json body, statement budget). Paths are formatted
+# with the ids created during setup. Writes include monthly stats upkeep,
+# sketch deltas and feed fan-out; create also loads the entity index cold.
+# Group reads are checked against a group of GROUP_MEMBERS members with
+# bets, so a per-member query shows up as a blown budget. Group writes are
+# held to two round trips; leave covers a member leaving, delete the owner
+# leaving (which deletes the group).
+BUDGETS = [
+    ("auth.me", "GET", "/api/v1/auth/me", None, 0),
+    ("bets.create", "POST", "/api/v1/bets/", {
+        "bet_name": "Budget ML", "sport": "NFL", "market_type": "ML", "odds_american": 150,
+        "stake": 10, "book_id": "{book_id}", "event_date": "2030-01-01T18:00:00"
+    }, 8),
+    ("bets.list", "GET", "/api/v1/bets/", None, 1),
+    ("bets.get", "GET", "/api/v1/bets/{bet_id}", None, 1),
+    ("bets.update", "PATCH", "/api/v1/bets/{bet_id}", {"stake": 20}, 6),
+    ("analytics.kpis", "GET", "/api/v1/analytics/kpis", None, 1),
+    ("analytics.breakdown", "GET", "/api/v1/analytics/breakdown?dim=book", None, 1),
+    ("analytics.bankroll", "GET", "/api/v1/analytics/bankroll", None, 1),
+    ("calendar.prepare", "POST", "/api/v1/calendar/prepare", {"betId": "{bet_id}"}, 1),
+    ("calendar.ics", "GET", "/api/v1/calendar/ics/{bet_id}", None, 2),
+    ("bets.settle", "POST", "/api/v1/bets/{bet_id}/settle", {"status": "Won"}, 8),
+    ("groups.members", "GET", "/api/v1/groups/{group_id}", None, 2),
+    ("groups.leaderboard", "GET", "/api/v1/groups/{group_id}/leaderboard?splits=true", None, 1),
+    ("groups.history", "GET", "/api/v1/groups/{group_id}/leaderboard/history", None, 1),
+    ("groups.feed", "GET", "/api/v1/groups/{group_id}/feed", None, 1),
+    ("groups.compare", "GET", "/api/v1/groups/{group_id}/compare?b={member_id}", None, 3),
+    ("groups.list", "GET", "/api/v1/groups/", None, 1),
+    ("groups.create", "POST", "/api/v1/groups/", {"name": "Owned Group"}, 2),
+    ("groups.join", "POST", "/api/v1/groups/join", {"invite_code": "{join_code}"}, 2),
+    ("groups.leave", "DELETE", "/api/v1/groups/{joined_group_id}", None, 2),
+    ("groups.delete", "DELETE", "/api/v1/groups/{owned_group_id}", None, 2),
+]
+
+# Ids taken from a step's response for later paths: label -> ids key
+CREATES = {"bets.create": "bet_id", "groups.create": "owned_group_id"}
+
+
+def _fill(value, ids: dict):
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    return value
+
+
+def create_group(client: TestClient, headers: dict, book_id: str) -> dict:
+    """Create a group with GROUP_MEMBERS members who each have settled bets.
+
+    The first member also owns a second group for the join and leave steps.
+    """
+    group = client.post("/api/v1/groups/", json={"name": "Budget Group"}, headers=headers).json()
+    member_id = None
+    joined = None
+    for i in range(1, GROUP_MEMBERS):
+        token = client.post("/api/v1/auth/register", json={
+            "email": f"member{i}@example.com", "password": "password1"
+        }).json()["access_token"]
+        member = {"Authorization": f"Bearer {token}"}
+        client.post("/api/v1/groups/join", json={"invite_code": group["invite_code"]}, headers=member)
+        for sport, status in (("NFL", "Won"), ("NBA", "Lost")):
+            bet = client.post("/api/v1/bets/", json={
+                "bet_name": f"Member {i} {sport}", "sport": sport, "market_type": "ML",
+                "odds_american": -110, "stake": 10 * i, "book_id": book_id
+            }, headers=member).json()
+            client.post(f"/api/v1/bets/{bet['id']}/settle", json={"status": status}, headers=member)
+        if member_id is None:
+            member_id = client.get("/api/v1/auth/me", headers=member).json()["user"]["id"]
+            joined = client.post("/api/v1/groups/", json={"name": "Joined Group"}, headers=member).json()
+    return {
+        "group_id": group["id"],
+        "member_id": member_id,
+        "join_code": joined["invite_code"],
+        "joined_group_id": joined["id"],
+    }
+
+
+def main() -> int:
+    admin = create_engine(settings.DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    connect_args = {"options": f"-csearch_path={SCHEMA}"}
+    engine = create_async_engine(settings.DATABASE_URL, connect_args=connect_args)
+    SchemaSession = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def schema_db():
+        async with SchemaSession() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = schema_db
+    failures = []
+    try:
+        Base.metadata.create_all(create_engine(settings.DATABASE_URL, connect_args=connect_args))
+        client = TestClient(app)
+        token = client.post("/api/v1/auth/register", json={
+            "email": "budget@example.com", "password": "password1"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        client.get("/api/v1/auth/me", headers=headers)
+        ids = {"book_id": client.post("/api/v1/sportsbooks/", json={"name": "Budget Book"}, headers=headers).json()["id"]}
+        ids.update(create_group(client, headers, ids["book_id"]))
+
+        for label, method, path, body, budget in BUDGETS:
+            try:
+                path, body = _fill(path, ids), _fill(body, ids)
+            except KeyError as exc:
+                failures.append(f"{label} skipped: no {exc.args[0]} from an earlier step")
+                continue
+            status = "ok"
+            try:
+                with query_budget(budget, label, engine) as counter:
+                    response = client.request(method, path, json=body, headers=headers)
+            except QueryBudgetExceeded as exc:
+                failures.append(str(exc))
+                status = "OVER"
+            if response.status_code >= 400:
+                failures.append(f"{label} returned {response.status_code}: {response.text[:200]}")
+                continue
+            if label in CREATES:
+                ids[CREATES[label]] = response.json()["id"]
+            print(f"{label:<20} {counter.count:>2} / {budget}  {status}")
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Check read-replica routing against a local stand-in for a replica.
+
+Usage:
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.check_replica_routing
+
+Creates two throwaway schemas in the DATABASE_URL database, one as the
+primary and one as a replica that never receives writes (a replica
+lagging forever), plus a second replica URL nothing listens on. Then
+checks that:
+
+  * a user's reads go to the primary right after their own write
+  * once READ_YOUR_WRITES_SECONDS has passed they go to the replica, and
+    see what has been copied to it
+  * the unreachable replica is marked down and its turns fail over to
+    the working one
+  * with every replica down, reads fall back to the primary
+
+Exits non-zero on the first failed check. The schemas are dropped
+afterwards.
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_EXECUTOR", "thread")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+
+PRIMARY, REPLICA = "check_replica_primary", "check_replica_replica"
+STICKY_SECONDS = 1.0
+
+
+def schema_url(url: str, schema: str) -> str:
+    return make_url(url).update_query_dict({"options": f"-csearch_path={schema}"}).render_as_string(hide_password=False)
+
+
+# Engines are built from settings on import, so point them at the schemas first
+base_url = settings.DATABASE_URL
+unreachable = make_url(base_url).set(host="127.0.0.1", port=1, query={}).render_as_string(hide_password=False)
+settings.DATABASE_URL = schema_url(base_url, PRIMARY)
+settings.DATABASE_REPLICA_URLS = f"{schema_url(base_url, REPLICA)},{unreachable}"
+settings.READ_YOUR_WRITES_SECONDS = STICKY_SECONDS
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.replicas import reads_total, replica_set  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def copy_to_replica() -> None:
+    """Stand in for replication: copy every table from the primary schema."""
+    primary = create_engine(schema_url(base_url, PRIMARY))
+    replica = create_engine(schema_url(base_url, REPLICA))
+    with primary.connect() as source, replica.begin() as target:
+        for table in reversed(Base.metadata.sorted_tables):
+            target.execute(table.delete())
+        for table in Base.metadata.sorted_tables:
+            rows = source.execute(table.select()).mappings().all()
+            if rows:
+                target.execute(table.insert(), [dict(row) for row in rows])
+
+
+def reads() -> dict[str, int]:
+    return {labels["target"]: int(value) for labels, value in reads_total.samples()}
+
+
+def check(label: str, condition: bool, detail: str = "") -> None:
+    print(f"{'ok  ' if condition else 'FAIL'} {label}{f'  ({detail})' if detail else ''}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def main() -> int:
+    admin = create_engine(base_url)
+    with admin.begin() as conn:
+        for schema in (PRIMARY, REPLICA):
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+    try:
+        for schema in (PRIMARY, REPLICA):
+            Base.metadata.create_all(create_engine(schema_url(base_url, schema)))
+
+        client = TestClient(app)
+        token = client.post("/api/v1/auth/register", json={
+            "email": "replica@example.com", "password": "password1"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        book = client.post("/api/v1/sportsbooks/", json={"name": "Replica Book"}, headers=headers).json()
+        client.post("/api/v1/bets/", json={
+            "bet_name": "Replica ML", "sport": "NFL", "market_type": "ML", "odds_american": 150,
+            "stake": 10, "book_id": book["id"]
+        }, headers=headers)
+
+        before = reads()
+        bets = client.get("/api/v1/bets/", headers=headers).json()
+        after = reads()
+        check("read right after a write goes to the primary", len(bets) == 1 and
+              after.get("primary_recent_write", 0) == before.get("primary_recent_write", 0) + 1, f"{len(bets)} bets")
+
+        time.sleep(STICKY_SECONDS + 0.1)
+        bets = [client.get("/api/v1/bets/", headers=headers).json() for _ in range(4)]
+        after = reads()
+        check("later reads go to the replica, which has not caught up", all(page == [] for page in bets))
+        check("the unreachable replica is marked down",
+              [replica["healthy"] for replica in replica_set.status()] == [True, False], str(replica_set.status()))
+        check("its turns fail over to the working replica",
+              after.get("replica", 0) - before.get("replica", 0) == 4 and not after.get("primary_fallback"))
+
+        copy_to_replica()
+        bets = client.get("/api/v1/bets/", headers=headers).json()
+        check("the replica serves rows once they are replicated", len(bets) == 1)
+
+        for engine in replica_set.engines:
+            replica_set.mark_down(engine)
+        before = reads()
+        response = client.get("/api/v1/analytics/kpis", headers=headers)
+        check("with every replica down, reads fall back to the primary", response.status_code == 200 and
+              reads().get("primary_fallback", 0) == before.get("primary_fallback", 0) + 1)
+        print(client.get("/metrics/db").json()["replicas"])
+    finally:
+        with admin.begin() as conn:
+            for schema in (PRIMARY, REPLICA):
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
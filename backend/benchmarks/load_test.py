@@ -0,0 +1,130 @@
+"""Compare sync and async request handlers under concurrent load.
+
+Usage:
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.load_test [--concurrency 10,40,80] [--requests 400] [--query-ms 200]
+
+Serves two routes from an in-process app, each running the same slow
+query (pg_sleep) with the same connection pool size:
+
+    sync   def route on a sync engine, as the routers were written before;
+           FastAPI runs it on its threadpool (40 threads by default)
+    async  async def route on an AsyncSession, as the routers are now
+
+and drives each with --concurrency clients in flight, reporting
+throughput and p50/p95/p99 latency. Once concurrency passes the thread
+count, sync requests queue for a thread while async ones keep going until
+the pool is exhausted. The routes are measured one after the other, so
+only one pool holds connections at a time; keep the pool size below the
+server's max_connections. No tables are needed.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+
+
+def build_app(mode: str, pool_size: int, query_ms: int):
+    """Return (app, engine) serving the slow query at /<mode>."""
+    query = text("SELECT pg_sleep(:seconds)").bindparams(seconds=query_ms / 1000)
+    app = FastAPI()
+
+    if mode == "sync":
+        engine = create_engine(settings.DATABASE_URL, pool_size=pool_size, max_overflow=0)
+        SyncSession = sessionmaker(bind=engine)
+
+        def get_sync_db():
+            db = SyncSession()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        @app.get("/sync")
+        def sync_route(db: Session = Depends(get_sync_db)):
+            db.execute(query)
+            return {"ok": True}
+    else:
+        engine = create_async_engine(settings.DATABASE_URL, pool_size=pool_size, max_overflow=0)
+        AsyncSessionFactory = async_sessionmaker(engine)
+
+        async def get_db():
+            async with AsyncSessionFactory() as db:
+                yield db
+
+        @app.get("/async")
+        async def async_route(db: AsyncSession = Depends(get_db)):
+            await db.execute(query)
+            return {"ok": True}
+
+    return app, engine
+
+
+async def run(client: httpx.AsyncClient, path: str, concurrency: int, requests: int) -> tuple[float, list[float]]:
+    timings: list[float] = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, timings
+
+
+def percentile(samples: list[float], p: float) -> float:
+    return sorted(samples)[max(0, int(len(samples) * p) - 1)]
+
+
+async def main_async(args) -> None:
+    levels = [int(level) for level in args.concurrency.split(",")]
+    pool_size = args.pool_size or max(levels)
+    print(f"pool {pool_size}, query {args.query_ms} ms, {args.requests} requests per run")
+    print(f"{'route':<6} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    # One engine at a time, so both pools never hold connections together
+    for mode in ("sync", "async"):
+        app, engine = build_app(mode, pool_size, args.query_ms)
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+                await run(client, f"/{mode}", min(levels), min(levels))  # open connections
+                for concurrency in levels:
+                    elapsed, timings = await run(client, f"/{mode}", concurrency, args.requests)
+                    print(
+                        f"{mode:<6} {concurrency:>7} {len(timings) / elapsed:>8.0f} "
+                        f"{statistics.median(timings):>8.1f} {percentile(timings, 0.95):>8.1f} "
+                        f"{percentile(timings, 0.99):>8.1f}"
+                    )
+        finally:
+            if mode == "sync":
+                engine.dispose()
+            else:
+                await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="10,40,80", help="comma-separated client counts")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--query-ms", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=0, help="default: the highest concurrency")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Backfill or verify precomputed per-user monthly stats and platform percentile sketches."""
+import argparse
+import sys
+from uuid import UUID
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.utils.monthly_stats import check_monthly_stats, rebuild_monthly_stats
+from app.utils.platform_stats import rebuild_platform_sketches
+
+# Create engine
+engine = create_engine(str(settings.DATABASE_URL))
+SessionLocal = sessionmaker(bind=engine)
+
+
+def main():
+    """Rebuild monthly stats from raw bets, or report drift with --check."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--check", action="store_true", help="Compare stored stats with raw bets without writing")
+    parser.add_argument("--user", type=UUID, help="Limit to a single user id")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.check:
+            problems = check_monthly_stats(db, args.user)
+            for problem in problems:
+                print(f"[DRIFT] {problem}")
+            if problems:
+                print(f"[ERROR] {len(problems)} monthly stats mismatches")
+                sys.exit(1)
+            print("[OK] Monthly stats match raw bets")
+            return
+
+        written = rebuild_monthly_stats(db, args.user)
+        sketches = rebuild_platform_sketches(db)
+        db.commit()
+        print(f"[OK] Rebuilt {written} user-month stats rows and {sketches} percentile sketches")
+    except Exception as e:
+        print(f"[ERROR] Error rebuilding monthly stats: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Seed NFL teams into the entity catalog."""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.models import Entity, EntityAlias, EntityKind, AliasStatus, Sport
+from app.core.config import settings
+from app.utils.entity_resolver import normalize_name
+
+# Create engine
+engine = create_engine(str(settings.DATABASE_URL))
+SessionLocal = sessionmaker(bind=engine)
+
+# (canonical name, aliases). Shared cities (New York, Los Angeles) are left
+# out as aliases because they don't identify a single team.
+NFL_TEAMS = [
+    ("Arizona Cardinals", ["ARI", "Arizona", "Cardinals"]),
+    ("Atlanta Falcons", ["ATL", "Atlanta", "Falcons"]),
+    ("Baltimore Ravens", ["BAL", "Baltimore", "Ravens"]),
+    ("Buffalo Bills", ["BUF", "Buffalo", "Bills"]),
+    ("Carolina Panthers", ["CAR", "Carolina", "Panthers"]),
+    ("Chicago Bears", ["CHI", "Chicago", "Bears"]),
+    ("Cincinnati Bengals", ["CIN", "Cincinnati", "Bengals"]),
+    ("Cleveland Browns", ["CLE", "Cleveland", "Browns"]),
+    ("Dallas Cowboys", ["DAL", "Dallas", "Cowboys"]),
+    ("Denver Broncos", ["DEN", "Denver", "Broncos"]),
+    ("Detroit Lions", ["DET", "Detroit", "Lions"]),
+    ("Green Bay Packers", ["GB", "Green Bay", "Packers"]),
+    ("Houston Texans", ["HOU", "Houston", "Texans"]),
+    ("Indianapolis Colts", ["IND", "Indianapolis", "Colts"]),
+    ("Jacksonville Jaguars", ["JAX", "Jacksonville", "Jaguars", "Jags"]),
+    ("Kansas City Chiefs", ["KC", "Kansas City", "Chiefs", "KC Chiefs"]),
+    ("Las Vegas Raiders", ["LV", "Las Vegas", "Raiders"]),
+    ("Los Angeles Chargers", ["LAC", "LA Chargers", "Chargers"]),
+    ("Los Angeles Rams", ["LAR", "LA Rams", "Rams"]),
+    ("Miami Dolphins", ["MIA", "Miami", "Dolphins"]),
+    ("Minnesota Vikings", ["MIN", "Minnesota", "Vikings"]),
+    ("New England Patriots", ["NE", "New England", "Patriots", "Pats"]),
+    ("New Orleans Saints", ["NO", "New Orleans", "Saints"]),
+    ("New York Giants", ["NYG", "NY Giants", "Giants"]),
+    ("New York Jets", ["NYJ", "NY Jets", "Jets"]),
+    ("Philadelphia Eagles", ["PHI", "Philadelphia", "Eagles"]),
+    ("Pittsburgh Steelers", ["PIT", "Pittsburgh", "Steelers"]),
+    ("San Francisco 49ers", ["SF", "San Francisco", "49ers", "Niners"]),
+    ("Seattle Seahawks", ["SEA", "Seattle", "Seahawks"]),
+    ("Tampa Bay Buccaneers", ["TB", "Tampa Bay", "Buccaneers", "Bucs"]),
+    ("Tennessee Titans", ["TEN", "Tennessee", "Titans"]),
+    ("Washington Commanders", ["WAS", "Washington", "Commanders"]),
+]
+
+
+def seed_entities():
+    """Seed NFL teams and their common aliases."""
+    db = SessionLocal()
+    try:
+        # Check if NFL teams already exist
+        existing = db.query(Entity).filter(
+            Entity.kind == EntityKind.TEAM,
+            Entity.sport == Sport.NFL
+        ).count()
+        if existing > 0:
+            print(f"[OK] {existing} NFL teams already exist. Skipping seed.")
+            return
+
+        for name, aliases in NFL_TEAMS:
+            entity = Entity(kind=EntityKind.TEAM, sport=Sport.NFL, name=name)
+            db.add(entity)
+            db.flush()
+            for alias in aliases:
+                db.add(EntityAlias(
+                    entity_id=entity.id,
+                    alias=normalize_name(alias),
+                    status=AliasStatus.CONFIRMED
+                ))
+
+        db.commit()
+        print(f"[OK] Seeded {len(NFL_TEAMS)} NFL teams")
+    except Exception as e:
+        print(f"[ERROR] Error seeding entities: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    seed_entities()